@@ -1,31 +1,57 @@
 from __future__ import annotations
 
 import os
-from typing import Optional, List
+from typing import Optional, List, NamedTuple
 import time
 import uuid
 import json
 import math
+import struct
+import base64
+import hashlib
+import hmac
+import re
+import weakref
+import threading
+import asyncio
+import contextvars
+import functools
+import random
+import sys
+import queue
+import shutil
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait as _wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
 
 import psycopg2
-import psycopg2.pool
-from fastapi import FastAPI, Query, UploadFile, File, HTTPException, Request
-from fastapi.responses import StreamingResponse
+import psycopg2.errors
+import psycopg2.extensions
+import anyio.to_thread
+from fastapi import FastAPI, Query, Path, UploadFile, File, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse, RedirectResponse
 import io
 import csv
 from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet
 from urllib.parse import urlencode
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
+from starlette.routing import Match
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from pydantic import BaseModel
 import zipfile
+import tempfile
+
+from db_pool import BoundedConnectionPool, PoolTimeout
+from jobs import IdempotencyConflict, Job, JobFailed, JobQueue, JobQueueFull, iso_utc
+from metrics import LATENCY_BUCKETS, ROWS_BUCKETS, MetricsRegistry
+from object_store import LocalObjectStore, S3ObjectStore
+from pdf_render import render_batch_pdf, render_report_pdf, render_timed, worker_init as pdf_worker_init
+from rate_limit import MemoryRateLimitStore, RedisRateLimitStore, parse_rate_costs
+from result_cache import MemoryResultCache, RedisResultCache
 
 
 # Load env vars from api/.env for local/dev runs
@@ -35,10 +61,96 @@ ALLOWED_ORIGINS = [s.strip() for s in os.getenv(
     "ALLOWED_ORIGINS",
     "http://127.0.0.1:4321,http://localhost:4321"
 ).split(",") if s.strip()]
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")  # GET /metrics
+# Structured logs go through a background writer (LogPipeline)
+LOG_QUEUE_MAX = int(os.getenv("LOG_QUEUE_MAX", "10000"))  # records buffered before new ones are dropped
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))  # records per write/flush
+LOG_SAMPLE_2XX = float(os.getenv("LOG_SAMPLE_2XX", "1.0"))  # fraction of 2xx access records kept
 RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
 RATE_LIMIT_PER_MIN = int(os.getenv("RATE_LIMIT_PER_MIN", "120"))
 RATE_LIMIT_WINDOW_SEC = int(os.getenv("RATE_LIMIT_WINDOW_SEC", "60"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()  # memory | redis (shared by all workers)
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # clients tracked in memory (LRU)
+# Request cost per route: "[METHOD ]path-prefix=cost", longest prefix wins, 1 otherwise; 0 exempts
+RATE_LIMIT_COSTS = os.getenv(
+    "RATE_LIMIT_COSTS",
+    "/v1/reports=10,/v1/batch=30,POST /v1/jobs=10,/v1/search.=5,/v1/tiles/=0.25,/health=0,/ready=0,/metrics=0",
+)
 STATEMENT_TIMEOUT_MS = int(os.getenv("STATEMENT_TIMEOUT_MS", "15000"))
+# Connection pool: connections opened on demand up to DB_POOL_MAX; callers queue up to DB_POOL_TIMEOUT_SEC
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+DB_POOL_TIMEOUT_SEC = float(os.getenv("DB_POOL_TIMEOUT_SEC", "10"))
+# Worker threads for sync endpoints (0 keeps the AnyIO default of 40)
+API_THREADS = int(os.getenv("API_THREADS", "0"))
+# Background pool upkeep: ping connections idle this long, close extras idle past DB_POOL_MAX_IDLE_SEC
+DB_POOL_HEALTHCHECK_SEC = float(os.getenv("DB_POOL_HEALTHCHECK_SEC", "30"))
+DB_POOL_MAX_IDLE_SEC = float(os.getenv("DB_POOL_MAX_IDLE_SEC", "300"))
+DB_CONNECT_TIMEOUT_SEC = int(os.getenv("DB_CONNECT_TIMEOUT_SEC", "10"))
+# Slow-query capture: every pooled-connection execute is timed; slow ones get a sampled EXPLAIN
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))  # 0 disables capture
+SLOW_QUERY_RING_SIZE = int(os.getenv("SLOW_QUERY_RING_SIZE", "200"))  # slow samples kept (newest)
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.getenv("SLOW_QUERY_MAX_FINGERPRINTS", "500"))  # per-SQL aggregates kept (LRU)
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "1.0"))  # fraction of slow queries explained
+SLOW_QUERY_EXPLAIN_INTERVAL_SEC = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SEC", "300"))  # per normalized SQL
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", str(2 * STATEMENT_TIMEOUT_MS)))
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "")  # JSON lines of explained slow queries; off when empty
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # X-Admin-Token for /v1/admin/*; admin endpoints are off when empty
+# PDF rendering (/v1/reports, /v1/batch) runs in a process pool; PDF_WORKERS=0 renders on the request thread
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_MAX_INFLIGHT = int(os.getenv("PDF_MAX_INFLIGHT", str(2 * max(1, PDF_WORKERS))))  # queued + running renders, all requests
+PDF_BATCH_CONCURRENCY = int(os.getenv("PDF_BATCH_CONCURRENCY", str(max(1, PDF_WORKERS))))  # in flight per /v1/batch request
+PDF_QUEUE_TIMEOUT_SEC = float(os.getenv("PDF_QUEUE_TIMEOUT_SEC", "30"))
+PDF_WORKER_NICE = int(os.getenv("PDF_WORKER_NICE", "10"))
+STATICMAP_TILE_URL = os.getenv("STATICMAP_TILE_URL", "https://tile.openstreetmap.org/{z}/{x}/{y}.png")  # PDF map basemap
+# Background jobs (/v1/jobs): exports, reports and batch ZIPs built off the request path
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # 0 disables /v1/jobs
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SEC = float(os.getenv("JOB_RETRY_BACKOFF_SEC", "5"))  # doubled per attempt
+JOB_RETENTION_SEC = int(os.getenv("JOB_RETENTION_SEC", "86400"))
+JOB_STORE = os.getenv("JOB_STORE", "local").lower()  # local | s3
+JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "tx-well-jobs"))
+JOB_S3_BUCKET = os.getenv("JOB_S3_BUCKET", "")
+JOB_S3_PREFIX = os.getenv("JOB_S3_PREFIX", "jobs/")
+JOB_S3_ENDPOINT_URL = os.getenv("JOB_S3_ENDPOINT_URL", "")  # e.g. https://<account>.r2.cloudflarestorage.com
+JOB_S3_REGION = os.getenv("JOB_S3_REGION", "")  # 'auto' for R2
+JOB_S3_URL_TTL_SEC = int(os.getenv("JOB_S3_URL_TTL_SEC", "3600"))
+# Read from the typed, indexed app.wells_mat partitions (db/app_wells_mat.sql) instead of the parsing views.
+# "auto" (default) decides once at startup: app.wells_mat when it exists and has rows, the views otherwise
+USE_WELLS_MAT_SETTING = os.getenv("USE_WELLS_MAT", "auto").lower()
+USE_WELLS_MAT = USE_WELLS_MAT_SETTING in ("1", "true", "yes")
+# Set at startup: clusters come from the app.wells_clusters rollup (built with app.wells_mat) when it exists,
+# otherwise they are aggregated on the fly from the wells table being read
+CLUSTER_ROLLUP = False
+# app.wells_clusters rollup shape; must mirror CLUSTER_* in ground_truth/loader/load_ground_truth.py
+CLUSTER_MAX_ZOOM = 12
+CLUSTER_CELL_ZOOM_OFFSET = 2
+CLUSTER_POINTS_LIMIT = int(os.getenv("CLUSTER_POINTS_LIMIT", "5000"))
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+# Vector tiles: wells as points from TILE_POINTS_MIN_ZOOM, cluster rollup cells below it
+TILE_EXTENT = 4096
+TILE_POINTS_MIN_ZOOM = int(os.getenv("TILE_POINTS_MIN_ZOOM", "8"))
+# Most wells encoded into one points tile; denser tiles up to CLUSTER_MAX_ZOOM get the clusters layer instead
+TILE_MAX_POINTS = int(os.getenv("TILE_MAX_POINTS", "10000"))
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "2048"))  # tiles kept in memory (LRU)
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "")  # on-disk tile store; disabled when empty
+# Published data version is re-read at most this often; caches keyed by it roll over within this window
+DATA_VERSION_TTL_SEC = int(os.getenv("DATA_VERSION_TTL_SEC", "30"))
+# Result cache for /v1/search and /v1/meta: 'memory' (in-process LRU), 'redis' (shared by all workers) or 'none'
+RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "memory").lower()
+RESULT_CACHE_REDIS_URL = os.getenv("RESULT_CACHE_REDIS_URL", RATE_LIMIT_REDIS_URL)
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL_SEC = int(os.getenv("RESULT_CACHE_TTL_SEC", "3600"))
+# Cache-Control per endpoint; responses also carry an ETag derived from (data version, normalized query)
+CACHE_CONTROL_SEARCH = os.getenv("CACHE_CONTROL_SEARCH", "public, max-age=60, stale-while-revalidate=300")
+CACHE_CONTROL_WELL = os.getenv("CACHE_CONTROL_WELL", "public, max-age=300, stale-while-revalidate=3600")
+CACHE_CONTROL_META = os.getenv("CACHE_CONTROL_META", "public, max-age=60")
+# Server-side prepared statements are per session: disable behind a transaction-mode pooler (PgBouncer)
+USE_PREPARED_STATEMENTS = os.getenv("PREPARED_STATEMENTS", "true").lower() in ("1", "true", "yes")
+# Loader bookkeeping schema (ground_truth/loader/load_ground_truth.py --meta-schema)
+GROUND_TRUTH_META_SCHEMA = os.getenv("GROUND_TRUTH_META_SCHEMA", "ground_truth_meta")
 
 
 class SearchItem(BaseModel):
@@ -51,6 +163,7 @@ class SearchItem(BaseModel):
     date_completed: Optional[str] = None
     source: Optional[str] = None
     source_id: Optional[str] = None
+    distance_m: Optional[float] = None
 
 
 class ReportFilters(BaseModel):
@@ -65,13 +178,225 @@ class ReportFilters(BaseModel):
     limit: Optional[int] = 100
     source: Optional[str] = None  # 'sdr' | 'gwdb' | 'all'
 
+
+class ExportFilters(ReportFilters):
+    limit: Optional[int] = None  # exports are unbounded unless a positive limit is sent
+
+
+class ClusterCell(BaseModel):
+    lat: float
+    lon: float
+    count: int
+    depth_ft_min: Optional[float] = None
+    depth_ft_max: Optional[float] = None
+    depth_ft_avg: Optional[float] = None
+    date_min: Optional[str] = None
+    date_max: Optional[str] = None
+
+
+class ClustersResponse(BaseModel):
+    zoom: int
+    mode: str  # 'clusters' | 'points'
+    cells: List[ClusterCell] = []
+    points: List[SearchItem] = []
+    truncated: bool = False
+
+
+class JobRequest(BaseModel):
+    kind: str = "export"  # 'export' | 'report' (batch jobs: POST /v1/jobs/batch)
+    format: Optional[str] = None  # export: csv | parquet | arrow | geojsonl | gpkg (default csv)
+    filters: Optional[ReportFilters] = None
+
+
+class JobProgress(BaseModel):
+    done: int = 0
+    total: Optional[int] = None
+    unit: str = "rows"  # 'rows' | 'files'
+
+
+class JobResult(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+    url: str
+
+
+class JobStatus(BaseModel):
+    id: str
+    kind: str
+    format: str
+    state: str  # 'queued' | 'running' | 'retrying' | 'succeeded' | 'failed'
+    attempts: int = 0
+    progress: JobProgress
+    result: Optional[JobResult] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
+def _json_default(value: object) -> str:
+    # orjson writes datetimes as ISO 8601 natively; match it so both encoders emit the same records
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+
+def _json_line_std(record: dict) -> bytes:
+    return json.dumps(record, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+try:
+    import orjson
+
+    def _json_line(record: dict) -> bytes:
+        return orjson.dumps(record, default=str, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_line = _json_line_std
+
+
+class LogPipeline:
+    """JSON-lines log records written to stdout by a background thread.
+
+    emit() only enqueues the record dict, so request handlers and the event loop
+    never encode, write or flush. The writer takes whatever is queued (up to
+    `batch_size` records), encodes it and does one write + flush per batch. When
+    the queue is full, records are dropped and counted; the writer reports the
+    count in a `log_dropped` record. Successful (2xx) access records can be
+    sampled with emit_access().
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, sample_2xx: float, stream=None) -> None:
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max(1, max_queue))
+        self._batch_size = max(1, batch_size)
+        self._sample_2xx = sample_2xx
+        self._stream = stream
+        self._counters = {"written": 0, "dropped": 0, "sampled_out": 0, "write_errors": 0}
+        self._unreported_drops = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def emit(self, record: dict) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self._counters["dropped"] += 1
+                self._unreported_drops += 1
+
+    def emit_access(self, record: dict, status: int) -> None:
+        """emit() an access record, keeping only LOG_SAMPLE_2XX of 2xx ones (tagged with sample_rate)."""
+        if 200 <= status < 300 and self._sample_2xx < 1.0:
+            if random.random() >= self._sample_2xx:
+                with self._lock:
+                    self._counters["sampled_out"] += 1
+                return
+            record["sample_rate"] = self._sample_2xx
+        self.emit(record)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: List[dict]) -> None:
+        with self._lock:
+            drops, self._unreported_drops = self._unreported_drops, 0
+        if drops:
+            batch.append({"event": "log_dropped", "count": drops})
+        lines = []
+        for record in batch:
+            try:
+                lines.append(_json_line(record))
+            except Exception as exc:
+                lines.append(_json_line({"event": "log_encode_error", "error": repr(exc)}))
+        data = b"\n".join(lines) + b"\n"
+        stream = self._stream or sys.stdout
+        try:
+            if hasattr(stream, "buffer"):
+                stream.buffer.write(data)
+            else:
+                stream.write(data.decode("utf-8"))
+            stream.flush()
+            ok = True
+        except Exception:
+            ok = False
+        with self._lock:
+            self._counters["written" if ok else "write_errors"] += len(batch)
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Stop the writer once the queue is drained (waiting up to `timeout` seconds)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"queued": self._queue.qsize(), **self._counters}
+
+
+_log_pipeline = LogPipeline(LOG_QUEUE_MAX, LOG_BATCH_SIZE, LOG_SAMPLE_2XX)
+_log = _log_pipeline.emit
+
+
+_metrics = MetricsRegistry(log=_log)
+_m_http_requests = _metrics.counter(
+    "txwells_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+_m_http_latency = _metrics.histogram(
+    "txwells_http_request_duration_seconds", "Time to response headers by route template.", ("method", "route"), LATENCY_BUCKETS)
+_m_rate_limited = _metrics.counter(
+    "txwells_rate_limit_rejections_total", "Requests rejected with 429 by the rate limiter.", ("route",))
+_m_db_checkout = _metrics.histogram(
+    "txwells_db_checkout_wait_seconds", "Time waiting for a pooled DB connection.", (), LATENCY_BUCKETS)
+_m_db_query = _metrics.histogram(
+    "txwells_db_query_duration_seconds", "DB execution + fetch time per operation.", ("op",), LATENCY_BUCKETS)
+_m_db_rows = _metrics.histogram(
+    "txwells_db_rows_returned", "Rows returned per DB operation.", ("op",), ROWS_BUCKETS)
+_m_pdf_render = _metrics.histogram(
+    "txwells_pdf_render_seconds", "PDF build time in the render worker (incl. map tiles).", ("kind",), LATENCY_BUCKETS)
+_m_tile_fetch = _metrics.histogram(
+    "txwells_staticmap_tile_fetch_seconds", "Basemap tile downloads for PDF maps.", ("outcome",), LATENCY_BUCKETS)
+
+
+def _route_template(request: Request) -> str:
+    """Matched route path (e.g. /v1/wells/{well_id}) so labels stay low-cardinality."""
+    route = request.scope.get("route")
+    if route is None:
+        for candidate in app.router.routes:
+            if candidate.matches(request.scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
 app = FastAPI(title="TX Well Lookup API", version="0.1.0")
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 app.add_middleware(GZipMiddleware, minimum_size=1024)
 
@@ -80,45 +405,43 @@ app.add_middleware(GZipMiddleware, minimum_size=1024)
 async def access_log_middleware(request: Request, call_next):
     request_id = uuid.uuid4().hex
     request.state.request_id = request_id
-    # Simple in-memory fixed-window rate limiter per client IP
+    # Read by the slow-query log for queries run while serving this request
+    _request_context.set(f"{request.method} {request.url.path}" + (f"?{request.url.query}" if request.url.query else ""))
+    # Sliding-window rate limit per client IP, weighted by route cost
+    limited = None
     if RATE_LIMIT_ENABLED:
         ip = request.client.host if request.client else "unknown"
-        now = int(time.time())
-        window = now // RATE_LIMIT_WINDOW_SEC
-        bucket = _rate_buckets.get(ip)
-        if bucket is None or bucket[0] != window:
-            _rate_buckets[ip] = (window, 1)
-            remaining = max(0, RATE_LIMIT_PER_MIN - 1)
-        else:
-            count = bucket[1] + 1
-            _rate_buckets[ip] = (window, count)
-            remaining = max(0, RATE_LIMIT_PER_MIN - count)
-            if count > RATE_LIMIT_PER_MIN:
-                retry_after = (window + 1) * RATE_LIMIT_WINDOW_SEC - now
-                log = {
-                    "event": "rate_limit",
-                    "request_id": request_id,
-                    "ip": ip,
-                    "method": request.method,
-                    "path": request.url.path,
-                }
-                print(json.dumps(log), flush=True)
-                return JSONResponse(status_code=429, content={
-                    "detail": "Too Many Requests",
-                    "request_id": request_id
-                }, headers={
-                    "X-RateLimit-Limit": str(RATE_LIMIT_PER_MIN),
-                    "X-RateLimit-Remaining": str(0),
-                    "Retry-After": str(retry_after),
-                    "X-Request-ID": request_id,
-                })
+        limited = await _rate_limit(ip, request.method, request.url.path)
+        if limited is not None and not limited[0]:
+            _m_rate_limited.inc(_route_template(request))
+            log = {
+                "event": "rate_limit",
+                "request_id": request_id,
+                "ip": ip,
+                "method": request.method,
+                "path": request.url.path,
+            }
+            _log(log)
+            return JSONResponse(status_code=429, content={
+                "detail": "Too Many Requests",
+                "request_id": request_id
+            }, headers={
+                "X-RateLimit-Limit": str(RATE_LIMIT_PER_MIN),
+                "X-RateLimit-Remaining": str(0),
+                "Retry-After": str(max(1, math.ceil(limited[2]))),
+                "X-Request-ID": request_id,
+            })
     start = time.perf_counter()
     status_code = 500
     try:
         response = await call_next(request)
         status_code = getattr(response, 'status_code', 200)
     except Exception as exc:  # logged by handler as well
-        duration_ms = int((time.perf_counter() - start) * 1000)
+        elapsed = time.perf_counter() - start
+        duration_ms = int(elapsed * 1000)
+        route = _route_template(request)
+        _m_http_requests.inc(request.method, route, "500")
+        _m_http_latency.observe(elapsed, request.method, route)
         log = {
             "event": "http_request_error",
             "request_id": request_id,
@@ -130,10 +453,14 @@ async def access_log_middleware(request: Request, call_next):
             "user_agent": request.headers.get("user-agent"),
             "error": repr(exc),
         }
-        print(json.dumps(log), flush=True)
+        _log(log)
         raise
     else:
-        duration_ms = int((time.perf_counter() - start) * 1000)
+        elapsed = time.perf_counter() - start
+        duration_ms = int(elapsed * 1000)
+        route = _route_template(request)
+        _m_http_requests.inc(request.method, route, str(status_code))
+        _m_http_latency.observe(elapsed, request.method, route)
         log = {
             "event": "http_request",
             "request_id": request_id,
@@ -144,16 +471,11 @@ async def access_log_middleware(request: Request, call_next):
             "client": request.client.host if request.client else None,
             "user_agent": request.headers.get("user-agent"),
         }
-        print(json.dumps(log), flush=True)
+        _log_pipeline.emit_access(log, status_code)
         response.headers["X-Request-ID"] = request_id
-        if RATE_LIMIT_ENABLED and request.client:
-            # attach remaining estimate when available
-            ip = request.client.host
-            b = _rate_buckets.get(ip)
-            if b and b[0] == (int(time.time()) // RATE_LIMIT_WINDOW_SEC):
-                remaining = max(0, RATE_LIMIT_PER_MIN - b[1])
-                response.headers["X-RateLimit-Limit"] = str(RATE_LIMIT_PER_MIN)
-                response.headers["X-RateLimit-Remaining"] = str(remaining)
+        if limited is not None:
+            response.headers["X-RateLimit-Limit"] = str(RATE_LIMIT_PER_MIN)
+            response.headers["X-RateLimit-Remaining"] = str(max(0, int(RATE_LIMIT_PER_MIN - limited[1])))
         return response
 
 
@@ -167,75 +489,396 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
         "path": request.url.path,
         "error": repr(exc),
     }
-    print(json.dumps(log), flush=True)
+    _log(log)
     return JSONResponse(status_code=500, content={"detail": "Internal Server Error", "request_id": request_id}, headers={"X-Request-ID": request_id})
 
-pool: Optional[psycopg2.pool.SimpleConnectionPool] = None
-_rate_buckets: dict[str, tuple[int, int]] = {}
+class PdfQueueFull(Exception):
+    """No PDF render slot became free within PDF_QUEUE_TIMEOUT_SEC."""
+
+
+_request_context: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_context", default=None)
+
+
+@functools.lru_cache(maxsize=2048)
+def _normalize_sql(sql: str) -> str:
+    """Whitespace collapsed and numeric literals replaced by '?', so one query shape is one fingerprint."""
+    return re.sub(r"(?<![\w$.])\d+(?:\.\d+)?(?![\w.])", "?", " ".join(sql.split()))
+
+
+def _param_shape(params) -> List[str]:
+    """Types of the bound parameters (never their values), e.g. ['text', 'float', 'array[4]']."""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        params = list(params.values())
+    shape = []
+    for v in params:
+        if v is None:
+            shape.append("null")
+        elif isinstance(v, (list, tuple)):
+            shape.append(f"array[{len(v)}]")
+        else:
+            shape.append({"str": "text", "datetime": "timestamp"}.get(type(v).__name__, type(v).__name__))
+    return shape
+
+
+class SlowQueryLog:
+    """Per-SQL timing aggregates plus a ring buffer of slow executions with sampled plans.
+
+    record() runs on the request thread and only does bookkeeping. A slow SELECT
+    (>= threshold, or cancelled by statement_timeout) is queued, subject to
+    `explain_sample` and at most one per normalized SQL every `explain_interval_sec`,
+    for a background thread that runs EXPLAIN (ANALYZE, BUFFERS) with the same
+    parameters on its own read-only connection (falling back to a plain EXPLAIN if
+    that times out). Samples are listed by GET /v1/admin/slow-queries and appended
+    to `log_file` when set.
+    """
+
+    def __init__(self, threshold_ms: float, ring_size: int, max_fingerprints: int,
+                 explain_sample: float, explain_interval_sec: float, log_file: str) -> None:
+        self.threshold_ms = threshold_ms
+        self._samples: deque = deque(maxlen=max(1, ring_size))
+        self._stats: OrderedDict[str, dict] = OrderedDict()
+        self._max_fingerprints = max(1, max_fingerprints)
+        self._explain_sample = explain_sample
+        self._explain_interval = explain_interval_sec
+        self._last_explain: dict[str, float] = {}
+        self._log_file = log_file
+        self._explain_queue: "queue.Queue[dict]" = queue.Queue(maxsize=16)
+        self._explain_thread: Optional[threading.Thread] = None
+        self._explain_conn = None
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, params, seconds: float, error: Optional[str]) -> None:
+        ms = seconds * 1000.0
+        fingerprint = _normalize_sql(sql)
+        slow = ms >= self.threshold_ms or error == "QueryCanceled"
+        with self._lock:
+            st = self._stats.pop(fingerprint, None) or {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "slow": 0, "errors": 0}
+            st["calls"] += 1
+            st["total_ms"] += ms
+            st["max_ms"] = max(st["max_ms"], ms)
+            st["slow"] += slow
+            st["errors"] += error is not None
+            self._stats[fingerprint] = st
+            while len(self._stats) > self._max_fingerprints:
+                self._stats.popitem(last=False)
+            if not slow:
+                return
+            sample = {
+                "ts": iso_utc(time.time()), "duration_ms": round(ms, 1), "error": error,
+                "sql": fingerprint, "params": _param_shape(params), "request": _request_context.get(),
+                "plan": None, "plan_analyzed": None,
+            }
+            self._samples.append(sample)
+            now = time.monotonic()
+            explain = (
+                fingerprint.lstrip("( ").upper().startswith(("SELECT", "WITH"))
+                and now - self._last_explain.get(fingerprint, -1e18) >= self._explain_interval
+                and random.random() < self._explain_sample
+            )
+            if explain:
+                self._last_explain[fingerprint] = now
+        _log({"event": "slow_query", "duration_ms": sample["duration_ms"], "error": error,
+              "sql": fingerprint[:500], "params": sample["params"], "request": sample["request"]})
+        if explain:
+            self._queue_explain(sample, sql, params)
+        elif self._log_file:
+            self._append(sample)
+
+    def _queue_explain(self, sample: dict, sql: str, params) -> None:
+        if self._explain_thread is None:
+            with self._lock:
+                if self._explain_thread is None:
+                    self._explain_thread = threading.Thread(target=self._explain_loop, name="slow-query-explain", daemon=True)
+                    self._explain_thread.start()
+        try:
+            self._explain_queue.put_nowait({"sample": sample, "sql": sql, "params": params})
+        except queue.Full:
+            sample["plan"] = "(explain queue full)"
+
+    def _explain_loop(self) -> None:
+        while True:
+            job = self._explain_queue.get()
+            sample = job["sample"]
+            try:
+                plan, analyzed = self._explain(job["sql"], job["params"])
+            except Exception as exc:
+                plan, analyzed = f"(explain failed: {type(exc).__name__}: {exc})", None
+            with self._lock:
+                sample["plan"], sample["plan_analyzed"] = plan, analyzed
+            if self._log_file:
+                self._append(sample)
+
+    def _explain(self, sql: str, params) -> tuple[str, bool]:
+        """EXPLAIN the statement with its parameters inlined, on a dedicated (not pooled) connection."""
+        conn = self._explain_conn
+        if conn is None or conn.closed:
+            conn = self._explain_conn = psycopg2.connect(
+                DATABASE_URL, connect_timeout=DB_CONNECT_TIMEOUT_SEC, application_name="txwells-explain",
+                options=f"-c statement_timeout={SLOW_QUERY_EXPLAIN_TIMEOUT_MS}",
+            )
+            conn.set_session(readonly=True)
+        try:
+            with conn.cursor() as cur:
+                stmt = cur.mogrify(sql, params).decode("utf-8")
+                try:
+                    cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + stmt)
+                    analyzed = True
+                except psycopg2.errors.QueryCanceled:
+                    # Too slow to run even out of band: the plan alone still shows the scan choices
+                    conn.rollback()
+                    cur.execute("EXPLAIN " + stmt)
+                    analyzed = False
+                return "\n".join(r[0] for r in cur.fetchall()), analyzed
+        finally:
+            if not conn.closed:
+                conn.rollback()
+
+    def _append(self, sample: dict) -> None:
+        try:
+            with self._lock:
+                line = json.dumps(sample)
+            with open(self._log_file, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as exc:
+            _log({"event": "slow_query_log_error", "path": self._log_file, "error": repr(exc)})
+
+    def snapshot(self, top: int = 50) -> dict:
+        with self._lock:
+            samples = [dict(s) for s in reversed(self._samples)]
+            stats = [{"sql": fp, **st, "avg_ms": round(st["total_ms"] / st["calls"], 2),
+                      "total_ms": round(st["total_ms"], 1), "max_ms": round(st["max_ms"], 1)}
+                     for fp, st in self._stats.items()]
+        stats.sort(key=lambda st: st["total_ms"], reverse=True)
+        return {"threshold_ms": self.threshold_ms, "samples": samples, "top": stats[:top]}
+
+
+_slow_queries = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_RING_SIZE, SLOW_QUERY_MAX_FINGERPRINTS,
+                             SLOW_QUERY_EXPLAIN_SAMPLE, SLOW_QUERY_EXPLAIN_INTERVAL_SEC, SLOW_QUERY_LOG_FILE)
+
+
+class _TimedCursor(psycopg2.extensions.cursor):
+    """Cursor for pooled connections that reports every execute() to _slow_queries.
+
+    Prepared EXECUTEs are reported as the SQL they run; PREPARE/DEALLOCATE are not reported.
+    For server-side (named) cursors only the DECLARE is timed, not the fetches.
+    """
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        error = None
+        try:
+            return super().execute(query, vars)
+        except Exception as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            try:
+                _report_execute(self, query, vars, time.perf_counter() - start, error)
+            except Exception:
+                pass
+
+
+def _report_execute(cur, query, vars, seconds: float, error: Optional[str]) -> None:
+    if not isinstance(query, str):
+        query = query.decode("utf-8") if isinstance(query, bytes) else query.as_string(cur)
+    head = query.lstrip()[:10].upper()
+    if head.startswith("EXECUTE "):
+        source = _prepared_source.get(query.split()[1])
+        if source is None:
+            return
+        query = source
+    elif head.startswith(("PREPARE ", "DEALLOCATE")):
+        return
+    _slow_queries.record(query, vars, seconds, error)
+
+
+def _new_pool() -> BoundedConnectionPool:
+    return BoundedConnectionPool(
+        DATABASE_URL, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT_SEC,
+        # Applied once at connect time rather than per checkout
+        options=f"-c statement_timeout={STATEMENT_TIMEOUT_MS}",
+        connect_timeout=DB_CONNECT_TIMEOUT_SEC,
+        # TCP keepalives let the OS notice connections dropped by the network (e.g. idle SSL cut-offs)
+        keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3,
+        **({"cursor_factory": _TimedCursor} if SLOW_QUERY_MS > 0 else {}),
+    )
+
+
+def _pool_maintenance_loop(stop: threading.Event) -> None:
+    while not stop.wait(DB_POOL_HEALTHCHECK_SEC):
+        p = pool
+        if p is None:
+            continue
+        try:
+            p.maintain(DB_POOL_HEALTHCHECK_SEC, DB_POOL_MAX_IDLE_SEC)
+        except Exception as exc:
+            _log({"event": "db_pool_maintenance_error", "error": repr(exc)})
+
+
+_pool_maintenance_stop = threading.Event()
+
+
+pool: Optional[BoundedConnectionPool] = None
+
+
+_rate_costs = parse_rate_costs(RATE_LIMIT_COSTS)
+
+
+def _rate_limit_cost(method: str, path: str) -> float:
+    for rule_method, prefix, cost in _rate_costs:
+        if path.startswith(prefix) and (rule_method is None or rule_method == method):
+            return cost
+    return 1.0
+
+
+def _new_rate_limiter():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitStore(RATE_LIMIT_REDIS_URL)
+    return MemoryRateLimitStore(RATE_LIMIT_MAX_KEYS)
+
+
+_rate_limiter = _new_rate_limiter()
+
+
+async def _rate_limit(ip: str, method: str, path: str) -> Optional[tuple[bool, float, float]]:
+    """Charge this request to the client's window; None when the route is exempt or the backend is down."""
+    cost = min(_rate_limit_cost(method, path), float(RATE_LIMIT_PER_MIN))
+    if cost <= 0:
+        return None
+    args = (ip, cost, RATE_LIMIT_PER_MIN, RATE_LIMIT_WINDOW_SEC)
+    try:
+        if _rate_limiter.blocking:
+            return await anyio.to_thread.run_sync(_rate_limiter.hit, *args)
+        return _rate_limiter.hit(*args)
+    except Exception as exc:
+        # Fail open: an unavailable shared store must not take the API down with it
+        _log({"event": "rate_limit_backend_error", "backend": _rate_limiter.name, "error": repr(exc)})
+        return None
+
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    request_id = getattr(request.state, 'request_id', uuid.uuid4().hex)
+    _log({"event": "db_pool_timeout", "request_id": request_id, "path": request.url.path})
+    return JSONResponse(status_code=503, content={"detail": "Database busy, retry shortly", "request_id": request_id},
+                        headers={"Retry-After": "1", "X-Request-ID": request_id})
+
+
+@app.exception_handler(PdfQueueFull)
+async def pdf_queue_full_handler(request: Request, exc: PdfQueueFull):
+    request_id = getattr(request.state, 'request_id', uuid.uuid4().hex)
+    _log({"event": "pdf_queue_full", "request_id": request_id, "path": request.url.path})
+    return JSONResponse(status_code=503, content={"detail": "Report renderer busy, retry shortly", "request_id": request_id},
+                        headers={"Retry-After": "5", "X-Request-ID": request_id})
 
 
 @app.on_event("startup")
 def on_startup() -> None:
     global pool
+    if API_THREADS > 0:
+        # Sync endpoints run in AnyIO's worker threads (40 by default)
+        anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADS
     if DATABASE_URL:
-        pool = psycopg2.pool.SimpleConnectionPool(minconn=1, maxconn=5, dsn=DATABASE_URL)
+        pool = _new_pool()
+        _pool_maintenance_stop.clear()
+        threading.Thread(target=_pool_maintenance_loop, args=(_pool_maintenance_stop,), name="db-pool-maintenance", daemon=True).start()
         # best-effort ensure views exist in dev/local if enabled
         _ensure_app_views_if_configured()
+        _detect_wells_mat()
+    _job_queue.start(JOB_WORKERS)
 
 
 @app.on_event("shutdown")
 def on_shutdown() -> None:
     global pool
+    _pool_maintenance_stop.set()
+    _job_queue.stop()
     if pool is not None:
         pool.closeall()
         pool = None
+    _shutdown_pdf_executor()
+    # last: flush whatever the shutdown itself logged
+    _log_pipeline.close()
 
 
 def _get_conn():
-    """Get a DB connection, rebuilding the pool if needed.
+    """Get a DB connection from the pool, waiting up to DB_POOL_TIMEOUT_SEC when it is saturated.
     Returns None if DATABASE_URL is not configured.
     """
     global pool
     if not DATABASE_URL:
         return None
     if pool is None:
-        pool = psycopg2.pool.SimpleConnectionPool(minconn=1, maxconn=5, dsn=DATABASE_URL)
+        pool = _new_pool()
+    start = time.perf_counter()
     try:
-        conn = pool.getconn()
-        # Liveness check: Neon can drop idle SSL connections
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-        except Exception:
-            try:
-                conn.close()
-            except Exception:
-                pass
-            try:
-                pool.closeall()
-            except Exception:
-                pass
-            pool = psycopg2.pool.SimpleConnectionPool(minconn=1, maxconn=5, dsn=DATABASE_URL)
-            conn = pool.getconn()
+        return pool.getconn()
+    finally:
+        _m_db_checkout.observe(time.perf_counter() - start)
+
+
+def _with_cursor(fn, op: str = "other"):
+    """Run fn(cursor) on a pooled connection and return its result.
+
+    Connections are not validated on checkout. If this one turns out to have been
+    dropped by the server (Neon closes idle SSL connections), the first statement
+    fails with the connection marked closed and fn is retried once on a fresh one.
+    fn's run time is recorded under `op` (and its row count when it returns a list).
+    """
+    for attempt in (1, 2):
+        conn = _get_conn()
+        broken = False
         try:
             with conn.cursor() as cur:
-                # Apply statement_timeout (ms) per connection to bound long queries
-                cur.execute("SET LOCAL statement_timeout = %s", (STATEMENT_TIMEOUT_MS,))
-        except Exception:
-            pass
-        return conn
-    except Exception:
-        # Rebuild the pool on failure (e.g., Neon connection dropped)
-        try:
-            pool.closeall()
-        except Exception:
-            pass
-        pool = psycopg2.pool.SimpleConnectionPool(minconn=1, maxconn=5, dsn=DATABASE_URL)
-        return pool.getconn()
+                start = time.perf_counter()
+                result = fn(cur)
+                _m_db_query.observe(time.perf_counter() - start, op)
+                if isinstance(result, list):
+                    _m_db_rows.observe(len(result), op)
+                return result
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = bool(conn.closed)
+            if attempt == 2 or not broken:
+                raise
+        finally:
+            if pool is not None:
+                pool.putconn(conn, close=broken)
+
+
+def _detect_wells_mat() -> None:
+    """Pick the wells and clusters tables once, at startup.
+
+    USE_WELLS_MAT=auto reads app.wells_mat only if it exists and is populated, so
+    deployments that have not applied db/app_wells_mat.sql and run the loader's
+    --rematerialize yet keep reading the views instead of failing or returning
+    nothing. The app.wells_clusters rollup is used only alongside app.wells_mat
+    (the loader builds it from there) and only if the table exists.
+    """
+    global USE_WELLS_MAT, CLUSTER_ROLLUP
+    def _check(cur):
+        cur.execute("SELECT to_regclass('app.wells_mat') IS NOT NULL, to_regclass('app.wells_clusters') IS NOT NULL")
+        has_mat, has_rollup = cur.fetchone()
+        populated = False
+        if has_mat and USE_WELLS_MAT_SETTING == "auto":
+            cur.execute("SELECT EXISTS (SELECT 1 FROM app.wells_mat)")
+            populated = bool(cur.fetchone()[0])
+        return populated, bool(has_rollup)
+    try:
+        populated, has_rollup = _with_cursor(_check, op="meta")
+    except Exception as exc:
+        populated, has_rollup = False, False
+        _log({"event": "wells_mat_check_failed", "error": repr(exc)})
+    if USE_WELLS_MAT_SETTING == "auto":
+        USE_WELLS_MAT = populated
+    CLUSTER_ROLLUP = USE_WELLS_MAT and has_rollup
+    _log({"event": "wells_source", "table": "app.wells_mat" if USE_WELLS_MAT else "app.wells views",
+          "clusters": "app.wells_clusters" if CLUSTER_ROLLUP else "aggregated per request"})
 
 
 def _ensure_app_views_if_configured() -> None:
-    """Optionally ensure the `app` views exist by applying the SQL file.
+    """Optionally ensure the `app` views and app.wells_mat exist by applying the SQL files.
 
     Controlled by env var AUTO_APPLY_VIEWS ("1"/"true"). No-op if no DATABASE_URL.
     """
@@ -244,8 +887,10 @@ def _ensure_app_views_if_configured() -> None:
         return
     if not DATABASE_URL:
         return
-    sql_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "db", "app_views.sql"))
-    if not os.path.exists(sql_path):
+    db_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "db"))
+    sql_paths = [os.path.join(db_dir, name) for name in ("app_views.sql", "app_wells_mat.sql")]
+    sql_paths = [p for p in sql_paths if os.path.exists(p)]
+    if not sql_paths:
         return
     conn = _get_conn()
     if conn is None:
@@ -253,13 +898,14 @@ def _ensure_app_views_if_configured() -> None:
     try:
         with conn.cursor() as cur:
             try:
-                with open(sql_path, "r", encoding="utf-8") as f:
-                    text = f.read()
-                parts = [p.strip() for p in text.split(";")]
-                for stmt in parts:
-                    if not stmt:
-                        continue
-                    cur.execute(stmt)
+                for sql_path in sql_paths:
+                    with open(sql_path, "r", encoding="utf-8") as f:
+                        text = f.read()
+                    parts = [p.strip() for p in text.split(";")]
+                    for stmt in parts:
+                        if not stmt:
+                            continue
+                        cur.execute(stmt)
                 conn.commit()
             except Exception:
                 try:
@@ -276,6 +922,12 @@ def _ensure_app_views_if_configured() -> None:
 
 def _resolve_wells_table(source: Optional[str]) -> str:
     s = (source or "sdr").lower()
+    if USE_WELLS_MAT:
+        if s == "sdr":
+            return "app.wells_mat_sdr"
+        if s == "gwdb":
+            return "app.wells_mat_gwdb"
+        return "app.wells_mat"
     if s == "sdr":
         return "app.wells_sdr"
     if s == "gwdb":
@@ -284,6 +936,324 @@ def _resolve_wells_table(source: Optional[str]) -> str:
     return "app.wells"
 
 
+_SOURCE_SCHEMAS = {"sdr": ("ground_truth",), "gwdb": ("gwdb_ground_truth",)}
+
+
+def _data_version(cur, source: Optional[str]) -> Optional[str]:
+    """Version label of the ground truth data currently served for a source.
+
+    Read from the loader's served_versions row for the tables this process queries
+    ('wells_mat' or 'views'), which the loader only moves once those tables hold
+    the new rows; data_versions (latest publish) when there is no such row yet.
+    Single source: e.g. '20261017014500' ('<version>.r<timestamp>' after a
+    --rematerialize). 'all': 'sdr:<v>,gwdb:<v>'. None when nothing is recorded.
+    """
+    s = (source or "sdr").lower()
+    sources = [s] if s in _SOURCE_SCHEMAS else list(_SOURCE_SCHEMAS)
+    cur.execute("SELECT to_regclass(%s), to_regclass(%s)",
+                (f"{GROUND_TRUTH_META_SCHEMA}.data_versions", f"{GROUND_TRUTH_META_SCHEMA}.served_versions"))
+    r = cur.fetchone()
+    if not r or not r[0]:
+        return None
+    bases = [_SOURCE_SCHEMAS[x][0] for x in sources]
+    by_base: dict[str, str] = {}
+    if r[1]:
+        cur.execute(
+            f"SELECT base_schema, version FROM {GROUND_TRUTH_META_SCHEMA}.served_versions "
+            "WHERE base_schema = ANY(%s) AND reader = %s",
+            (bases, "wells_mat" if USE_WELLS_MAT else "views"),
+        )
+        by_base = {row[0]: row[1] for row in cur.fetchall()}
+    missing = [b for b in bases if b not in by_base]
+    if missing:
+        cur.execute(
+            f"SELECT DISTINCT ON (base_schema) base_schema, version FROM {GROUND_TRUTH_META_SCHEMA}.data_versions "
+            "WHERE base_schema = ANY(%s) ORDER BY base_schema, published_at DESC",
+            (missing,),
+        )
+        by_base.update({row[0]: row[1] for row in cur.fetchall()})
+    if len(sources) == 1:
+        return by_base.get(bases[0])
+    parts = [f"{x}:{by_base[b]}" for x, b in zip(sources, bases) if b in by_base]
+    return ",".join(parts) or None
+
+
+_data_versions: dict[str, tuple[float, str]] = {}
+
+
+def _cached_data_version(source: Optional[str]) -> str:
+    """_data_version() re-read from the DB at most every DATA_VERSION_TTL_SEC; 'unversioned' when unknown.
+
+    Cache keys embed this value, so a loader publish invalidates them without any explicit purge.
+    """
+    s = (source or "sdr").lower()
+    now = time.monotonic()
+    hit = _data_versions.get(s)
+    if hit and now - hit[0] < DATA_VERSION_TTL_SEC:
+        return hit[1]
+    version = _with_cursor(lambda cur: _data_version(cur, s), op="data_version") if DATABASE_URL else None
+    label = version or "unversioned"
+    _data_versions[s] = (now, label)
+    return label
+
+
+def _new_result_cache():
+    if RESULT_CACHE_BACKEND == "redis":
+        return RedisResultCache(RESULT_CACHE_REDIS_URL)
+    if RESULT_CACHE_BACKEND == "memory":
+        return MemoryResultCache(RESULT_CACHE_SIZE)
+    return None
+
+
+_result_cache = _new_result_cache()
+# Serves this process while a shared backend errors; keys carry the data version, so nothing stale comes back
+_result_cache_fallback = MemoryResultCache(RESULT_CACHE_SIZE) if RESULT_CACHE_BACKEND == "redis" else None
+_result_cache_stats = {"hits": 0, "misses": 0, "errors": 0}
+_result_cache_stats_lock = threading.Lock()
+
+
+def _result_cache_error(exc: Exception) -> None:
+    with _result_cache_stats_lock:
+        _result_cache_stats["errors"] += 1
+    _log({"event": "result_cache_backend_error", "backend": _result_cache.name, "error": repr(exc)})
+
+
+def _result_cache_get(key: str) -> Optional[object]:
+    if _result_cache is None:
+        return None
+    try:
+        value = _result_cache.get(key)
+    except Exception as exc:
+        _result_cache_error(exc)
+        value = _result_cache_fallback.get(key) if _result_cache_fallback is not None else None
+    with _result_cache_stats_lock:
+        _result_cache_stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def _result_cache_set(key: str, value: object) -> None:
+    if _result_cache is None:
+        return
+    try:
+        _result_cache.set(key, value, RESULT_CACHE_TTL_SEC)
+    except Exception as exc:
+        _result_cache_error(exc)
+        if _result_cache_fallback is not None:
+            _result_cache_fallback.set(key, value, RESULT_CACHE_TTL_SEC)
+
+
+def _conditional_get(request: Request, response: Response, cache_control: str, version: str, *key: object) -> Optional[Response]:
+    """Attach Cache-Control and a strong ETag for (data version, key) to `response`.
+
+    Returns a bodiless 304 when If-None-Match already names that ETag, before any
+    query runs. No ETag is issued while the data version is unknown, since
+    nothing would ever change it.
+    """
+    response.headers["Cache-Control"] = cache_control
+    if version == "unversioned":
+        return None
+    raw = json.dumps([version, *key], default=str, separators=(",", ":"))
+    etag = '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # If-None-Match uses weak comparison: W/"x" matches "x"
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+
+EARTH_RADIUS_M = 6371000.0
+# Great-circle distance (m) from a fixed point (params: lat, lat, lon) to each row's lat/lon
+HAVERSINE_SQL = (
+    "(6371000 * 2 * ASIN(SQRT(POWER(SIN(RADIANS(%s - lat)/2),2) + COS(RADIANS(%s)) * COS(RADIANS(lat)) * POWER(SIN(RADIANS(%s - lon)/2),2))))"
+)
+
+
+def _bbox_around(lat: float, lon: float, radius_m: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle; never smaller than it."""
+    delta_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    # Longitude degrees shrink toward the pole: size the box at the circle's poleward edge
+    cos_lat = max(0.001, math.cos(math.radians(min(89.9, abs(lat) + delta_lat))))
+    delta_lon = math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat))
+    return lat - delta_lat, lat + delta_lat, lon - delta_lon, lon + delta_lon
+
+
+def _bbox_sql(min_lat: str, max_lat: str, min_lon: str, max_lon: str) -> str:
+    """Index-backed bounding-box predicate over SQL expressions (GiST on app.wells_mat.pt; lat/lon ranges on the views)."""
+    if USE_WELLS_MAT:
+        return f"pt <@ box(point({min_lon}, {min_lat}), point({max_lon}, {max_lat}))"
+    return f"lat BETWEEN {min_lat} AND {max_lat} AND lon BETWEEN {min_lon} AND {max_lon}"
+
+
+def _bbox_clause(min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> tuple[str, List[object]]:
+    """_bbox_sql() with bound parameters."""
+    if USE_WELLS_MAT:
+        return _bbox_sql("%s", "%s", "%s", "%s"), [min_lon, min_lat, max_lon, max_lat]
+    return _bbox_sql("%s", "%s", "%s", "%s"), [min_lat, max_lat, min_lon, max_lon]
+
+
+def _radius_clauses(lat: float, lon: float, radius_m: float) -> tuple[List[str], List[object]]:
+    """Bounding-box prefilter (uses the spatial index) plus exact haversine refinement."""
+    box_sql, box_params = _bbox_clause(*_bbox_around(lat, lon, radius_m))
+    return [box_sql, HAVERSINE_SQL + " <= %s"], box_params + [lat, lat, lon, radius_m]
+
+
+def _date_rank_sql() -> str:
+    # app.wells_mat stores this as a generated column; on the views compute it inline
+    if USE_WELLS_MAT:
+        return "date_rank"
+    return "COALESCE(DATE '1970-01-01' - date_completed, 2147483647)"
+
+
+def _encode_cursor(date_completed: Optional[str], well_id: str) -> str:
+    """Opaque keyset cursor from the last row's (date_completed, id)."""
+    raw = json.dumps([date_completed, well_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str]:
+    """Cursor -> (date_rank, id), matching the ORDER BY date_rank, id of /v1/search."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        decoded = json.loads(raw)
+        if not isinstance(decoded, list):
+            raise ValueError("cursor is not a [date_completed, id] pair")
+        date_completed, well_id = decoded
+        if not isinstance(well_id, str):
+            raise ValueError("cursor id is not a string")
+        rank = 2147483647 if date_completed is None else (date(1970, 1, 1) - date.fromisoformat(date_completed)).days
+        return rank, well_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class WellQuery(NamedTuple):
+    """A compiled wells query.
+
+    `shape` names the normalized query form (table, projection and which filters
+    are present) and fully determines `sql`; `params` holds the values in
+    placeholder order. `name` is the prepared-statement name for the shape.
+    """
+    shape: tuple
+    sql: str
+    params: tuple
+    name: str
+
+    @property
+    def cache_key(self) -> str:
+        """Stable key for this exact query (shape + values), for result caching."""
+        raw = json.dumps([self.shape, self.params], default=str, separators=(",", ":"))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# shape -> (sql with %s placeholders, prepared statement name)
+_well_query_sql: dict[tuple, tuple[str, str]] = {}
+# statement name -> PREPARE body with $n placeholders
+_prepare_sql: dict[str, str] = {}
+_prepared_source: dict[str, str] = {}  # statement name -> %s-style SQL (slow-query EXPLAIN)
+# pooled connection -> statement names already prepared on that session
+_prepared_by_conn: "weakref.WeakKeyDictionary[object, set[str]]" = weakref.WeakKeyDictionary()
+
+
+def _compile_well_query(
+    source: Optional[str],
+    *,
+    county: Optional[str] = None,
+    depth_min: Optional[float] = None,
+    depth_max: Optional[float] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    radius_m: Optional[float] = None,
+    bbox: Optional[tuple[float, float, float, float]] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    with_distance: bool = False,
+    typed_dates: bool = False,
+) -> WellQuery:
+    """Single filter-compilation path for search, exports, PDF and batch.
+
+    Selects EXPORT_COLUMNS (date_completed as 'YYYY-MM-DD' text unless typed_dates),
+    plus distance_m from lat/lon when with_distance, ordered newest first by
+    (date_rank, id). bbox is (min_lat, max_lat, min_lon, max_lon).
+    """
+    table = _resolve_wells_table(source)
+    flags: List[str] = []
+    clauses: List[str] = []
+    params: List[object] = []
+    if county:
+        flags.append("county"); clauses.append("county = %s"); params.append(county)
+    if depth_min is not None:
+        flags.append("depth_min"); clauses.append("depth_ft >= %s"); params.append(depth_min)
+    if depth_max is not None:
+        flags.append("depth_max"); clauses.append("depth_ft <= %s"); params.append(depth_max)
+    if date_from:
+        flags.append("date_from"); clauses.append("date_completed >= %s::date"); params.append(date_from)
+    if date_to:
+        flags.append("date_to"); clauses.append("date_completed <= %s::date"); params.append(date_to)
+    if date_from or date_to:
+        clauses.append("date_completed IS NOT NULL")
+    # Radius filter: spatial-index bbox prefilter, then exact haversine distance
+    if lat is not None and lon is not None and radius_m is not None and radius_m > 0:
+        radius_sql, radius_params = _radius_clauses(lat, lon, radius_m)
+        flags.append("radius"); clauses.extend(radius_sql); params.extend(radius_params)
+    if bbox is not None:
+        box_sql, box_params = _bbox_clause(*bbox)
+        flags.append("bbox"); clauses.append(box_sql); params.extend(box_params)
+    rank_sql = _date_rank_sql()
+    if cursor:
+        flags.append("cursor"); clauses.append(f"({rank_sql}, id) > (%s, %s)"); params.extend(_decode_cursor(cursor))
+    distance = with_distance and lat is not None and lon is not None
+    if distance:
+        params = [lat, lat, lon] + params
+    if limit is not None:
+        params.append(limit)
+    shape = (table, typed_dates, distance, tuple(flags), limit is not None)
+    cached = _well_query_sql.get(shape)
+    if cached is None:
+        date_sql = "date_completed" if typed_dates else "to_char(date_completed, 'YYYY-MM-DD')"
+        distance_sql = HAVERSINE_SQL if distance else "NULL::double precision"
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = (
+            f"SELECT id, owner, county, lat, lon, depth_ft, {date_sql}, source, source_id, {distance_sql} "
+            f"FROM {table} {where} ORDER BY {rank_sql}, id" + (" LIMIT %s" if limit is not None else "")
+        )
+        name = "wq_" + hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+        n = iter(range(1, sql.count("%s") + 1))
+        _prepare_sql[name] = re.sub(r"%s", lambda _: f"${next(n)}", sql)
+        _prepared_source[name] = sql
+        cached = _well_query_sql[shape] = (sql, name)
+    return WellQuery(shape, cached[0], tuple(params), cached[1])
+
+
+def _execute_well_query(cur, query: WellQuery) -> None:
+    """Run a compiled query, as a server-side prepared statement on this connection when enabled,
+    so each shape is planned once per pooled session instead of on every request."""
+    if not USE_PREPARED_STATEMENTS:
+        cur.execute(query.sql, query.params)
+        return
+    conn = cur.connection
+    placeholders = ", ".join(["%s"] * len(query.params))
+    execute_sql = f"EXECUTE {query.name}" + (f" ({placeholders})" if query.params else "")
+    for attempt in (1, 2):
+        names = _prepared_by_conn.setdefault(conn, set())
+        try:
+            if query.name not in names:
+                cur.execute(f"PREPARE {query.name} AS {_prepare_sql[query.name]}")
+                names.add(query.name)
+            cur.execute(execute_sql, query.params)
+            return
+        except psycopg2.errors.InvalidSqlStatementName:
+            # Session lost its statements (server reset/DISCARD ALL): forget them and prepare again
+            conn.rollback()
+            _prepared_by_conn.pop(conn, None)
+            if attempt == 2:
+                raise
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
@@ -299,54 +1269,136 @@ def live():
 def ready():
     # basic readiness: can we get a connection
     if not DATABASE_URL:
-        return {"ready": True}
+        return {"ready": True, "log": _log_pipeline.stats()}
     try:
-        c = _get_conn()
-        if c:
-            try:
-                pool and pool.putconn(c)
-            except Exception:
-                pass
-            return {"ready": True}
+        _with_cursor(lambda cur: cur.execute("SELECT 1"), op="ready")
+        return {"ready": True, "pool": pool.stats() if pool is not None else None, "log": _log_pipeline.stats(),
+                "wells_mat": USE_WELLS_MAT, "cluster_rollup": CLUSTER_ROLLUP}
     except Exception:
         pass
-    return JSONResponse(status_code=503, content={"ready": False})
+    return JSONResponse(status_code=503, content={"ready": False, "pool": pool.stats() if pool is not None else None,
+                                                  "log": _log_pipeline.stats()})
+
+
+def _pool_metric(*keys: str):
+    def read():
+        stats = pool.stats() if pool is not None else {}
+        return [((k,), stats[k]) for k in keys if k in stats]
+    return read
+
+
+_metrics.callback("gauge", "txwells_db_pool_connections", "Pooled DB connections by state.", ("state",),
+                  _pool_metric("in_use", "idle"))
+_metrics.callback("gauge", "txwells_db_pool_limit", "Pool bounds (DB_POOL_MIN/DB_POOL_MAX).", ("bound",),
+                  _pool_metric("min", "max"))
+_metrics.callback("gauge", "txwells_db_pool_waiting", "Requests currently waiting for a connection.", (),
+                  lambda: [((), pool.stats()["waiting"])] if pool is not None else [])
+_metrics.callback("counter", "txwells_db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT_SEC.", (),
+                  lambda: [((), pool.stats()["timeouts"])] if pool is not None else [])
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of request, DB, pool, PDF and rate-limit metrics (this process)."""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/v1/admin/slow-queries")
+def admin_slow_queries(request: Request, top: int = Query(default=50, ge=1, le=500)):
+    """Slow executions (newest first, with sampled EXPLAIN ANALYZE plans) and the costliest SQL shapes.
+
+    Requires X-Admin-Token to match ADMIN_TOKEN; not available when ADMIN_TOKEN is unset.
+    """
+    if not ADMIN_TOKEN or not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return _slow_queries.snapshot(top)
+
+
+@app.get("/v1/wells/nearest", response_model=List[SearchItem])
+def nearest_wells(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(default=25, ge=1, le=200),
+    source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$"),
+):
+    """The k wells closest to (lat, lon), nearest first.
+
+    Index-ordered KNN on app.wells_mat.pt (`<->`) finds k candidates; since
+    planar degree distance can misorder points east/west vs north/south, the
+    farthest candidate's true distance then bounds an exact bbox + haversine
+    pass. Both steps are GiST-driven, so cost tracks k, not well density.
+    """
+    if pool is None and not DATABASE_URL:
+        return []
+    table = _resolve_wells_table(source)
+    cols = "id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id"
+
+    def _query(cur):
+        if USE_WELLS_MAT:
+            cur.execute(
+                f"SELECT MAX(d) FROM (SELECT {HAVERSINE_SQL} AS d FROM {table} "
+                "WHERE pt IS NOT NULL ORDER BY pt <-> point(%s, %s) LIMIT %s) knn",
+                (lat, lat, lon, lon, lat, k),
+            )
+            r = cur.fetchone()
+            if not r or r[0] is None:
+                return []
+            radius_sql, radius_params = _radius_clauses(lat, lon, float(r[0]) + 1.0)
+            where = " AND ".join(radius_sql)
+        else:
+            where, radius_params = "lat IS NOT NULL AND lon IS NOT NULL", []
+        cur.execute(
+            f"SELECT {cols}, {HAVERSINE_SQL} AS distance_m FROM {table} WHERE {where} "
+            "ORDER BY distance_m ASC, id ASC LIMIT %s",
+            [lat, lat, lon] + radius_params + [k],
+        )
+        rows = cur.fetchall()
+        return [SearchItem(id=r[0], owner=r[1], county=r[2], lat=r[3], lon=r[4], depth_ft=r[5], date_completed=r[6], source=r[7], source_id=r[8], distance_m=round(r[9], 1)) for r in rows]
+
+    return _with_cursor(_query, op="nearest")
 
 
 @app.get("/v1/wells/{well_id}", response_model=SearchItem)
-def get_well(well_id: str, source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$")):
+def get_well(
+    request: Request,
+    response: Response,
+    well_id: str,
+    source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$"),
+):
     if pool is None and not DATABASE_URL:
         # Stub fallback
         return SearchItem(id=well_id)
-    conn = _get_conn()
-    try:
-        with conn.cursor() as cur:
-            table = _resolve_wells_table(source)
-            cur.execute(
-                """
-                SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id
-                FROM {table}
-                WHERE id = %s
-                LIMIT 1
-                """.format(table=table),
-                (well_id,),
-            )
-            row = cur.fetchone()
-            if not row:
-                return SearchItem(id=well_id)
-            return SearchItem(
-                id=row[0], owner=row[1], county=row[2], lat=row[3], lon=row[4], depth_ft=row[5], date_completed=row[6], source=row[7], source_id=row[8]
-            )
-    finally:
-        if pool is not None and conn is not None:
-            try:
-                pool.putconn(conn)
-            except Exception:
-                pass
+    not_modified = _conditional_get(request, response, CACHE_CONTROL_WELL, _cached_data_version(source), "well", _resolve_wells_table(source), well_id)
+    if not_modified is not None:
+        return not_modified
+
+    def _query(cur):
+        table = _resolve_wells_table(source)
+        cur.execute(
+            """
+            SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id
+            FROM {table}
+            WHERE id = %s
+            LIMIT 1
+            """.format(table=table),
+            (well_id,),
+        )
+        row = cur.fetchone()
+        if not row:
+            return SearchItem(id=well_id)
+        return SearchItem(
+            id=row[0], owner=row[1], county=row[2], lat=row[3], lon=row[4], depth_ft=row[5], date_completed=row[6], source=row[7], source_id=row[8]
+        )
+
+    return _with_cursor(_query, op="well")
 
 
 @app.get("/v1/search", response_model=List[SearchItem])
 def search(
+    request: Request,
+    response: Response,
     county: Optional[str] = Query(default=None),
     depth_min: Optional[float] = Query(default=None),
     depth_max: Optional[float] = Query(default=None),
@@ -355,148 +1407,453 @@ def search(
     lat: Optional[float] = Query(default=None),
     lon: Optional[float] = Query(default=None),
     radius_m: Optional[int] = Query(default=None),
-    limit: int = Query(default=50, ge=1, le=2000),
+    limit: int = Query(default=25, ge=1, le=200, description="Page size; follow X-Next-Cursor for more"),
     source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$"),
+    cursor: Optional[str] = Query(default=None, description="Opaque X-Next-Cursor from the previous page"),
 ):
+    """One page of wells, newest first. When more rows exist the response carries
+    an X-Next-Cursor header; pass it back as `cursor` for the next page (keyset
+    pagination, so deep pages cost the same as the first)."""
     if pool is None and not DATABASE_URL:
         # Stub fallback
         return []
-    clauses = []
-    params: List[object] = []
-    if county:
-        clauses.append("county = %s")
-        params.append(county)
-    if depth_min is not None:
-        clauses.append("depth_ft >= %s")
-        params.append(depth_min)
-    if depth_max is not None:
-        clauses.append("depth_ft <= %s")
-        params.append(depth_max)
-    if date_from:
-        clauses.append("date_completed >= %s::date")
-        params.append(date_from)
-    if date_to:
-        clauses.append("date_completed <= %s::date")
-        params.append(date_to)
-    if date_from or date_to:
-        clauses.append("date_completed IS NOT NULL")
-    # Radius filter using haversine distance approximation to reduce false-positives outside circle
-    if lat is not None and lon is not None and radius_m is not None and radius_m > 0:
-        lat_r = math.radians(lat)
-        lon_r = math.radians(lon)
-        # Use 6371000m Earth radius; implement distance <= radius via SQL expression
-        clauses.append(
-            "(6371000 * 2 * ASIN(SQRT(POWER(SIN(RADIANS(%s - lat)/2),2) + COS(RADIANS(%s)) * COS(RADIANS(lat)) * POWER(SIN(RADIANS(%s - lon)/2),2)))) <= %s"
-        )
-        params.extend([lat, lat, lon, radius_m])
-    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-    table = _resolve_wells_table(source)
-    sql = (
-        "SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id "
-        f"FROM {table} " + where + " ORDER BY date_completed DESC NULLS LAST, id ASC LIMIT %s"
+    # One extra row tells us whether another page exists; distance is returned whenever a point is given
+    query = _compile_well_query(
+        source, county=county, depth_min=depth_min, depth_max=depth_max, date_from=date_from, date_to=date_to,
+        lat=lat, lon=lon, radius_m=radius_m, cursor=cursor, limit=limit + 1, with_distance=True,
     )
-    params.append(limit)
-    conn = _get_conn()
+    version = _cached_data_version(source)
+    not_modified = _conditional_get(request, response, CACHE_CONTROL_SEARCH, version, "search", query.cache_key)
+    if not_modified is not None:
+        return not_modified
+    cache_key = f"search:{version}:{query.cache_key}"
+    cached = _result_cache_get(cache_key)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        if cached["next_cursor"]:
+            response.headers["X-Next-Cursor"] = cached["next_cursor"]
+        return cached["items"]
+    def _query(cur):
+        _execute_well_query(cur, query)
+        return cur.fetchall()
+
+    rows = _with_cursor(_query, op="search")
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][6], rows[-1][0])
+        response.headers["X-Next-Cursor"] = next_cursor
+    items = [SearchItem(id=r[0], owner=r[1], county=r[2], lat=r[3], lon=r[4], depth_ft=r[5], date_completed=r[6], source=r[7], source_id=r[8], distance_m=(round(r[9], 1) if r[9] is not None else None)).model_dump() for r in rows]
+    _result_cache_set(cache_key, {"items": items, "next_cursor": next_cursor})
+    response.headers["X-Cache"] = "MISS"
+    return items
+
+
+EXPORT_COLUMNS = ["id", "owner", "county", "lat", "lon", "depth_ft", "date_completed", "source", "source_id"]
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "geojsonl": "application/geo+json-seq",
+    "gpkg": "application/geopackage+sqlite3",
+}
+
+
+def _export_query(filters: ExportFilters | None, typed: bool) -> tuple[str, List[object]]:
+    """SQL + params for an export of the filtered wells in EXPORT_COLUMNS order.
+
+    typed=True returns date_completed as a date (columnar formats), otherwise 'YYYY-MM-DD' text.
+    A missing, null or 0 limit means every matching row.
+    """
+    f = filters or ExportFilters()
+    query = _compile_well_query(
+        f.source or "sdr", county=f.county, depth_min=f.depth_min, depth_max=f.depth_max,
+        date_from=f.date_from, date_to=f.date_to, lat=f.lat, lon=f.lon, radius_m=f.radius_m,
+        limit=f.limit if f.limit and f.limit > 0 else None, typed_dates=typed,
+    )
+    return query.sql, list(query.params)
+
+
+def _export_batches(filters: ExportFilters | None, typed: bool):
+    """Return a generator of row batches read from a server-side export cursor.
+
+    The connection is checked out inside the generator, which is started before
+    returning: the query is declared and its first batch fetched, so SQL errors
+    surface as a normal error response, and the release in its finally runs when
+    the stream is exhausted or closed, or the generator is garbage collected
+    (client disconnect, response never iterated). Rows are fetched
+    EXPORT_BATCH_ROWS at a time.
+    """
+    sql, params = _export_query(filters, typed)
+
+    def batches():
+        if pool is None and not DATABASE_URL:
+            return
+        for attempt in (1, 2):
+            conn = _get_conn()
+            cur = conn.cursor(name=f"export_{uuid.uuid4().hex}")
+            try:
+                start = time.perf_counter()
+                cur.execute(sql, params)
+                rows = cur.fetchmany(EXPORT_BATCH_ROWS)
+                db_sec = time.perf_counter() - start
+                break
+            except Exception as exc:
+                # A connection the server already dropped fails here; retry once on a fresh one
+                retry = attempt == 1 and isinstance(exc, (psycopg2.OperationalError, psycopg2.InterfaceError)) and conn.closed
+                _release_stream_conn(conn, cur)
+                if not retry:
+                    raise
+        total = 0
+        try:
+            yield None  # primed: the caller consumes this before handing the generator out
+            while rows:
+                total += len(rows)
+                yield rows
+                start = time.perf_counter()
+                rows = cur.fetchmany(EXPORT_BATCH_ROWS)
+                db_sec += time.perf_counter() - start
+        finally:
+            _release_stream_conn(conn, cur)
+            # DB time only (declare + fetches), not time spent encoding or waiting on the client
+            _m_db_query.observe(db_sec, "export")
+            _m_db_rows.observe(total, "export")
+
+    gen = batches()
+    next(gen, None)
+    return gen
+
+
+def _release_stream_conn(conn, cur) -> None:
+    """Close a streaming cursor, end its transaction and return the connection to the pool."""
     try:
-        with conn.cursor() as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-        return [SearchItem(id=r[0], owner=r[1], county=r[2], lat=r[3], lon=r[4], depth_ft=r[5], date_completed=r[6], source=r[7], source_id=r[8]) for r in rows]
+        cur.close()
+        conn.rollback()
+    except Exception:
+        pass
+    if pool is not None:
+        pool.putconn(conn)
+
+
+def _csv_chunks(batches):
+    sio = io.StringIO()
+    writer = csv.writer(sio)
+    writer.writerow(EXPORT_COLUMNS)
+    yield sio.getvalue()
+    for rows in batches:
+        sio.seek(0); sio.truncate(0)
+        for r in rows:
+            writer.writerow([r[0], r[1] or "", r[2] or "", r[3] or "", r[4] or "", r[5] or "", r[6] or "", r[7] or "", r[8] or ""])
+        yield sio.getvalue()
+
+
+def _geojsonl_chunks(batches):
+    """Newline-delimited GeoJSON Features (GeoJSONSeq); wells without coordinates get a null geometry."""
+    for rows in batches:
+        lines = []
+        for r in rows:
+            geometry = {"type": "Point", "coordinates": [r[4], r[3]]} if r[3] is not None and r[4] is not None else None
+            props = {
+                "owner": r[1], "county": r[2], "depth_ft": r[5],
+                "date_completed": r[6].isoformat() if r[6] else None, "source": r[7], "source_id": r[8],
+            }
+            lines.append(json.dumps({"type": "Feature", "id": r[0], "geometry": geometry, "properties": props}, separators=(",", ":")))
+        yield "\n".join(lines) + "\n"
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are handed out (and dropped) by drain()."""
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = bytes(self._buf)
+        self._buf.clear()
+        return out
+
+
+def _arrow_chunks(batches, fmt: str):
+    """Parquet (one row group per batch) or Arrow IPC stream (one record batch per batch)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()), ("owner", pa.string()), ("county", pa.string()),
+        ("lat", pa.float64()), ("lon", pa.float64()), ("depth_ft", pa.float64()),
+        ("date_completed", pa.date32()), ("source", pa.string()), ("source_id", pa.string()),
+    ])
+    sink = _DrainableSink()
+    out = pa.PythonFile(sink, mode="w")
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(out, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(out, schema)
+    try:
+        for rows in batches:
+            cols = list(zip(*rows))
+            writer.write_batch(pa.record_batch([pa.array(c, type=field.type) for c, field in zip(cols, schema)], schema=schema))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
     finally:
-        if pool is not None and conn is not None:
-            pool.putconn(conn)
+        # Release the export cursor now rather than whenever the batch generator is collected
+        batches.close()
 
 
-@app.post("/v1/search.csv")
-def export_search_csv(
-    filters: ReportFilters | None = None,
-):
-    county = filters.county if filters else None
-    depth_min = filters.depth_min if filters else None
-    depth_max = filters.depth_max if filters else None
-    date_from = filters.date_from if filters else None
-    date_to = filters.date_to if filters else None
-    lat = filters.lat if filters else None
-    lon = filters.lon if filters else None
-    radius_m = filters.radius_m if filters else None
-    limit = (filters.limit if (filters and filters.limit) else 1000)
-    source = (filters.source if filters and filters.source else "sdr")
-    """Export current filtered results as CSV. Columns match list view and include lat/lon."""
-    if pool is None and not DATABASE_URL:
-        # Stub empty CSV
-        def _empty_gen():
-            s = io.StringIO()
-            w = csv.writer(s)
-            w.writerow(["id", "owner", "county", "lat", "lon", "depth_ft", "date_completed", "source", "source_id"])
-            yield s.getvalue()
-        filename = f"tx_wells_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        return StreamingResponse(_empty_gen(), media_type="text/csv", headers={
-            "Content-Disposition": f"attachment; filename=\"{filename}\""
-        })
+def _gpkg_point(lon: Optional[float], lat: Optional[float]) -> Optional[bytes]:
+    """GeoPackage binary geometry (little-endian header, no envelope, EPSG:4326) wrapping a WKB point."""
+    if lat is None or lon is None:
+        return None
+    return b"GP" + struct.pack("<BBi", 0, 0x01, 4326) + struct.pack("<BIdd", 1, 1, lon, lat)
 
-    clauses: List[str] = []
-    params: List[object] = []
-    if county:
-        clauses.append("county = %s")
-        params.append(county)
-    if depth_min is not None:
-        clauses.append("depth_ft >= %s")
-        params.append(depth_min)
-    if depth_max is not None:
-        clauses.append("depth_ft <= %s")
-        params.append(depth_max)
-    if date_from:
-        clauses.append("date_completed >= %s::date")
-        params.append(date_from)
-    if date_to:
-        clauses.append("date_completed <= %s::date")
-        params.append(date_to)
-    if date_from or date_to:
-        clauses.append("date_completed IS NOT NULL")
-    if lat is not None and lon is not None and radius_m is not None and radius_m > 0:
-        clauses.append(
-            "(6371000 * 2 * ASIN(SQRT(POWER(SIN(RADIANS(%s - lat)/2),2) + COS(RADIANS(%s)) * COS(RADIANS(lat)) * POWER(SIN(RADIANS(%s - lon)/2),2)))) <= %s"
-        )
-        params.extend([lat, lat, lon, radius_m])
-    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-    table = _resolve_wells_table(source)
-    sql = (
-        "SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id "
-        f"FROM {table} " + where + " ORDER BY date_completed DESC NULLS LAST, id ASC LIMIT %s"
-    )
-    params.append(limit)
 
-    conn = _get_conn()
+def _write_gpkg(batches, path: str) -> None:
+    """Write the export as a GeoPackage 1.2 feature table 'wells' (SQLite, via the standard library)."""
+    import sqlite3
+
+    db = sqlite3.connect(path)
     try:
-        with conn.cursor() as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-
-        def row_iter():
-            sio = io.StringIO()
-            writer = csv.writer(sio)
-            writer.writerow(["id", "owner", "county", "lat", "lon", "depth_ft", "date_completed", "source", "source_id"])
-            yield sio.getvalue()
-            sio.seek(0); sio.truncate(0)
+        db.executescript(
+            "PRAGMA application_id = 1196444487;"  # 'GPKG'
+            "PRAGMA user_version = 10200;"
+            "CREATE TABLE gpkg_spatial_ref_sys (srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY, organization TEXT NOT NULL,"
+            " organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT);"
+            "CREATE TABLE gpkg_contents (table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,"
+            " description TEXT DEFAULT '', last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ','now')),"
+            " min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, srs_id INTEGER REFERENCES gpkg_spatial_ref_sys(srs_id));"
+            "CREATE TABLE gpkg_geometry_columns (table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,"
+            " srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL, PRIMARY KEY (table_name, column_name));"
+            "CREATE TABLE wells (fid INTEGER PRIMARY KEY AUTOINCREMENT, geom POINT, id TEXT, owner TEXT, county TEXT,"
+            " depth_ft DOUBLE, date_completed DATE, source TEXT, source_id TEXT);"
+        )
+        db.executemany("INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", [
+            ("Undefined cartesian SRS", -1, "NONE", -1, "undefined", None),
+            ("Undefined geographic SRS", 0, "NONE", 0, "undefined", None),
+            ("WGS 84 geodetic", 4326, "EPSG", 4326,
+             'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],'
+             'AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],'
+             'UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]]', None),
+        ])
+        db.execute("INSERT INTO gpkg_geometry_columns VALUES ('wells', 'geom', 'POINT', 4326, 0, 0)")
+        extent: Optional[List[float]] = None  # [min_x, min_y, max_x, max_y]
+        for rows in batches:
+            db.executemany(
+                "INSERT INTO wells (geom, id, owner, county, depth_ft, date_completed, source, source_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(_gpkg_point(r[4], r[3]), r[0], r[1], r[2], r[5], r[6].isoformat() if r[6] else None, r[7], r[8]) for r in rows],
+            )
             for r in rows:
-                writer.writerow([r[0], r[1] or "", r[2] or "", r[3] or "", r[4] or "", r[5] or "", r[6] or "", r[7] or "", r[8] or ""])
-                yield sio.getvalue()
-                sio.seek(0); sio.truncate(0)
-
-        filename = f"tx_wells_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        return StreamingResponse(row_iter(), media_type="text/csv", headers={
-            "Content-Disposition": f"attachment; filename=\"{filename}\""
-        })
+                if r[3] is None or r[4] is None:
+                    continue
+                if extent is None:
+                    extent = [r[4], r[3], r[4], r[3]]
+                else:
+                    extent = [min(extent[0], r[4]), min(extent[1], r[3]), max(extent[2], r[4]), max(extent[3], r[3])]
+        db.execute(
+            "INSERT INTO gpkg_contents (table_name, data_type, identifier, min_x, min_y, max_x, max_y, srs_id) "
+            "VALUES ('wells', 'features', 'wells', ?, ?, ?, ?, 4326)",
+            extent or [None, None, None, None],
+        )
+        db.commit()
     finally:
-        if pool is not None and conn is not None:
-            pool.putconn(conn)
+        db.close()
 
 
-@app.post("/v1/reports", response_class=StreamingResponse)
-def export_pdf(
-    format: str = Query(default="pdf", pattern="^(pdf)$"),
-    filters: ReportFilters | None = None,
+def _file_chunks(f, chunk_size: int = 1 << 20):
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _require_export_format(fmt: str) -> None:
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"unknown export format {fmt!r}")
+    if fmt in ("parquet", "arrow"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail=f"{fmt} export requires pyarrow")
+
+
+def _export_chunks(batches, fmt: str):
+    """Encode row batches (typed unless fmt is csv) as an iterator of `fmt` chunks (str or bytes)."""
+    if fmt == "csv":
+        return _csv_chunks(batches)
+    if fmt == "geojsonl":
+        return _geojsonl_chunks(batches)
+    if fmt == "gpkg":
+        # SQLite needs a seekable file: build it on disk batch by batch, then stream it
+        fd, path = tempfile.mkstemp(suffix=".gpkg")
+        os.close(fd)
+        try:
+            _write_gpkg(batches, path)
+            f = open(path, "rb")
+        finally:
+            batches.close()
+            # Unlinked while open: the space is freed when the handle closes, even if the
+            # response is never iterated, so nothing depends on the generator's cleanup
+            os.remove(path)
+        return _file_chunks(f)
+    return _arrow_chunks(batches, fmt)
+
+
+def _export_response(filters: ExportFilters | None, fmt: str) -> StreamingResponse:
+    _require_export_format(fmt)
+    body = _export_chunks(_export_batches(filters, typed=fmt != "csv"), fmt)
+    filename = f"tx_wells_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+    return StreamingResponse(body, media_type=EXPORT_MEDIA_TYPES[fmt], headers={
+        "Content-Disposition": f"attachment; filename=\"{filename}\""
+    })
+
+
+@app.post("/v1/search.csv")
+def export_search_csv(
+    filters: ExportFilters | None = None,
 ):
+    """Export current filtered results as CSV. Columns match list view and include lat/lon.
+
+    Rows are streamed from a server-side cursor in EXPORT_BATCH_ROWS batches, so
+    memory stays flat regardless of size; every matching row unless a positive limit is sent.
+    The DB connection is held for the life of the stream.
+    """
+    return _export_response(filters, "csv")
+
+
+@app.post("/v1/search.parquet")
+def export_search_parquet(filters: ExportFilters | None = None):
+    """Typed Parquet export (zstd, one row group per EXPORT_BATCH_ROWS rows); same filters as CSV."""
+    return _export_response(filters, "parquet")
+
+
+@app.post("/v1/search.arrow")
+def export_search_arrow(filters: ExportFilters | None = None):
+    """Arrow IPC stream export, one record batch per EXPORT_BATCH_ROWS rows."""
+    return _export_response(filters, "arrow")
+
+
+@app.post("/v1/search.geojsonl")
+def export_search_geojsonl(filters: ExportFilters | None = None):
+    """Newline-delimited GeoJSON Feature export (EPSG:4326 points)."""
+    return _export_response(filters, "geojsonl")
+
+
+@app.post("/v1/search.gpkg")
+def export_search_gpkg(filters: ExportFilters | None = None):
+    """GeoPackage export (point layer 'wells'), built in a temp file and then streamed."""
+    return _export_response(filters, "gpkg")
+
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+_pdf_slots = threading.BoundedSemaphore(max(1, PDF_MAX_INFLIGHT))
+
+
+def _pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                # spawn, not fork: a forked child would inherit locks held by the pool/maintenance threads.
+                # Everything submitted lives in pdf_render, so a worker never imports this module
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=pdf_worker_init,
+                initargs=(PDF_WORKER_NICE,),
+            )
+        return _pdf_pool
+
+
+def _reset_pdf_executor(broken: ProcessPoolExecutor) -> None:
+    """Forget a pool whose worker died so the next render starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is broken:
+            _pdf_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _shutdown_pdf_executor() -> None:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        p, _pdf_pool = _pdf_pool, None
+    if p is not None:
+        p.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_pdf(fn, *args, timeout: Optional[float] = PDF_QUEUE_TIMEOUT_SEC) -> Future:
+    """Queue fn(*args) -> PDF bytes (fn: a pdf_render builder) on the render pool and return its Future.
+
+    At most PDF_MAX_INFLIGHT renders are queued or running across all requests;
+    beyond that the caller waits up to `timeout` seconds (None: until a slot frees)
+    and then gets PdfQueueFull. The slot is released when the render finishes.
+    """
+    if not _pdf_slots.acquire(timeout=timeout):
+        raise PdfQueueFull(f"no PDF render slot free within {timeout:g}s")
+    try:
+        if PDF_WORKERS > 0:
+            executor = _pdf_executor()
+            try:
+                inner = executor.submit(render_timed, fn, *args)
+            except BrokenProcessPool:
+                _reset_pdf_executor(executor)
+                executor = _pdf_executor()
+                inner = executor.submit(render_timed, fn, *args)
+        else:
+            executor = None
+            inner = Future()
+            try:
+                inner.set_result(render_timed(fn, *args))
+            except Exception as exc:
+                inner.set_exception(exc)
+    except BaseException:
+        _pdf_slots.release()
+        raise
+
+    # Callers get the PDF bytes; the timings are recorded here, in the API process
+    fut: Future = Future()
+    kind = fn.__name__.removeprefix("render_").removesuffix("_pdf")
+
+    def _done(f: Future) -> None:
+        _pdf_slots.release()
+        if f.cancelled():
+            fut.cancel()
+            return
+        exc = f.exception()
+        if executor is not None and isinstance(exc, BrokenProcessPool):
+            _reset_pdf_executor(executor)
+        if fut.cancelled():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+            return
+        pdf, seconds, fetches = f.result()
+        _m_pdf_render.observe(seconds, kind)
+        for sec, ok in fetches:
+            _m_tile_fetch.observe(sec, "ok" if ok else "error")
+        fut.set_result(pdf)
+
+    fut.add_done_callback(lambda f: inner.cancel() if f.cancelled() else None)
+    inner.add_done_callback(_done)
+    return fut
+
+
+def _report_pdf_args(filters: ReportFilters | None) -> tuple:
+    """Load the /v1/reports rows and as-of date; returns the render_report_pdf arguments."""
     # Unpack filters (supports both body and missing body)
     county = filters.county if filters else None
     depth_min = filters.depth_min if filters else None
@@ -508,239 +1865,478 @@ def export_pdf(
     radius_m = filters.radius_m if filters else None
     limit = (filters.limit if (filters and filters.limit) else 100)
     source = (filters.source if (filters and filters.source) else "sdr")
-    """Simple PDF export summarizing current result set (first page list)."""
-    # Reuse the same filter building
-    clauses: List[str] = []
-    params: List[object] = []
-    if county:
-        clauses.append("county = %s"); params.append(county)
-    if depth_min is not None:
-        clauses.append("depth_ft >= %s"); params.append(depth_min)
-    if depth_max is not None:
-        clauses.append("depth_ft <= %s"); params.append(depth_max)
-    if date_from:
-        clauses.append("date_completed >= %s::date"); params.append(date_from)
-    if date_to:
-        clauses.append("date_completed <= %s::date"); params.append(date_to)
-    if date_from or date_to:
-        clauses.append("date_completed IS NOT NULL")
-    if lat is not None and lon is not None and radius_m is not None and radius_m > 0:
-        clauses.append(
-            "(6371000 * 2 * ASIN(SQRT(POWER(SIN(RADIANS(%s - lat)/2),2) + COS(RADIANS(%s)) * COS(RADIANS(lat)) * POWER(SIN(RADIANS(%s - lon)/2),2)))) <= %s"
-        ); params.extend([lat, lat, lon, radius_m])
-    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-    table = _resolve_wells_table(source)
-    sql = (
-        "SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id "
-        f"FROM {table} " + where + " ORDER BY date_completed DESC NULLS LAST, id ASC LIMIT %s"
+    query = _compile_well_query(
+        source, county=county, depth_min=depth_min, depth_max=depth_max, date_from=date_from, date_to=date_to,
+        lat=lat, lon=lon, radius_m=radius_m, limit=limit,
     )
-    params.append(limit)
+    table = _resolve_wells_table(source)
 
     rows: List[tuple] = []
     as_of: Optional[str] = None
 
-    def _load_rows_and_asof(cn) -> tuple[list[tuple], Optional[str]]:
-        with cn.cursor() as cur:
-            cur.execute(sql, params)
-            rs = cur.fetchall()
-            cur.execute(f"SELECT to_char(MAX(date_completed), 'YYYY-MM-DD') FROM {table}")
-            r = cur.fetchone()
-            return rs, (r[0] if r and r[0] else None)
+    def _load_rows_and_asof(cur) -> tuple[list[tuple], Optional[str]]:
+        _execute_well_query(cur, query)
+        rs = cur.fetchall()
+        cur.execute(f"SELECT to_char(MAX(date_completed), 'YYYY-MM-DD') FROM {table}")
+        r = cur.fetchone()
+        return rs, (r[0] if r and r[0] else None)
 
-    conn_primary = _get_conn()
-    if conn_primary is not None:
-        try:
-            try:
-                rows, as_of = _load_rows_and_asof(conn_primary)
-            except psycopg2.OperationalError:
-                # Retry once with a fresh connection
-                conn_retry = _get_conn()
-                if conn_retry is not None:
-                    try:
-                        rows, as_of = _load_rows_and_asof(conn_retry)
-                    finally:
-                        try:
-                            pool and pool.putconn(conn_retry)
-                        except Exception:
-                            pass
-        finally:
-            try:
-                pool and pool.putconn(conn_primary)
-            except Exception:
-                pass
+    if DATABASE_URL:
+        # _with_cursor retries once on a fresh connection if this one was dropped
+        rows, as_of = _with_cursor(_load_rows_and_asof, op="report")
+        _m_db_rows.observe(len(rows), "report")
+    return rows, as_of, county, depth_min, depth_max, date_from, date_to, lat, lon, radius_m, STATICMAP_TILE_URL
 
-    def pdf_iter():
-        buf = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buf, pagesize=letter, leftMargin=0.75*inch, rightMargin=0.75*inch,
-            topMargin=0.75*inch, bottomMargin=0.75*inch
-        )
-        styles = getSampleStyleSheet()
-        elements = []
-
-        title = Paragraph("TX Well Lookup — Results", styles['Title'])
-        when = datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
-        meta_parts = [f"Generated: {when}"]
-        if as_of:
-            meta_parts.append(f"as-of {as_of}")
-        # Filter summary
-        filt = []
-        if county: filt.append(f"County: {county}")
-        if depth_min is not None: filt.append(f"Depth ≥ {depth_min}")
-        if depth_max is not None: filt.append(f"Depth ≤ {depth_max}")
-        if date_from: filt.append(f"From: {date_from}")
-        if date_to: filt.append(f"To: {date_to}")
-        if radius_m and lat is not None and lon is not None:
-            filt.append(f"Radius: {radius_m} m @ {lat:.4f},{lon:.4f}")
-        meta_line = Paragraph(" | ".join(meta_parts), styles['Normal'])
-        filt_line = Paragraph("Filters: " + (", ".join(filt) if filt else "None"), styles['Normal'])
-
-        elements += [title, Spacer(1, 8), meta_line, Spacer(1, 4), filt_line, Spacer(1, 16)]
-
-        # Map snapshot (server-side render via staticmap)
-        try:
-            from staticmap import StaticMap, CircleMarker, IconMarker
-            latlons = [(r[3], r[4]) for r in rows if r[3] is not None and r[4] is not None]
-            # Higher pixel resolution for sharper rendering in PDF
-            img_w, img_h = 1600, 800
-            m = StaticMap(
-                img_w,
-                img_h,
-                padding_x=60,
-                padding_y=60,
-                url_template='https://tile.openstreetmap.org/{z}/{x}/{y}.png'
-            )
-            # Try to use Leaflet's default pin icon for visual parity with the site
-            leaflet_icon_path = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), '..', 'apps', 'web', 'node_modules', 'leaflet', 'dist', 'images', 'marker-icon.png')
-            )
-            use_leaflet_icon = os.path.exists(leaflet_icon_path)
-            for ll in latlons[:200]:
-                if use_leaflet_icon:
-                    try:
-                        m.add_marker(IconMarker((float(ll[1]), float(ll[0])), leaflet_icon_path, 12, 41))
-                    except Exception:
-                        m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
-                else:
-                    m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
-            zoom: int | None = None
-            center: tuple[float, float] | None = None
-            if radius_m and lat is not None and lon is not None:
-                # Radius-aware zoom around provided center
-                center = (float(lon), float(lat))
-                c_lat = float(lat)
-                # Slightly less tight than before
-                desired_width_m = max(1000.0, 2.0 * float(radius_m))
-                mpp_equator = 156543.03392
-                cos_lat = max(0.001, math.cos(math.radians(c_lat)))
-                zoom_calc = int(math.log2((mpp_equator * cos_lat * img_w) / desired_width_m))
-                zoom = max(3, min(17, zoom_calc))
-            elif latlons:
-                # Start from auto-fit but nudge one level out for more context
-                try:
-                    auto_zoom = m._calculate_zoom()  # type: ignore[attr-defined]
-                except Exception:
-                    auto_zoom = None
-                if auto_zoom is not None:
-                    zoom = max(3, min(17, auto_zoom))
-                else:
-                    zoom = None
-            else:
-                # Default to Texas center, a bit more zoomed-in
-                center = (-99.0, 31.0)
-                zoom = 6
-            if radius_m and lat is not None and lon is not None:
-                center_marker = CircleMarker((float(lon), float(lat)), '#ef4444', 8)
-                m.add_marker(center_marker)
-            image = m.render(zoom=zoom, center=center)
-            out = io.BytesIO()
-            image.save(out, format='PNG')
-            out.seek(0)
-            # Scale to available doc width, preserve aspect
-            map_img = Image(out, width=doc.width, height=doc.width * (img_h / img_w))
-            elements += [map_img, Spacer(1, 12), Paragraph("Map data © OpenStreetMap contributors", styles['Normal']), Spacer(1, 16)]
-        except Exception:
-            pass
 
-        data = [["Well ID", "Source", "Owner", "County", "Depth (ft)", "Completed", "Source ID"]]
-        for r in rows:
-            data.append([r[0], r[7] or "", r[1] or "", r[2] or "", r[5] or "", r[6] or "", r[8] or ""])
-
-        # Column widths tuned for letter page
-        col_widths = [1.2*inch, 0.9*inch, 2.4*inch, 1.2*inch, 1.0*inch, 1.1*inch, 1.6*inch]
-        tbl = Table(data, colWidths=col_widths, repeatRows=1)
-        tbl.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#1f2937')),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 10),
-            ('ALIGN', (0,0), (-1,0), 'LEFT'),
-            ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-            ('FONTSIZE', (0,1), (-1,-1), 9),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
-        elements.append(tbl)
-
-        def add_footer(canvas_obj, doc_obj):
-            canvas_obj.setFont('Helvetica', 8)
-            page_num = canvas_obj.getPageNumber()
-            canvas_obj.drawRightString(doc_obj.pagesize[0]-0.75*inch, 0.5*inch, f"Page {page_num}")
-
-        doc.build(elements, onFirstPage=add_footer, onLaterPages=add_footer)
-        buf.seek(0)
-        yield buf.getvalue()
+@app.post("/v1/reports", response_class=StreamingResponse)
+async def export_pdf(
+    format: str = Query(default="pdf", pattern="^(pdf)$"),
+    filters: ReportFilters | None = None,
+):
+    """Simple PDF export summarizing current result set (first page list)."""
+    args = await anyio.to_thread.run_sync(_report_pdf_args, filters)
+
+    # Rendering runs in the PDF process pool; awaiting it keeps this request off the worker threads
+    fut = await anyio.to_thread.run_sync(lambda: _submit_pdf(render_report_pdf, *args))
+    pdf = await asyncio.wrap_future(fut)
 
     filename = f"tx_wells_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    return StreamingResponse(pdf_iter(), media_type="application/pdf", headers={
+    return StreamingResponse(iter([pdf]), media_type="application/pdf", headers={
         "Content-Disposition": f"attachment; filename=\"{filename}\""
     })
 
 
-@app.get("/v1/meta")
-def meta(source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$")):
-    if pool is None and not DATABASE_URL:
-        return {"as_of": None}
-    conn = _get_conn()
+def _parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+    """'min_lon,min_lat,max_lon,max_lat' -> (min_lat, max_lat, min_lon, max_lon)."""
     try:
-        with conn.cursor() as cur:
-            table = _resolve_wells_table(source)
-            cur.execute(f"SELECT to_char(MAX(date_completed), 'YYYY-MM-DD') FROM {table}")
-            row = cur.fetchone()
-            return {"as_of": row[0] if row and row[0] else None}
-    finally:
-        if pool is not None and conn is not None:
-            pool.putconn(conn)
-
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="bbox min must not exceed max")
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def _mercator_cell(lat: float, lon: float, cell_zoom: int) -> tuple[int, int]:
+    """Web Mercator tile (x, y) containing a point at cell_zoom (same formula as the loader rollup)."""
+    lat = max(-85.0511, min(85.0511, lat))
+    n = 2 ** cell_zoom
+    x = math.floor((lon + 180.0) / 360.0 * n)
+    lat_r = math.radians(lat)
+    y = math.floor((1 - math.log(math.tan(lat_r) + 1 / math.cos(lat_r)) / math.pi) / 2 * n)
+    return x, y
+
+
+def _cluster_rows(cur, source: Optional[str], zoom: int, x0: int, x1: int, y0: int, y1: int) -> List[tuple]:
+    """Cluster cells for `zoom` whose cell (at zoom + CLUSTER_CELL_ZOOM_OFFSET) is in x0..x1, y0..y1.
+
+    Rows: (lat, lon, count, depth_min, depth_max, depth_avg, date_min, date_max). From the
+    app.wells_clusters rollup when CLUSTER_ROLLUP, else aggregated from the wells table being
+    read with the loader's cell formula (the views fallback: slower, bounded by the cells' bbox).
+    """
+    if CLUSTER_ROLLUP:
+        s = (source or "sdr").lower()
+        sources = [s] if s in _SOURCE_SCHEMAS else list(_SOURCE_SCHEMAS)
+        cur.execute(
+            "SELECT SUM(sum_lat) / SUM(n), SUM(sum_lon) / SUM(n), SUM(n), MIN(min_depth), MAX(max_depth), "
+            "SUM(sum_depth) / NULLIF(SUM(n_depth), 0), to_char(MIN(min_date), 'YYYY-MM-DD'), to_char(MAX(max_date), 'YYYY-MM-DD') "
+            "FROM app.wells_clusters WHERE source = ANY(%s) AND zoom = %s AND cx BETWEEN %s AND %s AND cy BETWEEN %s AND %s "
+            "GROUP BY cx, cy",
+            (sources, zoom, x0, x1, y0, y1),
+        )
+        return cur.fetchall()
+    cell_zoom = zoom + CLUSTER_CELL_ZOOM_OFFSET
+    min_lat, _, min_lon, _ = _tile_bounds(cell_zoom, x0, y1)
+    _, max_lat, _, max_lon = _tile_bounds(cell_zoom, x1, y0)
+    box_sql, box_params = _bbox_clause(min_lat, max_lat, min_lon, max_lon)
+    cur.execute(
+        "SELECT AVG(lat), AVG(lon), COUNT(*), MIN(depth_ft), MAX(depth_ft), AVG(depth_ft), "
+        "to_char(MIN(date_completed), 'YYYY-MM-DD'), to_char(MAX(date_completed), 'YYYY-MM-DD') "
+        "FROM ("
+        "  SELECT lat, lon, depth_ft, date_completed,"
+        "    floor((lon + 180.0) / 360.0 * 2 ^ %s)::integer AS cx,"
+        "    floor((1 - ln(tan(radians(lat)) + 1 / cos(radians(lat))) / pi()) / 2 * 2 ^ %s)::integer AS cy"
+        f"  FROM {_resolve_wells_table(source)} WHERE {box_sql}"
+        ") cells WHERE cx BETWEEN %s AND %s AND cy BETWEEN %s AND %s GROUP BY cx, cy",
+        [cell_zoom, cell_zoom] + box_params + [x0, x1, y0, y1],
+    )
+    return cur.fetchall()
 
 
-@app.post("/v1/batch")
-def batch_zip(
-    file: UploadFile = File(...),
-    limit: int = Query(default=50, ge=1, le=50),
+@app.get("/v1/clusters", response_model=ClustersResponse)
+def clusters(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22),
+    source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$"),
 ):
-    """Accept a small CSV of addresses or lat/lon and return a ZIP of PDFs.
-    CSV columns (any one of):
-      - address (freeform)
-      - lat, lon
+    """Map aggregation for a viewport.
+
+    Up to CLUSTER_MAX_ZOOM, returns per-cell counts (64 px cells), centroids and
+    depth/date summaries from the precomputed app.wells_clusters rollup (aggregated
+    per request when the API reads the views; see _cluster_rows). Above
+    it, returns the individual wells in the bbox (GiST), capped at
+    CLUSTER_POINTS_LIMIT.
     """
-    # Read CSV
+    min_lat, max_lat, min_lon, max_lon = _parse_bbox(bbox)
+    mode = "clusters" if zoom <= CLUSTER_MAX_ZOOM else "points"
+    if pool is None and not DATABASE_URL:
+        return ClustersResponse(zoom=zoom, mode=mode)
+
+    def _query(cur):
+        if mode == "clusters":
+            cell_zoom = zoom + CLUSTER_CELL_ZOOM_OFFSET
+            # Mercator y grows southward: the bbox's north edge has the smallest cy
+            x0, y0 = _mercator_cell(max_lat, min_lon, cell_zoom)
+            x1, y1 = _mercator_cell(min_lat, max_lon, cell_zoom)
+            cells = [
+                ClusterCell(lat=r[0], lon=r[1], count=r[2], depth_ft_min=r[3], depth_ft_max=r[4],
+                            depth_ft_avg=(round(r[5], 1) if r[5] is not None else None), date_min=r[6], date_max=r[7])
+                for r in _cluster_rows(cur, source, zoom, x0, x1, y0, y1)
+            ]
+            return ClustersResponse(zoom=zoom, mode=mode, cells=cells)
+        box_sql, box_params = _bbox_clause(min_lat, max_lat, min_lon, max_lon)
+        cur.execute(
+            "SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, source_id "
+            f"FROM {_resolve_wells_table(source)} WHERE {box_sql} LIMIT %s",
+            box_params + [CLUSTER_POINTS_LIMIT + 1],
+        )
+        rows = cur.fetchall()
+        points = [SearchItem(id=r[0], owner=r[1], county=r[2], lat=r[3], lon=r[4], depth_ft=r[5], date_completed=r[6], source=r[7], source_id=r[8]) for r in rows[:CLUSTER_POINTS_LIMIT]]
+        return ClustersResponse(zoom=zoom, mode=mode, points=points, truncated=len(rows) > CLUSTER_POINTS_LIMIT)
+
+    return _with_cursor(_query, op="clusters")
+
+
+def _pb_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _pb_field(field: int, wire_type: int, payload: bytes | int) -> bytes:
+    """One protobuf field: varint (wire type 0) or length-delimited (wire type 2)."""
+    if wire_type == 0:
+        return _pb_varint((field << 3) | 0) + _pb_varint(int(payload))
+    return _pb_varint((field << 3) | 2) + _pb_varint(len(payload)) + payload
+
+
+def _pb_packed(field: int, values: List[int]) -> bytes:
+    return _pb_field(field, 2, b"".join(_pb_varint(v) for v in values))
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _mvt_value(v: object) -> bytes:
+    # vector_tile.proto Value: string_value=1, double_value=3, int_value=4, bool_value=7
+    if isinstance(v, bool):
+        return _pb_field(7, 0, int(v))
+    if isinstance(v, int):
+        return _pb_field(4, 0, v & 0xFFFFFFFFFFFFFFFF)
+    if isinstance(v, float):
+        return _pb_varint((3 << 3) | 1) + struct.pack("<d", v)
+    return _pb_field(1, 2, str(v).encode("utf-8"))
+
+
+def _mvt_layer(name: str, features: List[tuple[int, int, dict]]) -> bytes:
+    """Encode a point layer. features: (tile_x, tile_y, properties) in TILE_EXTENT units."""
+    keys: dict[str, int] = {}
+    values: dict[tuple[type, object], int] = {}
+    body = bytearray()
+    for px, py, props in features:
+        tags: List[int] = []
+        for k, v in props.items():
+            if v is None:
+                continue
+            tags.append(keys.setdefault(k, len(keys)))
+            tags.append(values.setdefault((type(v), v), len(values)))
+        # MoveTo(1) command with one point, zigzag-encoded from the tile origin
+        feature = _pb_packed(2, tags) + _pb_field(3, 0, 1) + _pb_packed(4, [9, _zigzag(px), _zigzag(py)])
+        body += _pb_field(2, 2, feature)
+    out = _pb_field(15, 0, 2) + _pb_field(1, 2, name.encode("utf-8")) + bytes(body)
+    out += b"".join(_pb_field(3, 2, k.encode("utf-8")) for k in keys)
+    out += b"".join(_pb_field(4, 2, _mvt_value(v)) for _, v in values)
+    return out + _pb_field(5, 0, TILE_EXTENT)
+
+
+def _tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) of a Web Mercator tile."""
+    n = 2 ** z
+
+    def lat(ty: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lat(y + 1), lat(y), x / n * 360.0 - 180.0, (x + 1) / n * 360.0 - 180.0
+
+
+def _tile_xy(lat: float, lon: float, z: int, x: int, y: int) -> tuple[int, int]:
+    """Point position inside tile (z, x, y) in TILE_EXTENT units."""
+    n = 2 ** z
+    lat_r = math.radians(max(-85.0511, min(85.0511, lat)))
+    fx = (lon + 180.0) / 360.0 * n
+    fy = (1 - math.log(math.tan(lat_r) + 1 / math.cos(lat_r)) / math.pi) / 2 * n
+    return int((fx - x) * TILE_EXTENT), int((fy - y) * TILE_EXTENT)
+
+
+_tile_cache: OrderedDict[str, bytes] = OrderedDict()
+_tile_cache_lock = threading.Lock()
+
+
+def _tile_cache_get(key: str) -> Optional[bytes]:
+    with _tile_cache_lock:
+        data = _tile_cache.get(key)
+        if data is not None:
+            _tile_cache.move_to_end(key)
+            return data
+    if not TILE_CACHE_DIR:
+        return None
     try:
-        content = file.file.read()
-    finally:
+        with open(os.path.join(TILE_CACHE_DIR, key + ".mvt"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    _tile_cache_put(key, data, persist=False)
+    return data
+
+
+def _tile_cache_put(key: str, data: bytes, persist: bool = True) -> None:
+    with _tile_cache_lock:
+        _tile_cache[key] = data
+        _tile_cache.move_to_end(key)
+        while len(_tile_cache) > TILE_CACHE_SIZE:
+            _tile_cache.popitem(last=False)
+    if persist and TILE_CACHE_DIR:
+        path = os.path.join(TILE_CACHE_DIR, key + ".mvt")
         try:
-            file.file.close()
-        except Exception:
-            pass
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as exc:
+            _log({"event": "tile_cache_write_error", "path": path, "error": repr(exc)})
+
+
+def _cluster_tile_layer(cur, source: str, z: int, x: int, y: int) -> bytes:
+    span = 2 ** CLUSTER_CELL_ZOOM_OFFSET
+    rows = _cluster_rows(cur, source, z, x * span, x * span + span - 1, y * span, y * span + span - 1)
+    features = [
+        (*_tile_xy(r[0], r[1], z, x, y), {
+            "count": int(r[2]),
+            "depth_ft_avg": round(float(r[5]), 1) if r[5] is not None else None,
+            "date_min": r[6],
+            "date_max": r[7],
+        })
+        for r in rows
+    ]
+    return _pb_field(3, 2, _mvt_layer("clusters", features))
+
+
+def _render_tile(source: str, z: int, x: int, y: int) -> bytes:
+    min_lat, max_lat, min_lon, max_lon = _tile_bounds(z, x, y)
+
+    def _query(cur):
+        if z < TILE_POINTS_MIN_ZOOM:
+            return _cluster_tile_layer(cur, source, z, x, y)
+        box_sql, box_params = _bbox_clause(min_lat, max_lat, min_lon, max_lon)
+        # One row past the cap tells us the tile is too dense to ship as points
+        cur.execute(
+            "SELECT id, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD'), source, location_confidence "
+            f"FROM {_resolve_wells_table(source)} WHERE {box_sql} LIMIT %s",
+            box_params + [TILE_MAX_POINTS + 1],
+        )
+        rows = cur.fetchall()
+        if len(rows) > TILE_MAX_POINTS:
+            if z <= CLUSTER_MAX_ZOOM:
+                return _cluster_tile_layer(cur, source, z, x, y)
+            _log({"event": "tile_points_truncated", "source": source, "z": z, "x": x, "y": y, "max_points": TILE_MAX_POINTS})
+            rows = rows[:TILE_MAX_POINTS]
+        features = [
+            (*_tile_xy(r[1], r[2], z, x, y), {
+                "id": r[0],
+                "depth_ft": float(r[3]) if r[3] is not None else None,
+                "date_completed": r[4],
+                "source": r[5],
+                "location_confidence": r[6],
+            })
+            for r in rows
+        ]
+        return _pb_field(3, 2, _mvt_layer("wells", features))
+
+    return _with_cursor(_query, op="tile")
+
+
+# Data version whose on-disk tiles each source last served; other version directories are pruned
+_tile_disk_versions: dict[str, str] = {}
+
+
+def _prune_tile_dirs(source: str, keep: str) -> None:
+    """Remove TILE_CACHE_DIR/<source>/<version> directories of data versions other than `keep`."""
+    root = os.path.join(TILE_CACHE_DIR, source)
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return
+    for name in names:
+        if name != keep:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+            _log({"event": "tile_cache_pruned", "source": source, "version": name})
+
+
+@app.get("/v1/tiles/{source}/{z}/{x}/{y}.mvt")
+def wells_tile(source: str, z: int, x: int, y: int):
+    """Mapbox Vector Tile of wells.
+
+    Layer 'wells' (one point per well: id, depth_ft, date_completed, source,
+    location_confidence) from zoom TILE_POINTS_MIN_ZOOM, layer 'clusters' (count,
+    depth_ft_avg, date range; see _cluster_rows) below it and for tiles with
+    more than TILE_MAX_POINTS wells. Tiles are cached in memory (LRU) and, when
+    TILE_CACHE_DIR is set, on disk under <source>/<data_version>/z/x/y.mvt, so a
+    reload invalidates them by changing the key; older version directories are
+    removed once a new version is served.
+    """
+    source = source.lower()
+    if source not in ("sdr", "gwdb", "all"):
+        raise HTTPException(status_code=404, detail="Unknown tile source")
+    if z < 0 or z > 22 or not (0 <= x < 2 ** z) or not (0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Tile out of range")
+    media_type = "application/vnd.mapbox-vector-tile"
+    if pool is None and not DATABASE_URL:
+        return Response(content=b"", media_type=media_type)
+    version = _cached_data_version(source).replace(":", "-").replace(",", "_")
+    key = f"{source}/{version}/{z}/{x}/{y}"
+    if TILE_CACHE_DIR and _tile_disk_versions.get(source) != version:
+        # First tile of this process or of a new load: drop the superseded versions' tiles off the request path
+        _tile_disk_versions[source] = version
+        threading.Thread(target=_prune_tile_dirs, args=(source, version), name="tile-cache-prune", daemon=True).start()
+    data = _tile_cache_get(key)
+    cache_state = "hit"
+    if data is None:
+        data = _render_tile(source, z, x, y)
+        _tile_cache_put(key, data)
+        cache_state = "miss"
+    return Response(content=data, media_type=media_type, headers={"X-Tile-Cache": cache_state})
+
+
+@app.get("/v1/meta")
+def meta(
+    request: Request,
+    response: Response,
+    source: Optional[str] = Query(default="sdr", pattern="^(sdr|gwdb|all)$"),
+):
+    if pool is None and not DATABASE_URL:
+        return {"as_of": None, "data_version": None}
+    version = _cached_data_version(source)
+    not_modified = _conditional_get(request, response, CACHE_CONTROL_META, version, "meta", (source or "sdr").lower())
+    if not_modified is not None:
+        return not_modified
+    cache_key = f"meta:{(source or 'sdr').lower()}:{version}"
+    cached = _result_cache_get(cache_key)
+    if cached is not None:
+        return cached
+    def _query(cur):
+        cur.execute(f"SELECT to_char(MAX(date_completed), 'YYYY-MM-DD') FROM {_resolve_wells_table(source)}")
+        return cur.fetchone()
+
+    row = _with_cursor(_query, op="meta")
+    result = {"as_of": row[0] if row and row[0] else None, "data_version": None if version == "unversioned" else version}
+    _result_cache_set(cache_key, result)
+    return result
+
+
+@app.get("/v1/cache/stats")
+def cache_stats():
+    """Result cache hit/miss counters since process start; `entries` is null for a shared backend."""
+    with _result_cache_stats_lock:
+        hits, misses, errors = _result_cache_stats["hits"], _result_cache_stats["misses"], _result_cache_stats["errors"]
+    entries: Optional[int] = 0
+    if isinstance(_result_cache, MemoryResultCache):
+        entries = len(_result_cache)
+    elif _result_cache is not None:
+        entries = None  # shared store: not counted per process
+    return {
+        "backend": _result_cache.name if _result_cache is not None else "none",
+        "entries": entries,
+        "hits": hits,
+        "misses": misses,
+        "errors": errors,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+
+def _batch_rows(points: List[tuple[float, float]], radius_m: float, limit: int) -> tuple[List[List[tuple]], Optional[str]]:
+    """Wells around every (lat, lon) point in one statement, plus the as-of date.
+
+    The points travel as arrays, are unnested with their ordinal and joined
+    LATERAL to an index-backed bbox search, so the planner runs one GiST probe
+    per point inside a single round trip. LEFT JOIN keeps points with no wells,
+    and the as-of date is an uncorrelated subquery evaluated once.
+    Returns rows (id, owner, county, lat, lon, depth_ft, date_completed, source, source_id) grouped per point.
+    """
+    boxes = [_bbox_around(lat, lon, radius_m) for lat, lon in points]
+    table = _resolve_wells_table("all")
+    sql = (
+        "SELECT q.idx, w.id, w.owner, w.county, w.lat, w.lon, w.depth_ft, to_char(w.date_completed, 'YYYY-MM-DD'), w.source, w.source_id, "
+        f"(SELECT to_char(MAX(date_completed), 'YYYY-MM-DD') FROM {table}) "
+        "FROM unnest(%s::float8[], %s::float8[], %s::float8[], %s::float8[]) WITH ORDINALITY AS q(min_lat, max_lat, min_lon, max_lon, idx) "
+        "LEFT JOIN LATERAL ("
+        f"SELECT * FROM {table} WHERE {_bbox_sql('q.min_lat', 'q.max_lat', 'q.min_lon', 'q.max_lon')} "
+        f"ORDER BY {_date_rank_sql()}, id LIMIT %s"
+        ") w ON true ORDER BY q.idx"
+    )
+    params = [[b[i] for b in boxes] for i in range(4)] + [limit]
+
+    def _query(cur):
+        cur.execute(sql, params)
+        return cur.fetchall()
+
+    grouped: List[List[tuple]] = [[] for _ in points]
+    as_of: Optional[str] = None
+    for r in _with_cursor(_query, op="batch"):
+        as_of = r[10]
+        if r[1] is not None:
+            grouped[r[0] - 1].append(r[1:10])
+    return grouped, as_of
+
+
+def _parse_batch_csv(content: bytes) -> List[dict]:
+    """Rows of a /v1/batch CSV upload (columns: address, or lat and lon)."""
     try:
         text = content.decode('utf-8', errors='ignore')
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid CSV encoding")
     import csv as _csv
     import io as _io
-    rdr = _csv.DictReader(_io.StringIO(text))
+    return list(_csv.DictReader(_io.StringIO(text)))
+
+
+def _valid_batch_rows(rows: List[dict]) -> List[dict]:
+    """Rows with a numeric lat/lon pair or a non-blank address; checked before a batch job is queued."""
+    valid = []
+    for row in rows:
+        if row.get('lat') and row.get('lon'):
+            try:
+                float(row['lat']), float(row['lon'])
+            except ValueError:
+                continue
+            valid.append(row)
+        elif (row.get('address') or '').strip():
+            valid.append(row)
+    return valid
+
+
+def _batch_tasks(rows: List[dict], limit: int) -> List[dict]:
+    """Resolve batch CSV rows to {'lat', 'lon'} points (geocoding addresses), stopping at limit."""
     tasks: list[dict] = []
-    for row in rdr:
+    for row in rows:
         task: dict = {}
         if row.get('lat') and row.get('lon'):
             try:
@@ -765,106 +2361,281 @@ def batch_zip(
             tasks.append(task)
         if len(tasks) >= limit:
             break
-    if not tasks:
-        raise HTTPException(status_code=400, detail="No valid rows found (need address or lat/lon)")
+    return tasks
 
-    # Generate PDFs into memory
-    zip_buf = io.BytesIO()
-    with zipfile.ZipFile(zip_buf, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
-        for idx, t in enumerate(tasks, start=1):
-            # Reuse export_pdf flow by calling the same PDF builder via HTTP params
-            # Simpler: call our internal function through a tiny inline builder duplicating key bits
-            # Build rows for a specific small query around this point
-            county = None; depth_min=None; depth_max=None; date_from=None; date_to=None; radius_m=5000; lim=200
-            # Query DB for matching rows
-            clauses: List[str] = []
-            params: List[object] = []
-            lat = t['lat']; lon = t['lon']
-            delta_lat = radius_m / 111_320.0
-            cos_lat = max(0.001, math.cos(math.radians(lat)))
-            delta_lon = radius_m / (111_320.0 * cos_lat)
-            min_lat, max_lat = lat - delta_lat, lat + delta_lat
-            min_lon, max_lon = lon - delta_lon, lon + delta_lon
-            clauses.append("lat BETWEEN %s AND %s"); params.extend([min_lat, max_lat])
-            clauses.append("lon BETWEEN %s AND %s"); params.extend([min_lon, max_lon])
-            where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
-            sql = (
-                "SELECT id, owner, county, lat, lon, depth_ft, to_char(date_completed, 'YYYY-MM-DD') "
-                "FROM app.wells " + where + " ORDER BY date_completed DESC NULLS LAST, id ASC LIMIT %s"
-            )
-            params.append(lim)
 
-            rows: List[tuple] = []
-            as_of: Optional[str] = None
-            conn = _get_conn()
-            if conn is not None:
-                try:
-                    with conn.cursor() as cur:
-                        cur.execute(sql, params)
-                        rows = cur.fetchall()
-                        cur.execute("SELECT to_char(MAX(date_completed), 'YYYY-MM-DD') FROM app.wells")
-                        r = cur.fetchone(); as_of = r[0] if r and r[0] else None
-                finally:
-                    try:
-                        pool and pool.putconn(conn)
-                    except Exception:
-                        pass
-
-            # Build a tiny one-page PDF for this task
-            buf = io.BytesIO()
-            doc = SimpleDocTemplate(buf, pagesize=letter, leftMargin=0.75*inch, rightMargin=0.75*inch,
-                                     topMargin=0.6*inch, bottomMargin=0.6*inch)
-            styles = getSampleStyleSheet()
-            elems: list = []
-            title = Paragraph(f"TX Well Lookup — Results @ {lat:.4f},{lon:.4f}", styles['Title'])
-            when = datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
-            meta_parts = [f"Generated: {when}"]
-            if as_of: meta_parts.append(f"SDR as-of {as_of}")
-            elems += [title, Spacer(1, 8), Paragraph(" | ".join(meta_parts), styles['Normal']), Spacer(1, 12)]
-            # Map image (reuse staticmap code)
-            try:
-                from staticmap import StaticMap, IconMarker, CircleMarker
-                img_w, img_h = 1400, 700
-                m = StaticMap(img_w, img_h, padding_x=60, padding_y=60, url_template='https://tile.openstreetmap.org/{z}/{x}/{y}.png')
-                latlons = [(r[3], r[4]) for r in rows if r[3] is not None and r[4] is not None]
-                leaflet_icon_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'apps', 'web', 'node_modules', 'leaflet', 'dist', 'images', 'marker-icon.png'))
-                use_icon = os.path.exists(leaflet_icon_path)
-                for ll in latlons[:200]:
-                    if use_icon:
+def _batch_zip_chunks(tasks: List[dict], first_timeout: Optional[float], on_pdf=None):
+    """Query wells for all batch points and return a generator of ZIP bytes, one PDF per point.
+
+    PDFs render in the process pool, at most PDF_BATCH_CONCURRENCY at a time for this batch,
+    and each is added to the ZIP as soon as it is done (entry order may vary). The first render
+    is queued before returning (waiting up to first_timeout), so a saturated renderer raises
+    PdfQueueFull up front instead of stalling the download. on_pdf() is called per finished PDF.
+    """
+    # All points in one query
+    radius_m = 5000; lim = 200
+    grouped: List[List[tuple]] = [[] for _ in tasks]
+    as_of: Optional[str] = None
+    if DATABASE_URL:
+        grouped, as_of = _batch_rows([(t['lat'], t['lon']) for t in tasks], radius_m, lim)
+
+    def render(idx: int, t: dict, timeout: Optional[float]) -> Future:
+        return _submit_pdf(render_batch_pdf, t['lat'], t['lon'], grouped[idx - 1], as_of, STATICMAP_TILE_URL, timeout=timeout)
+
+    todo = list(enumerate(tasks, start=1))
+    first_idx, first_task = todo.pop(0)
+    first = render(first_idx, first_task, first_timeout)
+
+    def zip_iter():
+        sink = _DrainableSink()
+        pending: dict[Future, int] = {first: first_idx}
+        try:
+            with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+                while pending or todo:
+                    while todo and len(pending) < max(1, PDF_BATCH_CONCURRENCY):
+                        idx, t = todo.pop(0)
+                        pending[render(idx, t, None)] = idx
+                    done, _ = _wait_futures(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        idx = pending.pop(fut)
                         try:
-                            m.add_marker(IconMarker((float(ll[1]), float(ll[0])), leaflet_icon_path, 12, 41))
-                        except Exception:
-                            m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
-                    else:
-                        m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
-                m.add_marker(CircleMarker((float(lon), float(lat)), '#ef4444', 8))
-                image = m.render(zoom=None)
-                out = io.BytesIO(); image.save(out, format='PNG'); out.seek(0)
-                elems += [Image(out, width=doc.width, height=doc.width * (img_h / img_w)), Spacer(1, 8), Paragraph("Map data © OpenStreetMap contributors", styles['Normal']), Spacer(1, 12)]
-            except Exception:
-                pass
-            data = [["Well ID", "Owner", "County", "Depth (ft)", "Completed"]]
-            for r in rows:
-                data.append([r[0], r[1] or "", r[2] or "", r[5] or "", r[6] or ""])
-            tbl = Table(data, colWidths=[1.2*inch, 3.0*inch, 1.4*inch, 1.1*inch, 1.2*inch], repeatRows=1)
-            tbl.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#1f2937')),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0,0), (-1,0), 10),
-                ('ALIGN', (0,0), (-1,0), 'LEFT'),
-                ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
-                ('FONTSIZE', (0,1), (-1,-1), 9),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
-            ]))
-            elems.append(tbl)
-            doc.build(elems)
-            buf.seek(0)
-            zf.writestr(f"tx_wells_{idx:02d}.pdf", buf.read())
-
-    zip_buf.seek(0)
-    return StreamingResponse(zip_buf, media_type='application/zip', headers={
+                            zf.writestr(f"tx_wells_{idx:02d}.pdf", fut.result())
+                            if on_pdf is not None:
+                                on_pdf()
+                        except Exception as exc:
+                            _log({"event": "batch_pdf_error", "index": idx, "error": repr(exc)})
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            tail = sink.drain()
+            if tail:
+                yield tail
+        finally:
+            # Client went away: drop renders that have not started (running ones finish and free their slot)
+            for fut in pending:
+                fut.cancel()
+
+    return zip_iter()
+
+
+@app.post("/v1/batch")
+def batch_zip(
+    file: UploadFile = File(...),
+    limit: int = Query(default=50, ge=1, le=50),
+):
+    """Accept a small CSV of addresses or lat/lon and return a ZIP of PDFs.
+    CSV columns (any one of):
+      - address (freeform)
+      - lat, lon
+    """
+    # Read CSV
+    try:
+        content = file.file.read()
+    finally:
+        try:
+            file.file.close()
+        except Exception:
+            pass
+    tasks = _batch_tasks(_parse_batch_csv(content), limit)
+    if not tasks:
+        raise HTTPException(status_code=400, detail="No valid rows found (need address or lat/lon)")
+
+    return StreamingResponse(_batch_zip_chunks(tasks, PDF_QUEUE_TIMEOUT_SEC), media_type='application/zip', headers={
         'Content-Disposition': f"attachment; filename=\"tx_wells_batch_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip\""
     })
 
+
+_job_store_instance = None
+_job_store_lock = threading.Lock()
+
+
+def _job_store():
+    """The configured object store (JOB_STORE), created on first use; 501 if it cannot be."""
+    global _job_store_instance
+    with _job_store_lock:
+        if _job_store_instance is None:
+            if JOB_STORE == "s3":
+                if not JOB_S3_BUCKET:
+                    raise HTTPException(status_code=501, detail="JOB_STORE=s3 requires JOB_S3_BUCKET")
+                try:
+                    _job_store_instance = S3ObjectStore(JOB_S3_BUCKET, JOB_S3_PREFIX, JOB_S3_ENDPOINT_URL, JOB_S3_REGION, JOB_S3_URL_TTL_SEC)
+                except ImportError:
+                    raise HTTPException(status_code=501, detail="JOB_STORE=s3 requires boto3")
+            else:
+                _job_store_instance = LocalObjectStore(JOB_STORE_DIR)
+        return _job_store_instance
+
+
+def _submit_job(kind: str, fmt: str, params: dict, request: Request, source: Optional[str]) -> tuple[Job, bool]:
+    """Queue a job, or return the existing one for the same idempotency key; (job, created).
+
+    The key is the client's Idempotency-Key header, or else a hash of the request and the
+    data version, so a double-click (or an identical request) reuses a queued, running or
+    finished job. A failed job's key can be reused; a header key reused for a different
+    request is a 422, and a full queue a 503.
+    """
+    if JOB_WORKERS <= 0:
+        raise HTTPException(status_code=501, detail="Background jobs are disabled (JOB_WORKERS=0)")
+    _job_store()
+    fingerprint = hashlib.sha256(json.dumps([kind, fmt, params], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    header_key = request.headers.get("idempotency-key")
+    key = f"key:{header_key}" if header_key else f"auto:{fingerprint}:{_cached_data_version(source)}"
+    try:
+        return _job_queue.submit(kind, fmt, params, key, fingerprint)
+    except IdempotencyConflict:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full, retry shortly", headers={"Retry-After": "30"})
+
+
+def _job_filters(params: dict, model: type[ReportFilters]) -> Optional[ReportFilters]:
+    f = params.get("filters")
+    return model(**f) if f is not None else None
+
+
+def _run_export_job(job: Job, path: str) -> tuple[str, str]:
+    fmt = job.format
+
+    def counted(batches):
+        for rows in batches:
+            yield rows
+            job.advance(len(rows))
+
+    batches = _export_batches(_job_filters(job.params, ExportFilters), typed=fmt != "csv")
+    with open(path, "wb") as f:
+        for chunk in _export_chunks(counted(batches), fmt):
+            f.write(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    return EXPORT_MEDIA_TYPES[fmt], fmt
+
+
+def _run_report_job(job: Job, path: str) -> tuple[str, str]:
+    job.total = 1
+    # No queue timeout: a background render can wait for a slot
+    pdf = _submit_pdf(render_report_pdf, *_report_pdf_args(_job_filters(job.params, ReportFilters)), timeout=None).result()
+    with open(path, "wb") as f:
+        f.write(pdf)
+    job.advance()
+    return "application/pdf", "pdf"
+
+
+def _run_batch_job(job: Job, path: str) -> tuple[str, str]:
+    tasks = _batch_tasks(job.params["rows"], job.params["limit"])
+    if not tasks:
+        # Rows were validated on submit, so only addresses that did not geocode end up here
+        raise JobFailed("None of the addresses could be geocoded")
+    job.total = len(tasks)
+    with open(path, "wb") as f:
+        for chunk in _batch_zip_chunks(tasks, None, on_pdf=job.advance):
+            f.write(chunk)
+    return "application/zip", "zip"
+
+
+_JOB_RUNNERS = {"export": _run_export_job, "report": _run_report_job, "batch": _run_batch_job}
+
+
+# Transient failures worth another attempt; anything else (bad input, bugs) fails the job at once
+_JOB_RETRYABLE = (psycopg2.OperationalError, psycopg2.InterfaceError, PoolTimeout, PdfQueueFull, BrokenProcessPool, OSError)
+_job_queue = JobQueue(_job_store, _JOB_RUNNERS, _log, JOB_QUEUE_MAX, JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF_SEC,
+                      JOB_RETENTION_SEC, _JOB_RETRYABLE)
+
+
+def _job_or_record(job_id: str) -> dict:
+    """Status of a job from this process, or its stored record (another instance, or before a restart)."""
+    job = _job_queue.get(job_id)
+    if job is not None:
+        with job.lock:
+            return job.status()
+    raw = _job_store().get_bytes(f"{job_id}/job.json")
+    if raw is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return json.loads(raw)
+
+
+def _job_response(job: Job, created: bool, response: Response) -> JobStatus:
+    response.status_code = 202 if created else 200
+    response.headers["Location"] = f"/v1/jobs/{job.id}"
+    with job.lock:
+        return JobStatus(**job.status())
+
+
+@app.post("/v1/jobs", response_model=JobStatus, status_code=202)
+def submit_job(body: JobRequest, request: Request, response: Response):
+    """Queue an export (any /v1/search.* format) or a PDF report; poll GET /v1/jobs/{id}.
+
+    Same filters as the synchronous endpoints. Send an Idempotency-Key header to make
+    retries safe; without one, an identical pending or finished job is reused.
+    """
+    if body.kind == "export":
+        fmt = (body.format or "csv").lower()
+        _require_export_format(fmt)
+    elif body.kind == "report":
+        fmt = "pdf"
+    else:
+        raise HTTPException(status_code=400, detail="kind must be 'export' or 'report' (batch: POST /v1/jobs/batch)")
+    filters = body.filters
+    if filters is not None and body.kind == "export":
+        # An export without a limit is the whole result set, as on /v1/search.*
+        filters = ExportFilters(**filters.model_dump(exclude_unset=True))
+    params = {"filters": filters.model_dump() if filters else None}
+    source = filters.source if filters else None
+    job, created = _submit_job(body.kind, fmt, params, request, source)
+    return _job_response(job, created, response)
+
+
+@app.post("/v1/jobs/batch", response_model=JobStatus, status_code=202)
+def submit_batch_job(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    limit: int = Query(default=50, ge=1, le=50),
+):
+    """Queue a /v1/batch ZIP build (same CSV upload); addresses are geocoded by the worker."""
+    try:
+        content = file.file.read()
+    finally:
+        try:
+            file.file.close()
+        except Exception:
+            pass
+    rows = _valid_batch_rows(_parse_batch_csv(content))
+    if not rows:
+        raise HTTPException(status_code=400, detail="No valid rows found (need address or lat/lon)")
+    job, created = _submit_job("batch", "zip", {"rows": rows, "limit": limit}, request, "all")
+    return _job_response(job, created, response)
+
+
+@app.get("/v1/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str = Path(..., pattern="^[0-9a-f]{32}$")):
+    """Job state, attempts, progress (rows or files done/total) and, once succeeded, the result link."""
+    return JobStatus(**_job_or_record(job_id))
+
+
+@app.get("/v1/jobs/{job_id}/result")
+def get_job_result(job_id: str = Path(..., pattern="^[0-9a-f]{32}$")):
+    """Download a finished job's file (redirects to a presigned URL when the store provides one)."""
+    status = _job_or_record(job_id)
+    result = status.get("result")
+    if status["state"] != "succeeded" or not result:
+        raise HTTPException(status_code=409, detail=f"Job is {status['state']}")
+    store = _job_store()
+    key = f"{job_id}/{result['filename']}"
+    url = store.url(key, result["filename"])
+    if url:
+        return RedirectResponse(url, status_code=307)
+    try:
+        f = store.open(key)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Job result expired")
+
+    def chunks():
+        with f:
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    return
+                yield chunk
+
+    return StreamingResponse(chunks(), media_type=result["content_type"], headers={
+        "Content-Disposition": f"attachment; filename=\"{result['filename']}\"",
+        "Content-Length": str(result["size"]),
+    })
@@ -0,0 +1,190 @@
+"""Bounded, thread-safe psycopg2 connection pool with queued checkout."""
+from __future__ import annotations
+
+import select
+import threading
+import time
+from typing import List
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within the pool timeout (DB_POOL_TIMEOUT_SEC)."""
+
+
+class BoundedConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    Opens up to `maxconn` connections on demand (keeping `minconn` warm) and,
+    when all are in use, makes callers wait up to `timeout` seconds for one to be
+    returned instead of failing. Session settings (statement_timeout, TCP
+    keepalives) are passed as connect options, so they cost nothing per checkout.
+
+    Checkout does not round-trip to the server: idle connections are pinged by
+    maintain() (run from a background thread), and a connection whose socket has
+    become readable while idle (server closed it) is discarded on the spot.
+    """
+
+    def __init__(self, dsn: str, minconn: int, maxconn: int, timeout: float, **connect_kwargs) -> None:
+        self._dsn = dsn
+        self._connect_kwargs = connect_kwargs
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._idle: List[tuple[object, float]] = []  # (connection, returned at), most recent last
+        self._size = 0  # open connections, idle + in use
+        self._waiting = 0
+        self._closed = False
+        self._counters = {"acquired": 0, "waited": 0, "timeouts": 0, "wait_ms_total": 0.0, "discarded": 0}
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        return psycopg2.connect(self._dsn, **self._connect_kwargs)
+
+    @staticmethod
+    def _looks_dead(conn) -> bool:
+        """An idle connection should have nothing to read; EOF or a FATAL notice means the server closed it."""
+        if conn.closed:
+            return True
+        try:
+            readable, _, _ = select.select([conn], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._counters["discarded"] += 1
+            self._cond.notify()
+
+    def getconn(self):
+        start = time.monotonic()
+        while True:
+            with self._cond:
+                waited = False
+                while True:
+                    if self._closed:
+                        raise psycopg2.pool.PoolError("connection pool is closed")
+                    if self._idle:
+                        conn = self._idle.pop()[0]
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(f"no database connection available within {self.timeout:g}s")
+                    waited = True
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                self._counters["acquired"] += 1
+                if waited:
+                    self._counters["waited"] += 1
+                    self._counters["wait_ms_total"] += (time.monotonic() - start) * 1000
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            if not self._looks_dead(conn):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn, close: bool = False) -> None:
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+        if close or conn.closed or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def maintain(self, ping_after_sec: float, max_idle_sec: float) -> None:
+        """Ping connections idle longer than ping_after_sec, close dead ones and those
+        idle beyond max_idle_sec (down to minconn), then reopen up to minconn."""
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                return
+            stale = [item for item in self._idle if now - item[1] >= ping_after_sec]
+            self._idle = [item for item in self._idle if now - item[1] < ping_after_sec]
+        # oldest first, so the most recently used survive the idle reaper
+        for conn, returned_at in stale:
+            with self._cond:
+                reap = now - returned_at >= max_idle_sec and self._size > self.minconn
+            if reap:
+                self._discard(conn)
+                continue
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                self._discard(conn)
+                continue
+            with self._cond:
+                self._idle.insert(0, (conn, returned_at))
+                self._cond.notify()
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                return
+            self.putconn(conn)
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "min": self.minconn,
+                "max": self.maxconn,
+                **{k: (round(v, 1) if isinstance(v, float) else v) for k, v in self._counters.items()},
+            }
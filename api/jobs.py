@@ -0,0 +1,200 @@
+"""Background job queue behind /v1/jobs: job state, idempotency keys, retries and worker threads."""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Optional
+
+
+class JobQueueFull(Exception):
+    """The queue already holds `maxsize` jobs."""
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a different request."""
+
+
+class JobFailed(Exception):
+    """A job that cannot succeed (e.g. nothing to build); the message becomes its error, without retries."""
+
+
+def iso_utc(ts: Optional[float]) -> Optional[str]:
+    return datetime.utcfromtimestamp(ts).strftime('%Y-%m-%dT%H:%M:%SZ') if ts else None
+
+
+class Job:
+    """One background build. State lives here and is mirrored to `<id>/job.json` in the store
+    on every state change, so the status survives this process for other API instances."""
+
+    def __init__(self, kind: str, fmt: str, params: dict, key: str, fingerprint: str, persist: Callable[["Job"], None]) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.format = fmt
+        self.params = params
+        self.key = key
+        self.fingerprint = fingerprint
+        self.state = "queued"
+        self.attempts = 0
+        self.done = 0
+        self.total: Optional[int] = None
+        self.unit = "rows" if kind == "export" else "files"
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.lock = threading.Lock()
+        self._persist = persist
+
+    def status(self) -> dict:
+        return {
+            "id": self.id, "kind": self.kind, "format": self.format, "state": self.state, "attempts": self.attempts,
+            "progress": {"done": self.done, "total": self.total, "unit": self.unit},
+            "result": {**self.result, "url": f"/v1/jobs/{self.id}/result"} if self.result else None,
+            "error": self.error,
+            "created_at": iso_utc(self.created_at), "started_at": iso_utc(self.started_at), "finished_at": iso_utc(self.finished_at),
+        }
+
+    def update(self, **changes) -> None:
+        """Apply a state change and persist the status record (the lock keeps records in order)."""
+        with self.lock:
+            for k, v in changes.items():
+                setattr(self, k, v)
+            self._persist(self)
+
+    def advance(self, n: int = 1) -> None:
+        with self.lock:
+            self.done += n
+
+
+class JobQueue:
+    """This process's jobs (by id and idempotency key), their queue and the worker threads.
+
+    `runners` maps a job kind to fn(job, path) -> (content_type, extension), which
+    writes the result to the temp file at `path`; it is then uploaded to the object
+    store returned by `store()`. Failures that are instances of `retryable` are
+    retried with exponential backoff up to `max_attempts`; finished jobs are
+    forgotten, and their objects deleted, `retention_sec` after they end.
+    """
+
+    def __init__(self, store: Callable[[], object], runners: dict, log: Callable[[dict], None], maxsize: int,
+                 max_attempts: int, retry_backoff_sec: float, retention_sec: int, retryable: tuple) -> None:
+        self._store = store
+        self._runners = runners
+        self._log = log
+        self.max_attempts = max_attempts
+        self.retry_backoff_sec = retry_backoff_sec
+        self.retention_sec = retention_sec
+        self.retryable = retryable
+        self._jobs: dict[str, Job] = {}
+        self._keys: dict[str, str] = {}  # idempotency key -> job id
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def submit(self, kind: str, fmt: str, params: dict, key: str, fingerprint: str) -> tuple[Job, bool]:
+        """Queue a job, or return the one already holding `key`; (job, created).
+
+        A failed job's key can be reused; a key reused for a different request
+        (fingerprint) raises IdempotencyConflict, and a full queue JobQueueFull.
+        """
+        with self._lock:
+            existing = self._jobs.get(self._keys.get(key, ""))
+            if existing is not None and existing.state != "failed":
+                if existing.fingerprint != fingerprint:
+                    raise IdempotencyConflict(key)
+                return existing, False
+            job = Job(kind, fmt, params, key, fingerprint, self._save)
+            # Held until the queued record is written, so a worker's 'running' record cannot land first
+            job.lock.acquire()
+            try:
+                self._queue.put_nowait(job.id)
+            except queue.Full:
+                job.lock.release()
+                raise JobQueueFull()
+            self._jobs[job.id] = job
+            self._keys[key] = job.id
+        try:
+            self._save(job)
+        finally:
+            job.lock.release()
+        return job, True
+
+    def _save(self, job: Job) -> None:
+        try:
+            self._store().put_bytes(f"{job.id}/job.json", json.dumps(job.status()).encode("utf-8"), "application/json")
+        except Exception as exc:
+            self._log({"event": "job_store_error", "job_id": job.id, "error": repr(exc)})
+
+    def run(self, job: Job) -> None:
+        job.update(state="running", attempts=job.attempts + 1, started_at=job.started_at or time.time(), done=0, error=None)
+        fd, path = tempfile.mkstemp(prefix=f"job_{job.id}_")
+        os.close(fd)
+        try:
+            content_type, ext = self._runners[job.kind](job, path)
+            filename = f"tx_wells_{job.kind}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{ext}"
+            self._store().put_file(f"{job.id}/{filename}", path, content_type)
+            result = {"filename": filename, "content_type": content_type, "size": os.path.getsize(path)}
+            job.update(state="succeeded", result=result, finished_at=time.time())
+        except Exception as exc:
+            error = str(exc) if isinstance(exc, JobFailed) else f"{type(exc).__name__}: {exc}"
+            retry = job.attempts < self.max_attempts and isinstance(exc, self.retryable)
+            self._log({"event": "job_error", "job_id": job.id, "kind": job.kind, "attempt": job.attempts,
+                       "retry": retry, "error": repr(exc)})
+            if retry:
+                job.update(state="retrying", error=str(error)[:500])
+                timer = threading.Timer(self.retry_backoff_sec * 2 ** (job.attempts - 1), self._queue.put, args=(job.id,))
+                timer.daemon = True
+                timer.start()
+            else:
+                job.update(state="failed", error=str(error)[:500], finished_at=time.time())
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def sweep(self) -> None:
+        """Forget finished jobs older than retention_sec and delete their stored objects."""
+        cutoff = time.time() - self.retention_sec
+        with self._lock:
+            expired = [j for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]
+            for j in expired:
+                del self._jobs[j.id]
+                if self._keys.get(j.key) == j.id:
+                    del self._keys[j.key]
+        for j in expired:
+            try:
+                if j.result:
+                    self._store().delete(f"{j.id}/{j.result['filename']}")
+                self._store().delete(f"{j.id}/job.json")
+            except Exception as exc:
+                self._log({"event": "job_store_error", "job_id": j.id, "error": repr(exc)})
+
+    def _worker_loop(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=30)
+            except queue.Empty:
+                self.sweep()
+                continue
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self.run(job)
+
+    def start(self, workers: int) -> None:
+        self._stop.clear()
+        for i in range(workers):
+            threading.Thread(target=self._worker_loop, args=(self._stop,), name=f"job-worker-{i}", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,119 @@
+"""Prometheus text exposition for the API's /metrics endpoint (no client library needed)."""
+from __future__ import annotations
+
+import bisect
+import threading
+
+
+def _metric_label_value(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_metric_label_value(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple) -> None:
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for lv, v in items:
+            yield f"{self.name}{_metric_labels(self.labels, lv)} {v:g}"
+
+
+class _Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple) -> None:
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            v = self._values.get(label_values)
+            if v is None:
+                v = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            v[i] += 1
+            v[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(lv, list(v)) for lv, v in self._values.items()]
+        for lv, v in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), v[:-1]):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                yield f"{self.name}_bucket{_metric_labels(self.labels, lv, le)} {cumulative}"
+            yield f"{self.name}_sum{_metric_labels(self.labels, lv)} {v[-1]:.6g}"
+            yield f"{self.name}_count{_metric_labels(self.labels, lv)} {cumulative}"
+
+
+class _CallbackMetric:
+    """Gauge (or counter) read at scrape time: fn() -> [(label values, value)]."""
+
+    def __init__(self, kind: str, name: str, help: str, labels: tuple, fn) -> None:
+        self.kind, self.name, self.help, self.labels, self._fn = kind, name, help, labels, fn
+
+    def samples(self):
+        for lv, v in self._fn():
+            yield f"{self.name}{_metric_labels(self.labels, lv)} {v:g}"
+
+
+class MetricsRegistry:
+    """Dependency-free Prometheus text exposition (format 0.0.4) for counters, histograms and scrape-time gauges.
+
+    Values are per process: with several uvicorn workers each one is scraped (or
+    aggregated) separately. PDF render timings are measured in the render workers
+    and recorded here when the result comes back.
+    """
+
+    def __init__(self, log=None) -> None:
+        self._metrics: list = []
+        self._log = log  # called with a record dict when a metric fails to render
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> _Counter:
+        m = _Counter(name, help, labels)
+        self._metrics.append(m)
+        return m
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = ()) -> _Histogram:
+        m = _Histogram(name, help, labels, buckets)
+        self._metrics.append(m)
+        return m
+
+    def callback(self, kind: str, name: str, help: str, labels: tuple, fn) -> None:
+        self._metrics.append(_CallbackMetric(kind, name, help, labels, fn))
+
+    def render(self) -> str:
+        lines = []
+        for m in self._metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            try:
+                lines.extend(m.samples())
+            except Exception as exc:
+                if self._log is not None:
+                    self._log({"event": "metrics_error", "metric": m.name, "error": repr(exc)})
+        return "\n".join(lines) + "\n"
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROWS_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
@@ -0,0 +1,101 @@
+"""Object stores for background job results: local directory or S3-compatible bucket."""
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from typing import Optional
+
+
+class LocalObjectStore:
+    """Job results on the local filesystem (dev, tests, single host); keys are paths under root."""
+
+    name = "local"
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"invalid object key {key!r}")
+        return path
+
+    def put_file(self, key: str, src: str, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.part"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, path)
+
+    def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def open(self, key: str):
+        return open(self._path(key), "rb")
+
+    def url(self, key: str, filename: str) -> Optional[str]:
+        return None  # served by GET /v1/jobs/{id}/result
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))  # only succeeds once the job directory is empty
+        except OSError:
+            pass
+
+
+class S3ObjectStore:
+    """Job results in an S3-compatible bucket (AWS S3, Cloudflare R2, MinIO).
+
+    Needs boto3; credentials come from the standard AWS_* environment variables.
+    Downloads are redirected to presigned URLs so result bytes never pass through the API.
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str, endpoint_url: str, region: str, url_ttl_sec: int = 3600) -> None:
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.url_ttl_sec = url_ttl_sec
+        self.client = boto3.client("s3", endpoint_url=endpoint_url or None, region_name=region or None)
+
+    def put_file(self, key: str, src: str, content_type: str) -> None:
+        self.client.upload_file(src, self.bucket, self.prefix + key, ExtraArgs={"ContentType": content_type})
+
+    def put_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data, ContentType=content_type)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            return None
+
+    def open(self, key: str):
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"]
+
+    def url(self, key: str, filename: str) -> Optional[str]:
+        return self.client.generate_presigned_url("get_object", Params={
+            "Bucket": self.bucket, "Key": self.prefix + key,
+            "ResponseContentDisposition": f"attachment; filename=\"{filename}\"",
+        }, ExpiresIn=self.url_ttl_sec)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
@@ -0,0 +1,241 @@
+"""PDF builders for /v1/reports, /v1/batch and report/batch jobs, run in the render worker processes.
+
+app.py submits render_timed(render_*_pdf, ...) to a spawn-context process pool
+with worker_init as the initializer, so a worker imports only this module (and
+ReportLab/staticmap), never app.py with its settings, pools and background
+threads. Everything a build needs arrives as arguments.
+"""
+from __future__ import annotations
+
+import io
+import math
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+def worker_init(nice: int) -> None:
+    # Lower priority so renders yield the CPU to the API process (interactive search) under load
+    if nice > 0:
+        try:
+            os.nice(nice)
+        except (AttributeError, OSError):
+            pass
+
+
+_tile_fetches: List[tuple[float, bool]] = []  # (seconds, ok) per basemap tile, collected in the render worker
+_timed_static_map_class = None
+
+
+def _timed_static_map(*args, **kwargs):
+    """staticmap.StaticMap whose tile downloads are timed into _tile_fetches."""
+    global _timed_static_map_class
+    if _timed_static_map_class is None:
+        from staticmap import StaticMap
+
+        class TimedStaticMap(StaticMap):
+            def get(self, url, **kw):
+                start = time.perf_counter()
+                ok = False
+                try:
+                    status, content = super().get(url, **kw)
+                    ok = status == 200
+                    return status, content
+                finally:
+                    _tile_fetches.append((time.perf_counter() - start, ok))
+
+        _timed_static_map_class = TimedStaticMap
+    return _timed_static_map_class(*args, **kwargs)
+
+
+def render_timed(fn, *args) -> tuple[bytes, float, List[tuple[float, bool]]]:
+    """Run a PDF builder in the render worker; (pdf, seconds, tile fetch timings) for the API's metrics."""
+    _tile_fetches.clear()
+    start = time.perf_counter()
+    pdf = fn(*args)
+    return pdf, time.perf_counter() - start, list(_tile_fetches)
+
+
+def render_report_pdf(rows: List[tuple], as_of: Optional[str], county, depth_min, depth_max,
+                      date_from, date_to, lat, lon, radius_m, tile_url: str) -> bytes:
+    """Build the /v1/reports PDF (map snapshot + results table). Runs in a render worker."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf, pagesize=letter, leftMargin=0.75*inch, rightMargin=0.75*inch,
+        topMargin=0.75*inch, bottomMargin=0.75*inch
+    )
+    styles = getSampleStyleSheet()
+    elements = []
+
+    title = Paragraph("TX Well Lookup — Results", styles['Title'])
+    when = datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
+    meta_parts = [f"Generated: {when}"]
+    if as_of:
+        meta_parts.append(f"as-of {as_of}")
+    # Filter summary
+    filt = []
+    if county: filt.append(f"County: {county}")
+    if depth_min is not None: filt.append(f"Depth ≥ {depth_min}")
+    if depth_max is not None: filt.append(f"Depth ≤ {depth_max}")
+    if date_from: filt.append(f"From: {date_from}")
+    if date_to: filt.append(f"To: {date_to}")
+    if radius_m and lat is not None and lon is not None:
+        filt.append(f"Radius: {radius_m} m @ {lat:.4f},{lon:.4f}")
+    meta_line = Paragraph(" | ".join(meta_parts), styles['Normal'])
+    filt_line = Paragraph("Filters: " + (", ".join(filt) if filt else "None"), styles['Normal'])
+
+    elements += [title, Spacer(1, 8), meta_line, Spacer(1, 4), filt_line, Spacer(1, 16)]
+
+    # Map snapshot (server-side render via staticmap)
+    try:
+        from staticmap import CircleMarker, IconMarker
+        latlons = [(r[3], r[4]) for r in rows if r[3] is not None and r[4] is not None]
+        # Higher pixel resolution for sharper rendering in PDF
+        img_w, img_h = 1600, 800
+        m = _timed_static_map(
+            img_w,
+            img_h,
+            padding_x=60,
+            padding_y=60,
+            url_template=tile_url
+        )
+        # Try to use Leaflet's default pin icon for visual parity with the site
+        leaflet_icon_path = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), '..', 'apps', 'web', 'node_modules', 'leaflet', 'dist', 'images', 'marker-icon.png')
+        )
+        use_leaflet_icon = os.path.exists(leaflet_icon_path)
+        for ll in latlons[:200]:
+            if use_leaflet_icon:
+                try:
+                    m.add_marker(IconMarker((float(ll[1]), float(ll[0])), leaflet_icon_path, 12, 41))
+                except Exception:
+                    m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
+            else:
+                m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
+        zoom: int | None = None
+        center: tuple[float, float] | None = None
+        if radius_m and lat is not None and lon is not None:
+            # Radius-aware zoom around provided center
+            center = (float(lon), float(lat))
+            c_lat = float(lat)
+            # Slightly less tight than before
+            desired_width_m = max(1000.0, 2.0 * float(radius_m))
+            mpp_equator = 156543.03392
+            cos_lat = max(0.001, math.cos(math.radians(c_lat)))
+            zoom_calc = int(math.log2((mpp_equator * cos_lat * img_w) / desired_width_m))
+            zoom = max(3, min(17, zoom_calc))
+        elif latlons:
+            # Start from auto-fit but nudge one level out for more context
+            try:
+                auto_zoom = m._calculate_zoom()  # type: ignore[attr-defined]
+            except Exception:
+                auto_zoom = None
+            if auto_zoom is not None:
+                zoom = max(3, min(17, auto_zoom))
+            else:
+                zoom = None
+        else:
+            # Default to Texas center, a bit more zoomed-in
+            center = (-99.0, 31.0)
+            zoom = 6
+        if radius_m and lat is not None and lon is not None:
+            center_marker = CircleMarker((float(lon), float(lat)), '#ef4444', 8)
+            m.add_marker(center_marker)
+        image = m.render(zoom=zoom, center=center)
+        out = io.BytesIO()
+        image.save(out, format='PNG')
+        out.seek(0)
+        # Scale to available doc width, preserve aspect
+        map_img = Image(out, width=doc.width, height=doc.width * (img_h / img_w))
+        elements += [map_img, Spacer(1, 12), Paragraph("Map data © OpenStreetMap contributors", styles['Normal']), Spacer(1, 16)]
+    except Exception:
+        pass
+
+    data = [["Well ID", "Source", "Owner", "County", "Depth (ft)", "Completed", "Source ID"]]
+    for r in rows:
+        data.append([r[0], r[7] or "", r[1] or "", r[2] or "", r[5] or "", r[6] or "", r[8] or ""])
+
+    # Column widths tuned for letter page
+    col_widths = [1.2*inch, 0.9*inch, 2.4*inch, 1.2*inch, 1.0*inch, 1.1*inch, 1.6*inch]
+    tbl = Table(data, colWidths=col_widths, repeatRows=1)
+    tbl.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#1f2937')),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 10),
+        ('ALIGN', (0,0), (-1,0), 'LEFT'),
+        ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+        ('FONTSIZE', (0,1), (-1,-1), 9),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
+    ]))
+    elements.append(tbl)
+
+    def add_footer(canvas_obj, doc_obj):
+        canvas_obj.setFont('Helvetica', 8)
+        page_num = canvas_obj.getPageNumber()
+        canvas_obj.drawRightString(doc_obj.pagesize[0]-0.75*inch, 0.5*inch, f"Page {page_num}")
+
+    doc.build(elements, onFirstPage=add_footer, onLaterPages=add_footer)
+    return buf.getvalue()
+
+
+def render_batch_pdf(lat: float, lon: float, rows: List[tuple], as_of: Optional[str], tile_url: str) -> bytes:
+    """Build one /v1/batch PDF (wells within the batch radius of lat/lon). Runs in a render worker."""
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=letter, leftMargin=0.75*inch, rightMargin=0.75*inch,
+                             topMargin=0.6*inch, bottomMargin=0.6*inch)
+    styles = getSampleStyleSheet()
+    elems: list = []
+    title = Paragraph(f"TX Well Lookup — Results @ {lat:.4f},{lon:.4f}", styles['Title'])
+    when = datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')
+    meta_parts = [f"Generated: {when}"]
+    if as_of: meta_parts.append(f"SDR as-of {as_of}")
+    elems += [title, Spacer(1, 8), Paragraph(" | ".join(meta_parts), styles['Normal']), Spacer(1, 12)]
+    # Map image (reuse staticmap code)
+    try:
+        from staticmap import IconMarker, CircleMarker
+        img_w, img_h = 1400, 700
+        m = _timed_static_map(img_w, img_h, padding_x=60, padding_y=60, url_template=tile_url)
+        latlons = [(r[3], r[4]) for r in rows if r[3] is not None and r[4] is not None]
+        leaflet_icon_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'apps', 'web', 'node_modules', 'leaflet', 'dist', 'images', 'marker-icon.png'))
+        use_icon = os.path.exists(leaflet_icon_path)
+        for ll in latlons[:200]:
+            if use_icon:
+                try:
+                    m.add_marker(IconMarker((float(ll[1]), float(ll[0])), leaflet_icon_path, 12, 41))
+                except Exception:
+                    m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
+            else:
+                m.add_marker(CircleMarker((float(ll[1]), float(ll[0])), '#2563eb', 6))
+        m.add_marker(CircleMarker((float(lon), float(lat)), '#ef4444', 8))
+        image = m.render(zoom=None)
+        out = io.BytesIO(); image.save(out, format='PNG'); out.seek(0)
+        elems += [Image(out, width=doc.width, height=doc.width * (img_h / img_w)), Spacer(1, 8), Paragraph("Map data © OpenStreetMap contributors", styles['Normal']), Spacer(1, 12)]
+    except Exception:
+        pass
+    data = [["Well ID", "Owner", "County", "Depth (ft)", "Completed"]]
+    for r in rows:
+        data.append([r[0], r[1] or "", r[2] or "", r[5] or "", r[6] or ""])
+    tbl = Table(data, colWidths=[1.2*inch, 3.0*inch, 1.4*inch, 1.1*inch, 1.2*inch], repeatRows=1)
+    tbl.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#1f2937')),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 10),
+        ('ALIGN', (0,0), (-1,0), 'LEFT'),
+        ('GRID', (0,0), (-1,-1), 0.25, colors.HexColor('#e5e7eb')),
+        ('FONTSIZE', (0,1), (-1,-1), 9),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ('ROWBACKGROUNDS', (0,1), (-1,-1), [colors.white, colors.HexColor('#f9fafb')]),
+    ]))
+    elems.append(tbl)
+    doc.build(elems)
+    return buf.getvalue()
@@ -0,0 +1,130 @@
+"""Sliding-window rate limit stores: per-process (memory) and shared (Redis)."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+def _sliding_window_retry_after(cur: float, prev: float, cost: float, limit: float, window_sec: int, frac: float) -> float:
+    """Seconds until prev * (1 - frac) + cur + cost fits in limit again."""
+    excess = prev * (1 - frac) + cur + cost - limit
+    if prev > 0 and excess <= prev * (1 - frac):
+        # the previous window's share decays linearly over this one
+        return excess * window_sec / prev
+    # this window alone is over: wait into the next, where `cur` becomes the decaying share
+    to_next = (1 - frac) * window_sec
+    if cur + cost > limit:
+        return to_next + (1 - (limit - cost) / cur) * window_sec
+    return to_next
+
+
+class MemoryRateLimitStore:
+    """Per-process sliding-window counters in a bounded LRU.
+
+    Each client keeps two numbers, the cost used in the current and the previous
+    fixed window; the previous one is weighted by how much of it still overlaps
+    the sliding window, so checks are O(1) and there is no 2x burst at window
+    edges. At most `max_keys` clients are tracked (least recently seen evicted;
+    clients idle for two windows carry no state and are dropped first).
+
+    A shared backend provides the same hit() (see RedisRateLimitStore) and is
+    installed by app.py as `_rate_limiter`.
+    """
+
+    name = "memory"
+    blocking = False  # hit() is cheap enough to call on the event loop
+
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max(1, max_keys)
+        self._entries: OrderedDict[str, tuple[int, float, float]] = OrderedDict()  # key -> (window, cur, prev)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, cost: float, limit: float, window_sec: int, now: Optional[float] = None) -> tuple[bool, float, float]:
+        """Charge `cost` to `key` if it fits; (allowed, used incl. this request, retry_after_sec)."""
+        now = time.time() if now is None else now
+        window = int(now // window_sec)
+        frac = (now % window_sec) / window_sec
+        with self._lock:
+            e = self._entries.pop(key, None)
+            if e is not None and e[0] == window:
+                cur, prev = e[1], e[2]
+            elif e is not None and e[0] == window - 1:
+                cur, prev = 0.0, e[1]
+            else:
+                cur, prev = 0.0, 0.0
+            used = prev * (1 - frac) + cur
+            allowed = used + cost <= limit
+            if allowed:
+                cur += cost
+                used += cost
+            self._entries[key] = (window, cur, prev)
+            # LRU order is also window order, so stale clients sit at the front
+            while self._entries:
+                oldest = next(iter(self._entries.values()))
+                if oldest[0] >= window - 1 and len(self._entries) <= self._max_keys:
+                    break
+                self._entries.popitem(last=False)
+        retry_after = 0.0 if allowed else _sliding_window_retry_after(cur, prev, cost, limit, window_sec, frac)
+        return allowed, used, retry_after
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisRateLimitStore:
+    """The same sliding-window counters in Redis, shared by every worker and instance (needs redis-py).
+
+    The check and the increment run in one Lua script, so concurrent requests
+    cannot both take the last unit; window keys expire after two windows.
+    """
+
+    name = "redis"
+    blocking = True  # network round trip: called from a worker thread
+
+    _SCRIPT = """
+local cur = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local frac, cost, limit, window = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+if prev * (1 - frac) + cur + cost > limit then
+  return {0, tostring(cur), tostring(prev)}
+end
+cur = tonumber(redis.call('INCRBYFLOAT', KEYS[1], cost))
+redis.call('EXPIRE', KEYS[1], window * 2)
+return {1, tostring(cur), tostring(prev)}
+"""
+
+    def __init__(self, url: str, prefix: str = "txwells:rl:") -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._script = self._client.register_script(self._SCRIPT)
+        self._prefix = prefix
+
+    def hit(self, key: str, cost: float, limit: float, window_sec: int, now: Optional[float] = None) -> tuple[bool, float, float]:
+        now = time.time() if now is None else now
+        window = int(now // window_sec)
+        frac = (now % window_sec) / window_sec
+        ok, cur, prev = self._script(
+            keys=[f"{self._prefix}{key}:{window}", f"{self._prefix}{key}:{window - 1}"],
+            args=[frac, cost, limit, window_sec],
+        )
+        cur, prev = float(cur), float(prev)
+        used = prev * (1 - frac) + cur
+        if ok:
+            return True, used, 0.0
+        return False, used, _sliding_window_retry_after(cur, prev, cost, limit, window_sec, frac)
+
+
+def parse_rate_costs(spec: str) -> List[tuple[Optional[str], str, float]]:
+    """'[METHOD ]prefix=cost,...' -> [(method, prefix, cost)], longest prefix first."""
+    rules = []
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        target, cost = item.rsplit("=", 1)
+        parts = target.split()
+        method, prefix = (parts[0].upper(), parts[1]) if len(parts) == 2 else (None, target.strip())
+        rules.append((method, prefix, float(cost)))
+    return sorted(rules, key=lambda r: (len(r[1]), r[0] is not None), reverse=True)
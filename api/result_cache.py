@@ -0,0 +1,71 @@
+"""Result cache stores for /v1/search and /v1/meta: per-process (memory) and shared (Redis)."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class MemoryResultCache:
+    """In-process LRU with a per-entry TTL.
+
+    At most `max_entries` results are kept (least recently read evicted); an
+    expired entry is dropped when it is next read. Values are whatever the
+    caller stores, but are kept JSON-serializable so a shared backend (see
+    RedisResultCache) is a drop-in replacement as app.py's `_result_cache`.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def get(self, key: str) -> Optional[object]:
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            if hit[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return hit[1]
+
+    def set(self, key: str, value: object, ttl_sec: int) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisResultCache:
+    """The same get/set over Redis, shared by every worker and instance (needs redis-py).
+
+    Values are stored as JSON with a Redis-side expiry; eviction beyond that is
+    left to the server's maxmemory policy. Errors are raised to the caller, which
+    decides how to degrade (app.py falls back to a per-process cache).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "txwells:rc:") -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[object]:
+        raw = self._client.get(self._prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: object, ttl_sec: int) -> None:
+        self._client.set(self._prefix + key, json.dumps(value, separators=(",", ":")), ex=max(1, int(ttl_sec)))
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+# The API runs from api/ (uvicorn app:app), so its modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeCursor:
+    """Records execute() calls; rows come from the first (substring, rows) rule matching the SQL."""
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self.executed = []
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        self._rows = next((list(rows) for needle, rows in self.rules if needle in sql), [])
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Point app's DB access at a FakeCursor (no Postgres); add rules with fake_db.rules.append."""
+    import app
+
+    cur = FakeCursor()
+    monkeypatch.setattr(app, "DATABASE_URL", "postgresql://fake")
+    monkeypatch.setattr(app, "_with_cursor", lambda fn, op="other": fn(cur))
+    monkeypatch.setattr(app, "_data_versions", {})
+    return cur
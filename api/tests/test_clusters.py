@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+CELL = (30.25, -97.75, 12, 40.0, 800.0, 212.46, "1951-03-02", "2020-07-01")
+
+
+@pytest.fixture
+def client():
+    # No `with`: startup (pool, views check) is not run
+    return TestClient(app.app)
+
+
+@pytest.mark.parametrize("use_mat, table", [(False, "app.wells_sdr"), (True, "app.wells_mat_sdr")])
+def test_clusters_without_rollup_aggregate_from_the_wells_table(client, fake_db, monkeypatch, use_mat, table):
+    monkeypatch.setattr(app, "USE_WELLS_MAT", use_mat)
+    monkeypatch.setattr(app, "CLUSTER_ROLLUP", False)
+    fake_db.rules.append(("GROUP BY cx, cy", [CELL]))
+    r = client.get("/v1/clusters", params={"bbox": "-98,30,-97,31", "zoom": 8})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["mode"] == "clusters"
+    assert body["cells"] == [{"lat": 30.25, "lon": -97.75, "count": 12, "depth_ft_min": 40.0, "depth_ft_max": 800.0,
+                              "depth_ft_avg": 212.5, "date_min": "1951-03-02", "date_max": "2020-07-01"}]
+    sql, params = fake_db.executed[-1]
+    assert "wells_clusters" not in sql and f"FROM {table} " in sql
+    cell_zoom = 8 + app.CLUSTER_CELL_ZOOM_OFFSET
+    x0, y0 = app._mercator_cell(31, -98, cell_zoom)
+    x1, y1 = app._mercator_cell(30, -97, cell_zoom)
+    assert params[:2] == [cell_zoom, cell_zoom] and params[-4:] == [x0, x1, y0, y1]
+
+
+def test_fallback_bbox_covers_the_requested_cells(fake_db, monkeypatch):
+    monkeypatch.setattr(app, "CLUSTER_ROLLUP", False)
+    app._cluster_rows(fake_db, "sdr", 4, 10, 12, 20, 21)
+    _, params = fake_db.executed[-1]
+    min_lat, _, min_lon, _ = app._tile_bounds(4 + app.CLUSTER_CELL_ZOOM_OFFSET, 10, 21)
+    _, max_lat, _, max_lon = app._tile_bounds(4 + app.CLUSTER_CELL_ZOOM_OFFSET, 12, 20)
+    assert params[2:-4] == app._bbox_clause(min_lat, max_lat, min_lon, max_lon)[1]
+
+
+def test_clusters_use_the_rollup_when_present(client, fake_db, monkeypatch):
+    monkeypatch.setattr(app, "USE_WELLS_MAT", True)
+    monkeypatch.setattr(app, "CLUSTER_ROLLUP", True)
+    fake_db.rules.append(("FROM app.wells_clusters", [CELL]))
+    r = client.get("/v1/clusters", params={"bbox": "-98,30,-97,31", "zoom": 8, "source": "all"})
+    assert r.status_code == 200 and r.json()["cells"][0]["count"] == 12
+    sql, params = fake_db.executed[-1]
+    assert "FROM app.wells_clusters" in sql and params[:2] == (["sdr", "gwdb"], 8)
+
+
+@pytest.mark.parametrize("populated, has_rollup, setting, use_mat, rollup", [
+    (True, True, "auto", True, True),
+    (False, True, "auto", False, False),  # empty app.wells_mat: views, and no rollup either
+    (True, False, "auto", True, False),  # wells_mat without wells_clusters
+    (False, False, "true", True, False),
+])
+def test_startup_picks_tables(fake_db, monkeypatch, populated, has_rollup, setting, use_mat, rollup):
+    monkeypatch.setattr(app, "USE_WELLS_MAT_SETTING", setting)
+    monkeypatch.setattr(app, "USE_WELLS_MAT", setting == "true")
+    monkeypatch.setattr(app, "CLUSTER_ROLLUP", False)
+    fake_db.rules += [("to_regclass", [(True, has_rollup)]), ("EXISTS", [(populated,)])]
+    app._detect_wells_mat()
+    assert (app.USE_WELLS_MAT, app.CLUSTER_ROLLUP) == (use_mat, rollup)
@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+ROW = ("sdr:1", "Smith", "Travis", 30.25, -97.75, 120.0, "2001-02-03", "sdr", "1", None)
+
+
+@pytest.fixture
+def client(fake_db, monkeypatch):
+    monkeypatch.setattr(app, "USE_PREPARED_STATEMENTS", False)
+    monkeypatch.setattr(app, "_result_cache", None)
+    version = {"sdr": "7"}
+    monkeypatch.setattr(app, "_cached_data_version", lambda source: version.get(source or "sdr", "unversioned"))
+    fake_db.rules.append(("FROM app.wells", [ROW]))
+    c = TestClient(app.app)
+    c.version = version
+    return c
+
+
+def _search(client, **headers):
+    return client.get("/v1/search", params={"county": "Travis", "limit": 5}, headers=headers)
+
+
+def test_matching_tag_is_304_without_a_query(client, fake_db):
+    first = _search(client)
+    assert first.status_code == 200 and first.json()[0]["id"] == "sdr:1"
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+    assert first.headers["cache-control"] == app.CACHE_CONTROL_SEARCH
+    queries = len(fake_db.executed)
+    again = _search(client, **{"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag and again.headers["cache-control"] == app.CACHE_CONTROL_SEARCH
+    assert len(fake_db.executed) == queries
+
+
+@pytest.mark.parametrize("header", [
+    "W/{etag}",
+    '"0000", {etag}',
+    '"0000",W/{etag} ,  "1111"',
+    "*",
+])
+def test_weak_and_list_if_none_match(client, header):
+    etag = _search(client).headers["etag"]
+    assert _search(client, **{"If-None-Match": header.format(etag=etag)}).status_code == 304
+
+
+@pytest.mark.parametrize("header", ['"0000"', "W/\"0000\", \"1111\"", ""])
+def test_other_tags_get_the_full_response(client, header):
+    etag = _search(client).headers["etag"]
+    r = _search(client, **{"If-None-Match": header})
+    assert r.status_code == 200 and r.headers["etag"] == etag and r.json()
+
+
+def test_tag_changes_with_the_data_version(client, fake_db):
+    old = _search(client).headers["etag"]
+    client.version["sdr"] = "8"
+    r = _search(client, **{"If-None-Match": old})
+    assert r.status_code == 200 and r.headers["etag"] != old
+    assert _search(client, **{"If-None-Match": r.headers["etag"]}).status_code == 304
+
+
+def test_tag_depends_on_the_query(client):
+    travis = _search(client).headers["etag"]
+    harris = client.get("/v1/search", params={"county": "Harris", "limit": 5}, headers={"If-None-Match": travis})
+    assert harris.status_code == 200 and harris.headers["etag"] != travis
+
+
+def test_no_tag_while_unversioned(client):
+    client.version.pop("sdr")
+    r = _search(client, **{"If-None-Match": "*"})
+    assert r.status_code == 200 and "etag" not in r.headers
+    assert r.headers["cache-control"] == app.CACHE_CONTROL_SEARCH
+
+
+def test_meta_and_well_endpoints_revalidate(client, fake_db):
+    fake_db.rules.insert(0, ("MAX(date_completed)", [("2024-05-01",)]))
+    meta = client.get("/v1/meta")
+    assert meta.status_code == 200 and meta.headers["cache-control"] == app.CACHE_CONTROL_META
+    assert client.get("/v1/meta", headers={"If-None-Match": meta.headers["etag"]}).status_code == 304
+    # same version and source, different endpoint: a different tag
+    well = client.get("/v1/wells/sdr:1", headers={"If-None-Match": meta.headers["etag"]})
+    assert well.headers["etag"] != meta.headers["etag"]
+    assert well.headers["cache-control"] == app.CACHE_CONTROL_WELL
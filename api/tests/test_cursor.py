@@ -0,0 +1,54 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app import _decode_cursor, _encode_cursor
+
+
+def _raw(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("date_completed, rank", [
+    ("1970-01-01", 0),
+    ("2021-06-15", -18793),  # newer dates rank first
+    ("1899-12-31", 25568),
+    (None, 2147483647),  # undated wells sort last
+])
+def test_round_trip(date_completed, rank):
+    cursor = _encode_cursor(date_completed, "sdr:123456")
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert _decode_cursor(cursor) == (rank, "sdr:123456")
+
+
+def test_ids_with_any_characters_survive():
+    well_id = "gwdb:5/7 \"x\" ü"
+    assert _decode_cursor(_encode_cursor("2001-02-03", well_id))[1] == well_id
+
+
+def test_next_page_rank_follows_sort_order():
+    newer = _decode_cursor(_encode_cursor("2020-01-02", "a"))
+    older = _decode_cursor(_encode_cursor("2020-01-01", "a"))
+    assert newer < older
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    _encode_cursor("2020-01-01", "sdr:1")[:-3],  # truncated
+    _raw(["2020-01-01"]),
+    _raw(["2020-01-01", "sdr:1", "extra"]),
+    _raw({"2020-01-01": 1, "sdr:1": 2}),
+    _raw(["2020-13-01", "sdr:1"]),
+    _raw(["yesterday", "sdr:1"]),
+    _raw([20200101, "sdr:1"]),
+    _raw(["2020-01-01", 1]),
+    _raw(["2020-01-01", ["sdr:1"]]),
+    _raw("sdr:1"),
+])
+def test_tampered_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        _decode_cursor(cursor)
+    assert exc.value.status_code == 400
@@ -0,0 +1,160 @@
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import psycopg2.extensions
+import psycopg2.pool
+import pytest
+
+from db_pool import BoundedConnectionPool, PoolTimeout
+
+
+class FakeConn:
+    """Stands in for a psycopg2 connection; the server end of a socketpair plays the backend."""
+
+    def __init__(self):
+        self.sock, self.server = socket.socketpair()
+        self.closed = 0
+        self.rollbacks = 0
+        self.info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        if not self.closed:
+            self.closed = 1
+            self.sock.close()
+            self.server.close()
+
+
+class FakePool(BoundedConnectionPool):
+    def __init__(self, minconn=0, maxconn=2, timeout=1.0):
+        self.opened = []
+        super().__init__("", minconn, maxconn, timeout)
+
+    def _connect(self):
+        conn = FakeConn()
+        self.opened.append(conn)
+        return conn
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_opens_on_demand_and_reuses_idle():
+    pool = FakePool(minconn=1, maxconn=3)
+    assert pool.stats()["size"] == 1
+    a = pool.getconn()
+    b = pool.getconn()
+    assert len(pool.opened) == 2 and a is not b
+    pool.putconn(b)
+    assert pool.getconn() is b
+    assert pool.stats()["in_use"] == 2
+
+
+def test_times_out_when_exhausted():
+    pool = FakePool(maxconn=1, timeout=0.05)
+    pool.getconn()
+    start = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert time.monotonic() - start >= 0.05
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["waiting"] == 0
+
+
+def test_waiters_are_served_in_arrival_order():
+    pool = FakePool(maxconn=1, timeout=5)
+    held = pool.getconn()
+    served = []
+
+    def wait(name):
+        conn = pool.getconn()
+        served.append(name)
+        pool.putconn(conn)
+
+    threads = []
+    for i in range(4):
+        t = threading.Thread(target=wait, args=(i,))
+        t.start()
+        threads.append(t)
+        _wait_for(lambda: pool.stats()["waiting"] == i + 1)
+    pool.putconn(held)
+    for t in threads:
+        t.join(5)
+    assert served == [0, 1, 2, 3]
+    stats = pool.stats()
+    assert stats["waited"] == 4 and stats["timeouts"] == 0 and len(pool.opened) == 1
+
+
+def test_discarding_a_connection_frees_a_slot_for_a_waiter():
+    pool = FakePool(maxconn=1, timeout=5)
+    held = pool.getconn()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.getconn()))
+    t.start()
+    _wait_for(lambda: pool.stats()["waiting"] == 1)
+    pool.putconn(held, close=True)
+    t.join(5)
+    assert got and got[0] is not held and held.closed
+    assert pool.stats()["discarded"] == 1
+
+
+def test_dead_idle_connection_is_evicted_at_checkout():
+    pool = FakePool(maxconn=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.server.close()  # server went away: the idle socket reads EOF
+    fresh = pool.getconn()
+    assert fresh is not conn and conn.closed
+    stats = pool.stats()
+    assert stats["discarded"] == 1 and stats["size"] == 1
+
+
+def test_unexpected_data_on_idle_connection_counts_as_dead():
+    pool = FakePool(maxconn=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.server.sendall(b"E")  # e.g. a FATAL notice after an admin shutdown
+    assert pool.getconn() is not conn
+
+
+def test_putconn_rolls_back_open_transactions_and_drops_unknown_state():
+    pool = FakePool(maxconn=2)
+    conn = pool.getconn()
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_INERROR
+    pool.putconn(conn)
+    assert conn.rollbacks == 1 and pool.stats()["idle"] == 1
+    conn = pool.getconn()
+    conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+    pool.putconn(conn)
+    assert conn.closed and pool.stats()["size"] == 0
+
+
+def test_closed_pool_rejects_checkout_and_wakes_waiters():
+    pool = FakePool(maxconn=1, timeout=5)
+    pool.getconn()
+    errors = []
+
+    def wait():
+        try:
+            pool.getconn()
+        except psycopg2.pool.PoolError as exc:
+            errors.append(exc)
+
+    t = threading.Thread(target=wait)
+    t.start()
+    _wait_for(lambda: pool.stats()["waiting"] == 1)
+    pool.closeall()
+    t.join(5)
+    assert len(errors) == 1
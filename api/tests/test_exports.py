@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+@pytest.mark.parametrize("filters, limit", [
+    (None, None),
+    (app.ExportFilters(county="Travis"), None),
+    (app.ExportFilters(county="Travis", limit=None), None),
+    (app.ExportFilters(county="Travis", limit=0), None),
+    (app.ExportFilters(county="Travis", limit=50), 50),
+])
+def test_export_limit_is_only_what_was_asked(filters, limit):
+    sql, params = app._export_query(filters, typed=False)
+    if limit is None:
+        assert "LIMIT" not in sql
+    else:
+        assert sql.endswith(" LIMIT %s") and params[-1] == limit
+
+
+@pytest.mark.parametrize("path", ["/v1/search.csv", "/v1/search.parquet", "/v1/search.geojsonl"])
+@pytest.mark.parametrize("body, limit", [({"county": "Travis"}, None), ({"county": "Travis", "limit": 10}, 10), (None, None)])
+def test_export_endpoints_default_to_every_row(monkeypatch, path, body, limit):
+    seen = []
+    monkeypatch.setattr(app, "_export_response", lambda filters, fmt: seen.append(filters) or {})
+    assert TestClient(app.app).post(path, json=body).status_code == 200
+    assert (seen[0].limit if seen[0] is not None else None) == limit
+    assert app._export_query(seen[0], typed=False)[0].endswith(" LIMIT %s") == (limit is not None)
+
+
+@pytest.mark.parametrize("kind, filters, limit", [
+    ("export", {"county": "Travis"}, None),
+    ("export", {"county": "Travis", "limit": 500}, 500),
+    ("report", {"county": "Travis"}, 100),  # a PDF keeps its page-sized default
+])
+def test_export_jobs_default_to_every_row(monkeypatch, kind, filters, limit):
+    submitted = []
+
+    def submit(kind, fmt, params, request, source):
+        submitted.append(params)
+        raise app.HTTPException(status_code=418)
+
+    monkeypatch.setattr(app, "_submit_job", submit)
+    r = TestClient(app.app).post("/v1/jobs", json={"kind": kind, "filters": filters})
+    assert r.status_code == 418
+    params = submitted[0]
+    assert params["filters"]["limit"] == limit and params["filters"]["county"] == "Travis"
+    model = app.ExportFilters if kind == "export" else app.ReportFilters
+    assert app._job_filters(params, model).limit == limit
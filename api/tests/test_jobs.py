@@ -0,0 +1,207 @@
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from jobs import IdempotencyConflict, JobFailed, JobQueue, JobQueueFull
+from object_store import LocalObjectStore
+
+
+class Runner:
+    """Fake job runner: raises the queued exceptions in turn, then writes `payload`."""
+
+    def __init__(self, *errors, payload=b"id,owner\n1,a\n"):
+        self.errors = list(errors)
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self, job, path):
+        self.calls += 1
+        job.advance(3)
+        if self.errors:
+            raise self.errors.pop(0)
+        with open(path, "wb") as f:
+            f.write(self.payload)
+        return "text/csv", "csv"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalObjectStore(str(tmp_path / "store"))
+
+
+def _queue(store, runner, maxsize=10, max_attempts=3, backoff=0.01, retention=3600):
+    logs = []
+    q = JobQueue(lambda: store, {"export": runner}, logs.append, maxsize, max_attempts, backoff, retention, (OSError,))
+    q.logs = logs
+    return q
+
+
+def _record(store, job):
+    return json.loads(store.get_bytes(f"{job.id}/job.json"))
+
+
+def test_submit_run_and_store_result(store):
+    runner = Runner()
+    q = _queue(store, runner)
+    job, created = q.submit("export", "csv", {"filters": None}, "key:a", "fp")
+    assert created and _record(store, job)["state"] == "queued"
+    q.run(job)
+    status = _record(store, job)
+    assert status["state"] == "succeeded" and status["attempts"] == 1
+    assert status["progress"] == {"done": 3, "total": None, "unit": "rows"}
+    result = status["result"]
+    assert result["content_type"] == "text/csv" and result["size"] == len(runner.payload)
+    assert result["url"] == f"/v1/jobs/{job.id}/result"
+    key = f"{job.id}/{result['filename']}"
+    with store.open(key) as f:
+        assert f.read() == runner.payload
+    assert store.url(key, result["filename"]) is None
+    # the temp file the runner wrote is gone
+    assert not [n for n in os.listdir(tempfile.gettempdir()) if n.startswith(f"job_{job.id}_")]
+
+
+def test_idempotency_key_reuse(store):
+    q = _queue(store, Runner(ValueError("bad filters")))
+    job, _ = q.submit("export", "csv", {}, "key:a", "fp1")
+    same, created = q.submit("export", "csv", {}, "key:a", "fp1")
+    assert same is job and not created
+    with pytest.raises(IdempotencyConflict):
+        q.submit("export", "parquet", {}, "key:a", "fp2")
+    q.run(job)
+    assert job.state == "failed"
+    # a failed job's key may be used again, for any request
+    retry, created = q.submit("export", "parquet", {}, "key:a", "fp2")
+    assert created and retry is not job and q.get(retry.id) is retry
+
+
+def test_full_queue(store):
+    q = _queue(store, Runner(), maxsize=1)
+    q.submit("export", "csv", {}, "key:a", "a")
+    with pytest.raises(JobQueueFull):
+        q.submit("export", "csv", {}, "key:b", "b")
+    # the rejected job was not registered under its key
+    job, created = q.submit("export", "csv", {}, "key:a", "a")
+    assert not created
+
+
+def test_transient_failure_is_retried_after_backoff(store):
+    q = _queue(store, Runner(OSError("connection reset")), backoff=0.05)
+    job, _ = q.submit("export", "csv", {}, "key:a", "fp")
+    assert q._queue.get_nowait() == job.id
+    start = time.monotonic()
+    q.run(job)
+    assert job.state == "retrying" and job.error == "OSError: connection reset"
+    assert _record(store, job)["state"] == "retrying"
+    assert q._queue.get(timeout=2) == job.id
+    assert time.monotonic() - start >= 0.05
+    q.run(job)
+    assert job.state == "succeeded" and job.attempts == 2 and job.error is None
+    assert job.done == 3  # progress restarts with each attempt
+
+
+def test_backoff_doubles_and_attempts_are_capped(store):
+    q = _queue(store, Runner(OSError("1"), OSError("2"), OSError("3")), max_attempts=3, backoff=0.02)
+    job, _ = q.submit("export", "csv", {}, "key:a", "fp")
+    q._queue.get_nowait()
+    delays = []
+    for _ in range(2):
+        start = time.monotonic()
+        q.run(job)
+        assert q._queue.get(timeout=2) == job.id
+        delays.append(time.monotonic() - start)
+    q.run(job)
+    assert job.state == "failed" and job.attempts == 3 and job.finished_at
+    assert delays[0] >= 0.02 and delays[1] >= 0.04
+    with pytest.raises(Exception):
+        q._queue.get(timeout=0.1)
+    assert [r["retry"] for r in q.logs if r["event"] == "job_error"] == [True, True, False]
+
+
+@pytest.mark.parametrize("exc, error", [
+    (ValueError("unknown county"), "ValueError: unknown county"),
+    (JobFailed("None of the addresses could be geocoded"), "None of the addresses could be geocoded"),
+])
+def test_permanent_failures_are_not_retried(store, exc, error):
+    runner = Runner(exc)
+    q = _queue(store, runner)
+    job, _ = q.submit("export", "csv", {}, "key:a", "fp")
+    q._queue.get_nowait()
+    q.run(job)
+    assert runner.calls == 1 and job.state == "failed" and job.error == error
+    assert _record(store, job)["error"] == error
+
+
+def test_sweep_forgets_expired_jobs_and_deletes_objects(store):
+    q = _queue(store, Runner(), retention=60)
+    old, _ = q.submit("export", "csv", {}, "key:old", "a")
+    new, _ = q.submit("export", "csv", {}, "key:new", "b")
+    q.run(old)
+    q.run(new)
+    old.finished_at -= 120
+    q.sweep()
+    assert q.get(old.id) is None and q.get(new.id) is new
+    assert store.get_bytes(f"{old.id}/job.json") is None
+    assert not os.path.exists(os.path.join(store.root, old.id))
+    assert store.get_bytes(f"{new.id}/job.json") is not None
+    # the expired job's key is free again
+    assert q.submit("export", "csv", {}, "key:old", "a")[1]
+
+
+def test_worker_threads_run_queued_jobs(store):
+    q = _queue(store, Runner())
+    q.start(2)
+    try:
+        jobs = [q.submit("export", "csv", {}, f"key:{i}", str(i))[0] for i in range(4)]
+        deadline = time.monotonic() + 5
+        while any(j.state != "succeeded" for j in jobs):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        q.stop()
+    assert all(j.attempts == 1 for j in jobs)
+
+
+def test_local_object_store(store, tmp_path):
+    src = tmp_path / "result.bin"
+    src.write_bytes(b"\x00\x01")
+    store.put_file("abc/result.bin", str(src), "application/octet-stream")
+    store.put_bytes("abc/job.json", b"{}", "application/json")
+    assert store.get_bytes("abc/result.bin") == b"\x00\x01"
+    assert store.get_bytes("abc/missing") is None
+    assert store.url("abc/result.bin", "result.bin") is None
+    assert not [n for n in os.listdir(os.path.join(store.root, "abc")) if n.endswith(".part")]
+    store.delete("abc/result.bin")
+    assert os.path.isdir(os.path.join(store.root, "abc"))  # job.json is still there
+    store.delete("abc/job.json")
+    assert not os.path.exists(os.path.join(store.root, "abc"))
+    store.delete("abc/job.json")  # already gone: no error
+    for key in ("../escape", "/etc/passwd", "abc/../../x"):
+        with pytest.raises(ValueError):
+            store.put_bytes(key, b"", "text/plain")
+
+
+def test_batch_rows_are_validated_before_queueing(monkeypatch):
+    import app
+
+    rows = [{"lat": "30.1", "lon": "-97.2"}, {"lat": "north", "lon": "-97"}, {"address": "  "},
+            {"address": "100 Congress Ave, Austin"}, {"lat": "30.1"}]
+    assert app._valid_batch_rows(rows) == [rows[0], rows[3]]
+
+    from fastapi.testclient import TestClient
+
+    submitted = []
+    monkeypatch.setattr(app, "_submit_job", lambda *a, **k: submitted.append(a))
+    r = TestClient(app.app).post("/v1/jobs/batch", files={"file": ("b.csv", b"lat,lon,address\nx,y,\n,, \n")})
+    assert r.status_code == 400 and not submitted
+
+
+def test_batch_job_without_locatable_rows_fails_without_http_error(monkeypatch, tmp_path):
+    import app
+
+    monkeypatch.setattr(app, "_batch_tasks", lambda rows, limit: [])
+    job = type("J", (), {"params": {"rows": [{"address": "nowhere"}], "limit": 5}})()
+    with pytest.raises(JobFailed):
+        app._run_batch_job(job, str(tmp_path / "out.zip"))
@@ -0,0 +1,130 @@
+import io
+import json
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+import app
+from app import LogPipeline
+
+
+class StuckStream(io.StringIO):
+    """A stdout whose write() blocks until released, like a slow pipe to the log collector."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, data):
+        self.entered.set()
+        self.release.wait(5)
+        return super().write(data)
+
+
+def _records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_full_queue_drops_without_blocking():
+    stream = StuckStream()
+    log = LogPipeline(max_queue=10, batch_size=4, sample_2xx=1.0, stream=stream)
+    log.emit({"event": "first"})
+    assert stream.entered.wait(2)  # the writer holds "first" and is stuck writing it
+    start = time.monotonic()
+    for i in range(25):
+        log.emit({"event": "e", "i": i})
+    assert time.monotonic() - start < 0.5
+    stats = log.stats()
+    assert stats["queued"] == 10 and stats["dropped"] == 15 and stats["written"] == 0
+    stream.release.set()
+    log.close()
+    records = _records(stream)
+    assert [r["i"] for r in records if r["event"] == "e"] == list(range(10))
+    assert {"event": "log_dropped", "count": 15} in records
+    # the drop report is itself a written record
+    assert log.stats() == {"queued": 0, "written": 12, "dropped": 15, "sampled_out": 0, "write_errors": 0}
+
+
+def test_close_flushes_everything_queued():
+    stream = io.StringIO()
+    log = LogPipeline(max_queue=1000, batch_size=7, sample_2xx=1.0, stream=stream)
+    for i in range(50):
+        log.emit({"event": "e", "i": i})
+    log.close()
+    assert [r["i"] for r in _records(stream)] == list(range(50))
+    assert log.stats()["written"] == 50 and log._thread is None
+    # a later emit starts a new writer
+    log.emit({"event": "late"})
+    log.close()
+    assert _records(stream)[-1] == {"event": "late"}
+
+
+def test_write_errors_are_counted():
+    class Broken(io.StringIO):
+        def write(self, data):
+            raise OSError("broken pipe")
+
+    log = LogPipeline(max_queue=10, batch_size=10, sample_2xx=1.0, stream=Broken())
+    log.emit({"event": "a"})
+    log.emit({"event": "b"})
+    log.close()
+    stats = log.stats()
+    assert stats["write_errors"] == 2 and stats["written"] == 0
+
+
+def test_unencodable_record_is_replaced(monkeypatch):
+    stream = io.StringIO()
+    log = LogPipeline(max_queue=10, batch_size=10, sample_2xx=1.0, stream=stream)
+
+    def line(record):
+        if record.get("bad"):
+            raise TypeError("cannot encode")
+        return json.dumps(record).encode("utf-8")
+
+    monkeypatch.setattr(app, "_json_line", line)
+    log.emit({"event": "ok"})
+    log.emit({"event": "x", "bad": True})
+    log.close()
+    assert [r["event"] for r in _records(stream)] == ["ok", "log_encode_error"]
+
+
+def test_2xx_sampling(monkeypatch):
+    stream = io.StringIO()
+    log = LogPipeline(max_queue=100, batch_size=10, sample_2xx=0.25, stream=stream)
+    draws = iter([0.1, 0.9, 0.3, 0.2])
+    monkeypatch.setattr(app.random, "random", lambda: next(draws))
+    for status in (200, 204, 201, 200):
+        log.emit_access({"event": "http_request", "status": status}, status)
+    log.emit_access({"event": "http_request", "status": 500}, 500)  # never sampled
+    log.close()
+    records = _records(stream)
+    assert [r["status"] for r in records] == [200, 200, 500]
+    assert [r.get("sample_rate") for r in records] == [0.25, 0.25, None]
+    assert log.stats()["sampled_out"] == 2
+
+
+RECORDS = [
+    {"event": "http_request", "status": 200, "duration_ms": 1.5, "path": "/v1/search?county=Bexar"},
+    {"event": "unicode", "owner": "Peña — ü", "tags": ["a", None, True]},
+    {"event": "types", "at": datetime(2024, 1, 2, 3, 4, 5), "day": date(2024, 1, 2), "n": Decimal("1.25"), "t": (1, 2)},
+    {"event": "keys", 1: "int key", "nested": {"x": [1.0, {"y": None}]}},
+]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_encoders_agree(record):
+    if app._json_line is app._json_line_std:
+        pytest.skip("orjson is not installed")
+    fast = app._json_line(record)
+    std = app._json_line_std(record)
+    assert b"\n" not in fast and b"\n" not in std
+    assert json.loads(fast) == json.loads(std)
+
+
+def test_std_encoder_output():
+    assert json.loads(app._json_line_std(RECORDS[2])) == {
+        "event": "types", "at": "2024-01-02T03:04:05", "day": "2024-01-02", "n": "1.25", "t": [1, 2]}
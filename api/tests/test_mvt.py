@@ -0,0 +1,204 @@
+import struct
+
+import pytest
+
+from app import TILE_EXTENT, _mvt_layer, _pb_field, _pb_packed, _pb_varint, _tile_xy, _zigzag
+
+
+def _read_varint(buf, i):
+    shift = value = 0
+    while True:
+        b = buf[i]
+        i += 1
+        value |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            return value, i
+
+
+def _fields(buf):
+    """[(field, value)]: ints for varints, bytes for length-delimited, raw bytes for 64-bit."""
+    out, i = [], 0
+    while i < len(buf):
+        key, i = _read_varint(buf, i)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, i = _read_varint(buf, i)
+        elif wire == 1:
+            value, i = buf[i:i + 8], i + 8
+        elif wire == 2:
+            n, i = _read_varint(buf, i)
+            value, i = buf[i:i + n], i + n
+        else:
+            raise AssertionError(f"unexpected wire type {wire}")
+        out.append((field, value))
+    return out
+
+
+def _packed(buf):
+    values, i = [], 0
+    while i < len(buf):
+        v, i = _read_varint(buf, i)
+        values.append(v)
+    return values
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+@pytest.mark.parametrize("n, encoded", [
+    (0, b"\x00"), (1, b"\x01"), (127, b"\x7f"), (128, b"\x80\x01"), (300, b"\xac\x02"),
+    (2 ** 32, b"\x80\x80\x80\x80\x10"), (2 ** 64 - 1, b"\xff" * 9 + b"\x01"),
+])
+def test_varint(n, encoded):
+    assert _pb_varint(n) == encoded
+    assert _read_varint(encoded, 0) == (n, len(encoded))
+
+
+@pytest.mark.parametrize("n, z", [(0, 0), (-1, 1), (1, 2), (-2, 3), (2, 4), (4095, 8190), (-4096, 8191)])
+def test_zigzag(n, z):
+    assert _zigzag(n) == z
+    assert _unzigzag(z) == n
+
+
+def test_fields():
+    assert _pb_field(3, 0, 150) == b"\x18\x96\x01"
+    assert _pb_field(1, 2, b"abc") == b"\x0a\x03abc"
+    assert _pb_field(16, 0, 1) == b"\x80\x01\x01"  # field numbers past 15 take a two-byte key
+    assert _pb_packed(4, [9, 300]) == b"\x22\x03\x09\xac\x02"
+
+
+def test_point_layer_round_trip():
+    props_a = {"id": "sdr:1", "depth_ft": 120.5, "year": 1998, "plugged": False, "owner": None}
+    props_b = {"id": "sdr:2", "depth_ft": 120.5, "year": -3}
+    layer = _fields(_mvt_layer("wells", [(10, 4000, props_a), (-5, 0, props_b)]))
+
+    top = dict((f, v) for f, v in layer if f in (1, 5, 15))
+    assert top == {15: 2, 1: b"wells", 5: TILE_EXTENT}
+    keys = [v.decode() for f, v in layer if f == 3]
+    values = []
+    for f, v in layer:
+        if f != 4:
+            continue
+        (kind, raw), = _fields(v)
+        values.append({1: lambda r: r.decode(), 3: lambda r: struct.unpack("<d", r)[0],
+                       4: lambda r: r - 2 ** 64 if r >= 2 ** 63 else r, 7: bool}[kind](raw))
+    assert keys == ["id", "depth_ft", "year", "plugged"]
+    # equal values are shared between features
+    assert values == ["sdr:1", 120.5, 1998, False, "sdr:2", -3]
+
+    decoded = []
+    for f, v in layer:
+        if f != 2:
+            continue
+        feature = dict(_fields(v))
+        assert feature[3] == 1  # POINT
+        command, dx, dy = _packed(feature[4])
+        assert command == (1 << 3) | 1  # MoveTo, one point
+        tags = _packed(feature[2])
+        props = {keys[k]: values[val] for k, val in zip(tags[::2], tags[1::2])}
+        decoded.append(((_unzigzag(dx), _unzigzag(dy)), props))
+    assert decoded == [
+        ((10, 4000), {k: v for k, v in props_a.items() if v is not None}),
+        ((-5, 0), props_b),
+    ]
+
+
+def test_layer_decodes_with_a_reference_decoder():
+    mvt = pytest.importorskip("mapbox_vector_tile")
+    tile = _pb_field(3, 2, _mvt_layer("wells", [(100, 200, {"id": "gwdb:7", "depth_ft": 30.0})]))
+    layer = mvt.decode(tile, default_options={"y_coord_down": True})["wells"]
+    feature, = layer["features"]
+    assert feature["geometry"] == {"type": "Point", "coordinates": [100, 200]}
+    assert feature["properties"] == {"id": "gwdb:7", "depth_ft": 30.0}
+
+
+def test_tile_xy_corners():
+    # z1 tile (1, 0) spans lon 0..180 and the northern hemisphere
+    assert _tile_xy(0.0, 0.0, 1, 1, 0) == (0, TILE_EXTENT)
+    assert _tile_xy(0.0, 90.0, 1, 1, 0) == (TILE_EXTENT // 2, TILE_EXTENT)
+    assert _tile_xy(0.0, 90.0, 2, 3, 1) == (0, TILE_EXTENT)
+
+
+def _layers(tile):
+    """{layer name: [(x, y, properties)]} decoded with the reader above."""
+    out = {}
+    for _, raw in _fields(tile):
+        layer = _fields(raw)
+        name = next(v.decode() for f, v in layer if f == 1)
+        keys = [v.decode() for f, v in layer if f == 3]
+        values = []
+        for f, v in layer:
+            if f == 4:
+                (kind, value), = _fields(v)
+                values.append(value.decode() if kind == 1 else struct.unpack("<d", value)[0] if kind == 3 else value)
+        features = []
+        for f, v in layer:
+            if f == 2:
+                feature = dict(_fields(v))
+                _, dx, dy = _packed(feature[4])
+                tags = _packed(feature[2])
+                features.append((_unzigzag(dx), _unzigzag(dy), {keys[k]: values[i] for k, i in zip(tags[::2], tags[1::2])}))
+        out[name] = features
+    return out
+
+
+@pytest.fixture
+def tiles(fake_db, monkeypatch):
+    import app
+    from collections import OrderedDict
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(app, "USE_WELLS_MAT", False)
+    monkeypatch.setattr(app, "CLUSTER_ROLLUP", False)
+    monkeypatch.setattr(app, "TILE_CACHE_DIR", "")
+    monkeypatch.setattr(app, "_tile_cache", OrderedDict())
+    return app, TestClient(app.app), fake_db
+
+
+def _center(app, z, x, y):
+    min_lat, max_lat, min_lon, max_lon = app._tile_bounds(z, x, y)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+
+def test_low_zoom_tile_on_the_views_fallback(tiles):
+    app, client, cur = tiles
+    z, x, y = 5, 7, 13
+    lat, lon = _center(app, z, x, y)
+    cur.rules.append(("GROUP BY cx, cy", [(lat, lon, 40, 10.0, 900.0, 123.44, "1950-01-01", "2020-01-01")]))
+    r = client.get(f"/v1/tiles/sdr/{z}/{x}/{y}.mvt")
+    assert r.status_code == 200 and r.headers["x-tile-cache"] == "miss"
+    (px, py, props), = _layers(r.content)["clusters"]
+    assert abs(px - TILE_EXTENT // 2) <= 1 and abs(py - TILE_EXTENT // 2) <= 60
+    assert props == {"count": 40, "depth_ft_avg": 123.4, "date_min": "1950-01-01", "date_max": "2020-01-01"}
+    sql, params = cur.executed[-1]
+    assert "wells_clusters" not in sql and "FROM app.wells_sdr " in sql
+    span = 2 ** app.CLUSTER_CELL_ZOOM_OFFSET
+    assert params[-4:] == [x * span, x * span + span - 1, y * span, y * span + span - 1]
+    # served from the memory cache the second time
+    assert client.get(f"/v1/tiles/sdr/{z}/{x}/{y}.mvt").headers["x-tile-cache"] == "hit"
+
+
+def test_points_tile_carries_location_confidence(tiles):
+    app, client, cur = tiles
+    z, x, y = 10, 235, 421
+    lat, lon = _center(app, z, x, y)
+    cur.rules.append(("location_confidence", [("sdr:1", lat, lon, 150.0, "2001-05-06", "sdr", "exact")]))
+    layers = _layers(client.get(f"/v1/tiles/sdr/{z}/{x}/{y}.mvt").content)
+    (_, _, props), = layers["wells"]
+    assert props == {"id": "sdr:1", "depth_ft": 150.0, "date_completed": "2001-05-06", "source": "sdr", "location_confidence": "exact"}
+
+
+@pytest.mark.parametrize("z, layer, n", [(10, "clusters", 1), (14, "wells", 2)])
+def test_dense_tiles_fall_back_to_clusters_or_truncate(tiles, monkeypatch, z, layer, n):
+    app, client, cur = tiles
+    monkeypatch.setattr(app, "TILE_MAX_POINTS", 2)
+    x, y = app._mercator_cell(30.27, -97.74, z)
+    lat, lon = _center(app, z, x, y)
+    cur.rules += [
+        ("location_confidence", [(f"sdr:{i}", lat, lon, None, None, "sdr", None) for i in range(3)]),
+        ("GROUP BY cx, cy", [(lat, lon, 3, None, None, None, None, None)]),
+    ]
+    layers = _layers(client.get(f"/v1/tiles/sdr/{z}/{x}/{y}.mvt").content)
+    assert list(layers) == [layer] and len(layers[layer]) == n
@@ -0,0 +1,33 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pdf_render
+
+# Nothing listens here: map tiles fail fast and the PDF is built without the map
+TILE_URL = "http://127.0.0.1:9/{z}/{x}/{y}.png"
+ROWS = [
+    ("sdr:1", "Smith", "Travis", 30.25, -97.75, 120.0, "2001-02-03", "sdr", "1", 15.2),
+    ("gwdb:2", None, "Travis", None, None, None, None, "gwdb", "2", None),
+]
+
+
+def test_builders_run_in_process():
+    report = pdf_render.render_report_pdf(ROWS, "2024-05-01", "Travis", 10, None, None, None, 30.25, -97.75, 500, TILE_URL)
+    batch = pdf_render.render_batch_pdf(30.25, -97.75, ROWS, None, TILE_URL)
+    assert report.startswith(b"%PDF") and batch.startswith(b"%PDF")
+
+
+def test_render_timed_reports_tile_fetches():
+    pdf, seconds, fetches = pdf_render.render_timed(pdf_render.render_batch_pdf, 30.25, -97.75, ROWS, None, TILE_URL)
+    assert pdf.startswith(b"%PDF") and seconds > 0
+    assert fetches and not any(ok for _, ok in fetches)
+
+
+def test_spawned_worker_imports_only_the_render_module():
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=pdf_render.worker_init, initargs=(0,)) as pool:
+        pdf, _, _ = pool.submit(pdf_render.render_timed, pdf_render.render_report_pdf, ROWS, None,
+                                None, None, None, None, None, None, None, None, TILE_URL).result(timeout=60)
+        loaded = pool.submit(eval, "sorted(set(__import__('sys').modules) & {'app', 'fastapi', 'psycopg2', 'jobs', 'dotenv'})")
+        assert loaded.result(timeout=60) == []
+    assert pdf.startswith(b"%PDF")
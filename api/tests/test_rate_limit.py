@@ -0,0 +1,95 @@
+import pytest
+
+from rate_limit import MemoryRateLimitStore, _sliding_window_retry_after, parse_rate_costs
+
+WINDOW = 60
+T0 = 600.0  # start of fixed window 10
+
+
+def test_allows_up_to_limit_then_rejects():
+    store = MemoryRateLimitStore(100)
+    results = [store.hit("a", 1, 3, WINDOW, now=T0 + i) for i in range(4)]
+    assert [r[0] for r in results] == [True, True, True, False]
+    assert results[2][1] == 3
+    # a rejected request is not charged
+    assert results[3][1] == 3
+
+
+def test_cost_is_charged_in_full():
+    store = MemoryRateLimitStore(100)
+    assert store.hit("a", 5, 6, WINDOW, now=T0)[0]
+    assert not store.hit("a", 2, 6, WINDOW, now=T0 + 1)[0]
+    assert store.hit("a", 1, 6, WINDOW, now=T0 + 2)[0]
+
+
+def test_previous_window_share_decays_linearly():
+    store = MemoryRateLimitStore(100)
+    for _ in range(4):
+        store.hit("a", 1, 4, WINDOW, now=T0)
+    # a quarter into the next window, 3/4 of the previous window still counts
+    allowed, used, _ = store.hit("a", 1, 4, WINDOW, now=T0 + WINDOW + 15)
+    assert allowed
+    assert used == pytest.approx(4 * 0.75 + 1)
+    assert not store.hit("a", 1, 4, WINDOW, now=T0 + WINDOW + 15)[0]
+
+
+def test_state_older_than_two_windows_is_forgotten():
+    store = MemoryRateLimitStore(100)
+    for _ in range(3):
+        store.hit("a", 1, 3, WINDOW, now=T0)
+    allowed, used, _ = store.hit("a", 1, 3, WINDOW, now=T0 + 2 * WINDOW)
+    assert allowed and used == 1
+
+
+@pytest.mark.parametrize("charges, cost, limit, offset", [
+    ([(0, 3)], 1, 3, 1),  # current window full, nothing carried over
+    ([(0, 10)], 1, 10, 30),  # halfway through the window that filled up
+    ([(0, 10), (WINDOW + 20, 3)], 1, 10, WINDOW + 20),  # previous window decaying, some current use
+    ([(0, 2), (WINDOW + 5, 8)], 3, 10, WINDOW + 40),  # current window alone over once cost is added
+])
+def test_retry_after_is_when_the_request_first_fits(charges, cost, limit, offset):
+    store = MemoryRateLimitStore(100)
+    for at, amount in charges:
+        for _ in range(amount):
+            assert store.hit("a", 1, limit, WINDOW, now=T0 + at)[0]
+    now = T0 + offset
+    allowed, _, retry_after = store.hit("a", cost, limit, WINDOW, now=now)
+    assert not allowed and retry_after > 0
+    assert not store.hit("a", cost, limit, WINDOW, now=now + retry_after - 0.01)[0]
+    assert store.hit("a", cost, limit, WINDOW, now=now + retry_after + 0.01)[0]
+
+
+def test_retry_after_cost_above_what_one_window_can_hold():
+    # cur alone blocks the request: wait into the next window and for enough of cur to decay
+    assert _sliding_window_retry_after(cur=10, prev=0, cost=5, limit=10, window_sec=60, frac=0.5) == pytest.approx(30 + 0.5 * 60)
+
+
+def test_lru_evicts_least_recently_seen_client():
+    store = MemoryRateLimitStore(2)
+    store.hit("a", 1, 1, WINDOW, now=T0)
+    store.hit("b", 1, 1, WINDOW, now=T0)
+    store.hit("a", 1, 1, WINDOW, now=T0)  # rejected, but a is now the most recently seen
+    store.hit("c", 1, 1, WINDOW, now=T0)
+    assert len(store) == 2
+    # b was evicted and starts from an empty window; a still has its charge
+    assert store.hit("b", 1, 1, WINDOW, now=T0)[0]
+    assert len(store) == 2
+
+
+def test_idle_clients_are_dropped_before_the_cap():
+    store = MemoryRateLimitStore(100)
+    store.hit("a", 1, 5, WINDOW, now=T0)
+    store.hit("b", 1, 5, WINDOW, now=T0 + WINDOW)
+    assert len(store) == 2  # a's window still overlaps
+    store.hit("c", 1, 5, WINDOW, now=T0 + 2 * WINDOW)
+    assert len(store) == 2  # a carries no state any more
+
+
+def test_parse_rate_costs_longest_prefix_then_method_first():
+    rules = parse_rate_costs("/v1/search=2, POST /v1/search.csv=20,/v1/search.csv=5,/health=0,garbage")
+    assert rules == [
+        ("POST", "/v1/search.csv", 20.0),
+        (None, "/v1/search.csv", 5.0),
+        (None, "/v1/search", 2.0),
+        (None, "/health", 0.0),
+    ]
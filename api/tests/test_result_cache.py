@@ -0,0 +1,107 @@
+import fakeredis
+import pytest
+import redis
+from fastapi.testclient import TestClient
+
+import app
+from result_cache import MemoryResultCache, RedisResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = MemoryResultCache(10, clock=clock)
+    cache.set("a", {"items": []}, 60)
+    clock.now += 59.9
+    assert cache.get("a") == {"items": []}
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_read_is_evicted():
+    cache = MemoryResultCache(2, clock=Clock())
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    assert cache.get("a") == 1  # b is now the least recently used
+    cache.set("c", 3, 60)
+    assert len(cache) == 2
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_overwrite_refreshes_ttl_and_recency():
+    clock = Clock()
+    cache = MemoryResultCache(2, clock=clock)
+    cache.set("a", 1, 10)
+    cache.set("b", 2, 60)
+    clock.now += 5
+    cache.set("a", 3, 10)
+    cache.set("c", 4, 60)
+    clock.now += 9
+    assert cache.get("a") == 3 and cache.get("b") is None
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url", classmethod(lambda cls, url, **kw: fakeredis.FakeRedis(server=fake)))
+    return fake
+
+
+def test_redis_round_trip_with_expiry(server):
+    cache = RedisResultCache("redis://cache:6379/0")
+    cache.set("search:1:abc", {"items": [{"id": "sdr:1", "lat": 30.5}], "next_cursor": None}, 120)
+    other = RedisResultCache("redis://cache:6379/0")  # another worker sees it
+    assert other.get("search:1:abc") == {"items": [{"id": "sdr:1", "lat": 30.5}], "next_cursor": None}
+    assert other.get("search:1:missing") is None
+    client = fakeredis.FakeRedis(server=server)
+    assert 0 < client.ttl("txwells:rc:search:1:abc") <= 120
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    cache = MemoryResultCache(10)
+    monkeypatch.setattr(app, "_result_cache", cache)
+    monkeypatch.setattr(app, "_result_cache_fallback", None)
+    monkeypatch.setattr(app, "_result_cache_stats", {"hits": 0, "misses": 0, "errors": 0})
+    return cache
+
+
+def test_hit_and_miss_counters(memory_cache):
+    assert app._result_cache_get("k") is None
+    app._result_cache_set("k", {"v": 1})
+    assert app._result_cache_get("k") == {"v": 1}
+    assert app._result_cache_get("k") == {"v": 1}
+    body = TestClient(app.app).get("/v1/cache/stats").json()
+    assert body == {"backend": "memory", "entries": 1, "hits": 2, "misses": 1, "errors": 0, "hit_ratio": 0.6667}
+
+
+class Down:
+    name = "redis"
+
+    def get(self, key):
+        raise redis.ConnectionError("connection refused")
+
+    def set(self, key, value, ttl_sec):
+        raise redis.ConnectionError("connection refused")
+
+
+def test_unreachable_backend_falls_back_to_memory(memory_cache, monkeypatch):
+    monkeypatch.setattr(app, "_result_cache", Down())
+    monkeypatch.setattr(app, "_result_cache_fallback", memory_cache)
+    logs = []
+    monkeypatch.setattr(app, "_log", logs.append)
+    assert app._result_cache_get("k") is None
+    app._result_cache_set("k", [1, 2])
+    assert app._result_cache_get("k") == [1, 2]
+    assert app._result_cache_stats == {"hits": 1, "misses": 1, "errors": 3}
+    assert {r["event"] for r in logs} == {"result_cache_backend_error"}
+    body = TestClient(app.app).get("/v1/cache/stats").json()
+    assert body["backend"] == "redis" and body["entries"] is None and body["errors"] == 3
@@ -0,0 +1,142 @@
+import json
+import time
+from datetime import datetime
+
+import psycopg2.errors
+import pytest
+
+import app
+from app import SlowQueryLog
+
+
+@pytest.fixture
+def logs(monkeypatch):
+    records = []
+    monkeypatch.setattr(app, "_log", records.append)
+    return records
+
+
+def _slow_log(ring_size=10, max_fingerprints=10, interval=0.0, log_file=""):
+    return SlowQueryLog(100.0, ring_size, max_fingerprints, 1.0, interval, log_file)
+
+
+def _wait_for_plan(sample):
+    deadline = time.monotonic() + 5
+    while sample["plan"] is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_only_the_param_shape_is_kept(logs, monkeypatch):
+    log = _slow_log()
+    monkeypatch.setattr(log, "_queue_explain", lambda *a: None)
+    params = ("Jane Q. Owner", 30.25, None, [1, 2, 3], datetime(2024, 1, 2), 7)
+    log.record("SELECT *  FROM app.wells\n WHERE owner = %s AND lat > %s LIMIT 25", params, 0.2, None)
+    sample = log.snapshot()["samples"][0]
+    assert sample["params"] == ["text", "float", "null", "array[3]", "timestamp", "int"]
+    assert sample["sql"] == "SELECT * FROM app.wells WHERE owner = %s AND lat > %s LIMIT ?"
+    dumped = json.dumps([log.snapshot(), logs], default=str)
+    assert "Jane" not in dumped and "30.25" not in dumped and "2024" not in dumped
+    assert logs[0]["event"] == "slow_query" and logs[0]["params"] == sample["params"]
+
+
+def test_ring_buffer_keeps_the_newest_samples(logs):
+    log = _slow_log(ring_size=3, max_fingerprints=2)
+    for i in range(5):
+        log.record(f"UPDATE t{chr(97 + i)} SET x = 1", None, 0.1 + i / 100, None)
+    snap = log.snapshot()
+    assert [s["sql"] for s in snap["samples"]] == ["UPDATE te SET x = ?", "UPDATE td SET x = ?", "UPDATE tc SET x = ?"]
+    # per-SQL aggregates are bounded too (least recently seen dropped)
+    assert sorted(st["sql"] for st in snap["top"]) == ["UPDATE td SET x = ?", "UPDATE te SET x = ?"]
+
+
+def test_fast_queries_are_only_aggregated(logs):
+    log = _slow_log()
+    for ms in (10, 30, 20):
+        log.record("SELECT 1", None, ms / 1000, None)
+    log.record("SELECT 1", None, 0.001, "QueryCanceled")  # cancelled counts as slow however quick
+    snap = log.snapshot()
+    assert snap["top"] == [{"sql": "SELECT ?", "calls": 4, "total_ms": 61.0, "max_ms": 30.0, "slow": 1,
+                            "errors": 1, "avg_ms": 15.25}]
+    assert [s["error"] for s in snap["samples"]] == ["QueryCanceled"]
+
+
+class ExplainCursor:
+    def __init__(self, cancel_analyze=False):
+        self.cancel_analyze = cancel_analyze
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, sql, params):
+        return (sql % tuple(repr(p) for p in params)).encode("utf-8")
+
+    def execute(self, sql):
+        self.executed.append(sql)
+        if self.cancel_analyze and sql.startswith("EXPLAIN (ANALYZE"):
+            raise psycopg2.errors.QueryCanceled("canceling statement due to statement timeout")
+
+    def fetchall(self):
+        return [("Limit  (cost=0.42..1.00 rows=25)",), ("  ->  Index Scan using wells_mat_rank",)]
+
+
+class ExplainConn:
+    closed = False
+
+    def __init__(self, cur):
+        self.cur = cur
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self.cur
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.mark.parametrize("cancel", [False, True])
+def test_prepared_execute_is_explained_as_its_source_sql(logs, monkeypatch, cancel):
+    log = _slow_log()
+    cur = ExplainCursor(cancel_analyze=cancel)
+    log._explain_conn = ExplainConn(cur)
+    monkeypatch.setattr(app, "_slow_queries", log)
+    source = "SELECT id FROM app.wells_mat_sdr WHERE county = %s ORDER BY date_rank, id LIMIT %s"
+    monkeypatch.setitem(app._prepared_source, "wq_test", source)
+    app._report_execute(None, "EXECUTE wq_test (%s, %s)", ("Travis", 26), 0.25, None)
+    sample = log.snapshot()["samples"][0]
+    assert sample["sql"] == app._normalize_sql(source) and sample["params"] == ["text", "int"]
+    _wait_for_plan(log._samples[0])
+    stmt = "SELECT id FROM app.wells_mat_sdr WHERE county = 'Travis' ORDER BY date_rank, id LIMIT 26"
+    if cancel:
+        assert cur.executed == ["EXPLAIN (ANALYZE, BUFFERS) " + stmt, "EXPLAIN " + stmt]
+    else:
+        assert cur.executed == ["EXPLAIN (ANALYZE, BUFFERS) " + stmt]
+    assert log._samples[0]["plan"].startswith("Limit") and log._samples[0]["plan_analyzed"] is (not cancel)
+
+
+def test_prepare_and_unknown_statements_are_not_reported(monkeypatch):
+    log = _slow_log()
+    monkeypatch.setattr(app, "_slow_queries", log)
+    app._report_execute(None, "PREPARE wq_x AS SELECT 1", None, 1.0, None)
+    app._report_execute(None, "DEALLOCATE ALL", None, 1.0, None)
+    app._report_execute(None, "EXECUTE wq_unknown (%s)", (1,), 1.0, None)
+    assert log.snapshot() == {"threshold_ms": 100.0, "samples": [], "top": []}
+
+
+def test_explain_is_throttled_per_sql_and_skips_writes(logs, monkeypatch, tmp_path):
+    path = tmp_path / "slow.jsonl"
+    log = _slow_log(interval=300, log_file=str(path))
+    explained = []
+    monkeypatch.setattr(log, "_queue_explain", lambda sample, sql, params: explained.append(sql))
+    log.record("SELECT * FROM app.wells WHERE county = %s", ("A",), 0.3, None)
+    log.record("SELECT * FROM app.wells WHERE county = %s", ("B",), 0.3, None)
+    log.record("DELETE FROM app.wells WHERE id = %s", ("sdr:1",), 0.3, None)
+    assert explained == ["SELECT * FROM app.wells WHERE county = %s"]
+    # samples not explained go straight to the log file, values still omitted
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["sql"][:6] for line in lines] == ["SELECT", "DELETE"]
+    assert "sdr:1" not in path.read_text()
@@ -0,0 +1,152 @@
+import re
+
+import psycopg2.errors
+import pytest
+
+import app
+from conftest import FakeCursor
+
+
+@pytest.fixture(autouse=True)
+def fresh_statements(monkeypatch):
+    # Compiled shapes and prepared names are process-wide; start each test empty
+    monkeypatch.setattr(app, "_well_query_sql", {})
+    monkeypatch.setattr(app, "_prepare_sql", {})
+    monkeypatch.setattr(app, "_prepared_source", {})
+    monkeypatch.setattr(app, "_prepared_by_conn", app.weakref.WeakKeyDictionary())
+
+
+def _bind(sql, params):
+    """Inline params at their %s placeholders, to read which value lands where."""
+    parts = sql.split("%s")
+    assert len(parts) == len(params) + 1
+    return parts[0] + "".join(repr(v) + p for v, p in zip(params, parts[1:]))
+
+
+@pytest.mark.parametrize("use_mat", [False, True])
+def test_all_filters_bind_in_placeholder_order(monkeypatch, use_mat):
+    monkeypatch.setattr(app, "USE_WELLS_MAT", use_mat)
+    cursor = app._encode_cursor("2001-02-03", "sdr:42")
+    q = app._compile_well_query(
+        "sdr", county="Travis", depth_min=10.0, depth_max=900.0, date_from="1990-01-01", date_to="2020-12-31",
+        lat=30.25, lon=-97.75, radius_m=5000.0, cursor=cursor, limit=26, with_distance=True,
+    )
+    bound = _bind(q.sql, q.params)
+    min_lat, max_lat, min_lon, max_lon = app._bbox_around(30.25, -97.75, 5000.0)
+    # distance projection first, then WHERE clauses in order, then LIMIT
+    assert "SIN(RADIANS(30.25 - lat)/2),2) + COS(RADIANS(30.25)) * COS(RADIANS(lat)) * POWER(SIN(RADIANS(-97.75 - lon)" in bound
+    assert bound.index(" FROM ") > bound.index("RADIANS(-97.75 - lon)")
+    expected = [
+        "county = 'Travis'", "depth_ft >= 10.0", "depth_ft <= 900.0",
+        "date_completed >= '1990-01-01'::date", "date_completed <= '2020-12-31'::date", "date_completed IS NOT NULL",
+        f"point({min_lon!r}, {min_lat!r}), point({max_lon!r}, {max_lat!r})" if use_mat
+        else f"lat BETWEEN {min_lat!r} AND {max_lat!r} AND lon BETWEEN {min_lon!r} AND {max_lon!r}",
+        ") <= 5000.0", ", id) > (-11356, 'sdr:42')", "ORDER BY", "LIMIT 26",
+    ]
+    positions = [bound.index(s, bound.index(" FROM ")) for s in expected]
+    assert positions == sorted(positions)
+    assert q.shape == ("app.wells_mat_sdr" if use_mat else "app.wells_sdr", False, True,
+                       ("county", "depth_min", "depth_max", "date_from", "date_to", "radius", "cursor"), True)
+
+
+def test_prepare_body_numbers_placeholders_in_order():
+    q = app._compile_well_query("all", county="Travis", lat=30.0, lon=-97.0, radius_m=100.0, limit=5, with_distance=True)
+    body = app._prepare_sql[q.name]
+    assert "%s" not in body
+    assert [int(n) for n in re.findall(r"\$(\d+)", body)] == list(range(1, len(q.params) + 1))
+    assert re.sub(r"\$\d+", "%s", body) == q.sql == app._prepared_source[q.name]
+
+
+def test_same_shape_shares_sql_and_name():
+    a = app._compile_well_query("sdr", county="Travis", limit=25)
+    b = app._compile_well_query("sdr", county="Harris", limit=100)
+    c = app._compile_well_query("sdr", county="Harris")
+    assert (a.sql, a.name, a.shape) == (b.sql, b.name, b.shape)
+    assert a.params == ("Travis", 25) and b.params == ("Harris", 100)
+    assert a.cache_key != b.cache_key
+    assert c.name != a.name and "LIMIT" not in c.sql and c.params == ("Harris",)
+
+
+def test_distance_needs_both_coordinates():
+    q = app._compile_well_query("sdr", lat=30.0, with_distance=True)
+    assert q.params == () and "NULL::double precision" in q.sql and q.shape[2] is False
+
+
+def test_typed_dates_keeps_the_date_column():
+    text = app._compile_well_query("sdr")
+    typed = app._compile_well_query("sdr", typed_dates=True)
+    assert "to_char(date_completed, 'YYYY-MM-DD')" in text.sql
+    assert "to_char" not in typed.sql and "source_id" in typed.sql
+    assert typed.shape[1] is True and typed.name != text.name
+
+
+class Conn:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class PreparingCursor(FakeCursor):
+    """FakeCursor whose EXECUTE fails with InvalidSqlStatementName `lost` times, as after DISCARD ALL."""
+
+    def __init__(self, conn, lost=0):
+        super().__init__()
+        self.connection = conn
+        self.lost = lost
+
+    def execute(self, sql, params=None):
+        super().execute(sql, params)
+        if sql.startswith("EXECUTE") and self.lost:
+            self.lost -= 1
+            raise psycopg2.errors.InvalidSqlStatementName("prepared statement does not exist")
+
+
+def _statements(cur):
+    return [sql.split(" ")[0] for sql, _ in cur.executed]
+
+
+def test_prepares_once_per_connection(monkeypatch):
+    monkeypatch.setattr(app, "USE_PREPARED_STATEMENTS", True)
+    q = app._compile_well_query("sdr", county="Travis", limit=25)
+    conn = Conn()
+    cur = PreparingCursor(conn)
+    app._execute_well_query(cur, q)
+    app._execute_well_query(cur, q)
+    assert _statements(cur) == ["PREPARE", "EXECUTE", "EXECUTE"]
+    assert cur.executed[0][0] == f"PREPARE {q.name} AS {app._prepare_sql[q.name]}"
+    assert cur.executed[1] == (f"EXECUTE {q.name} (%s, %s)", ("Travis", 25))
+    other = PreparingCursor(Conn())
+    app._execute_well_query(other, q)
+    assert _statements(other) == ["PREPARE", "EXECUTE"]
+
+
+def test_lost_statement_is_prepared_again(monkeypatch):
+    monkeypatch.setattr(app, "USE_PREPARED_STATEMENTS", True)
+    q = app._compile_well_query("sdr", county="Travis")
+    conn = Conn()
+    app._prepared_by_conn[conn] = {q.name}  # prepared earlier on this session, since reset
+    cur = PreparingCursor(conn, lost=1)
+    app._execute_well_query(cur, q)
+    assert _statements(cur) == ["EXECUTE", "PREPARE", "EXECUTE"]
+    assert conn.rollbacks == 1 and app._prepared_by_conn[conn] == {q.name}
+
+
+def test_gives_up_after_second_failure(monkeypatch):
+    monkeypatch.setattr(app, "USE_PREPARED_STATEMENTS", True)
+    q = app._compile_well_query("sdr")
+    conn = Conn()
+    cur = PreparingCursor(conn, lost=2)
+    with pytest.raises(psycopg2.errors.InvalidSqlStatementName):
+        app._execute_well_query(cur, q)
+    assert _statements(cur) == ["PREPARE", "EXECUTE", "PREPARE", "EXECUTE"]
+    assert conn.rollbacks == 2 and conn not in app._prepared_by_conn
+
+
+def test_plain_execute_when_disabled(monkeypatch):
+    monkeypatch.setattr(app, "USE_PREPARED_STATEMENTS", False)
+    q = app._compile_well_query("sdr", county="Travis")
+    cur = PreparingCursor(Conn())
+    app._execute_well_query(cur, q)
+    assert cur.executed == [(q.sql, ("Travis",))]
@@ -0,0 +1 @@
+"""Reproducible benchmarks: synthetic SDR/GWDB data (bench.synth) and the API/loader runner (bench.run)."""
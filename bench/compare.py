@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare two bench.run reports
+
+Prints old/new latency per scenario (and seconds per load stage) with the
+relative change; exits 1 when any scenario's metric or load stage got slower
+by more than --threshold, so it can gate CI.
+
+Usage
+  python -m bench.compare base.json head.json --metric p95 --threshold 0.15
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import List, Optional, Tuple
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Diff two benchmark reports")
+    ap.add_argument("old")
+    ap.add_argument("new")
+    ap.add_argument("--metric", default="p50", choices=["min", "mean", "p50", "p90", "p95", "p99", "max"])
+    ap.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression")
+    return ap.parse_args()
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+
+def compare(old: dict, new: dict, metric: str, threshold: float) -> Tuple[List[str], List[str]]:
+    """(table lines, regressed names)."""
+    lines = [f"{'':22s} {'old':>10s} {'new':>10s} {'change':>8s}"]
+    regressions: List[str] = []
+
+    def row(name: str, a: Optional[float], b: Optional[float], unit: str) -> None:
+        delta = _change(a, b)
+        flag = ""
+        if delta is not None and delta > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        fmt = lambda v: "-" if v is None else (f"{v:.1f}ms" if unit == "ms" else f"{v:.2f}s")
+        lines.append(f"{name:22s} {fmt(a):>10s} {fmt(b):>10s} {'-' if delta is None else f'{delta:+.1%}':>8s}{flag}")
+
+    for name in sorted(set(old.get("scenarios", {})) | set(new.get("scenarios", {}))):
+        a = old.get("scenarios", {}).get(name, {}).get("latency_ms", {}).get(metric)
+        b = new.get("scenarios", {}).get(name, {}).get("latency_ms", {}).get(metric)
+        row(name, a, b, "ms")
+    for stage in sorted(set(old.get("load") or {}) | set(new.get("load") or {})):
+        a = ((old.get("load") or {}).get(stage) or {}).get("sec")
+        b = ((new.get("load") or {}).get(stage) or {}).get("sec")
+        row(stage, a, b, "s")
+    return lines, regressions
+
+
+def main() -> int:
+    args = parse_args()
+    old, new = _load(args.old), _load(args.new)
+    for key in ("lithology_rows", "seed", "concurrency"):
+        if old.get("settings", {}).get(key) != new.get("settings", {}).get(key):
+            print(f"warning: {key} differs ({old.get('settings', {}).get(key)} vs {new.get('settings', {}).get(key)})", file=sys.stderr)
+    print(f"{old.get('meta', {}).get('git_commit', '')[:12]} -> {new.get('meta', {}).get('git_commit', '')[:12]}  ({args.metric})")
+    lines, regressions = compare(old, new, args.metric, args.threshold)
+    print("\n".join(lines))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner: synthetic data -> loader -> API latency report
+
+1. Generates the synthetic SDR/GWDB zips (bench.synth), reusing <data-dir> when
+   it already holds a dataset with the same --lithology-rows/--seed
+2. Loads both through ground_truth/loader/load_ground_truth.py (timed per
+   source), applies db/app_views.sql + db/app_wells_mat.sql and rebuilds the
+   app.wells_mat partitions with --rematerialize (timed separately)
+3. Starts the API (uvicorn, api/app.py) against that database, or uses
+   --base-url, and times each scenario: /v1/search filter mixes, radius search,
+   nearest, CSV export, PDF report and /v1/batch
+4. Writes a JSON report (sorted keys, stable scenario names) with the commit,
+   environment, dataset row counts, load times and per-scenario latency
+   percentiles; compare two reports with `python -m bench.compare`
+
+Requests in a scenario are drawn from a generator seeded with --seed, so two
+runs send the same requests in the same order. The spawned API runs with the
+result cache and rate limiter off (every request hits the database) and renders
+PDF maps from a local blank-tile server instead of OpenStreetMap, so timings do
+not depend on the network. Use a scratch database: loading replaces the
+ground_truth / gwdb_ground_truth schemas.
+
+Usage
+  python -m bench.run --database-url "$DATABASE_URL" --lithology-rows 10000 --out bench-report.json
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+import psycopg2
+
+from bench import synth
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+API_DIR = os.path.join(REPO_ROOT, "api")
+LOADER = os.path.join(REPO_ROOT, "ground_truth", "loader", "load_ground_truth.py")
+APP_SQL = [os.path.join(REPO_ROOT, "db", "app_views.sql"), os.path.join(REPO_ROOT, "db", "app_wells_mat.sql")]
+LOAD_SCHEMAS = {"sdr": "ground_truth", "gwdb": "gwdb_ground_truth"}
+REPORT_SCHEMA = 1
+
+# (method, path with query, body, content type)
+RequestSpec = Tuple[str, str, Optional[bytes], Optional[str]]
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Load a synthetic dataset and time the API; writes a JSON report")
+    ap.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Scratch database (its ground truth schemas are replaced)")
+    ap.add_argument("--data-dir", default="/tmp/txwells-bench", help="Where the synthetic zips are written/reused")
+    ap.add_argument("--lithology-rows", type=int, default=10000, help=f"Dataset size as WellLithology rows (real: {synth.REAL_LITHOLOGY_ROWS})")
+    ap.add_argument("--seed", type=int, default=1, help="Seeds the dataset and the request mix")
+    ap.add_argument("--skip-load", action="store_true", help="Benchmark whatever is loaded already (no generate/load)")
+    ap.add_argument("--load-jobs", type=int, default=1, help="--jobs passed to the loader")
+    ap.add_argument("--base-url", default=None, help="Benchmark a running API instead of starting one")
+    ap.add_argument("--iterations", type=int, default=50, help="Timed requests per search scenario")
+    ap.add_argument("--heavy-iterations", type=int, default=5, help="Timed requests per export/PDF/batch scenario")
+    ap.add_argument("--warmup", type=int, default=3, help="Untimed requests before each scenario")
+    ap.add_argument("--concurrency", type=int, default=1, help="Requests in flight per scenario")
+    ap.add_argument("--scenarios", default="", help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    ap.add_argument("--out", default="bench-report.json", help="JSON report path ('-' for stdout)")
+    return ap.parse_args()
+
+
+# --- scenarios ---------------------------------------------------------------
+
+def _county(rng: random.Random) -> str:
+    return rng.choices(synth.COUNTIES, synth.COUNTY_WEIGHTS)[0][0]
+
+
+def _point(rng: random.Random) -> Tuple[float, float]:
+    _, lat, lon = rng.choices(synth.COUNTIES, synth.COUNTY_WEIGHTS)[0]
+    return round(rng.gauss(lat, 0.2), 5), round(rng.gauss(lon, 0.25), 5)
+
+
+def _get(path: str, params: dict) -> RequestSpec:
+    return "GET", f"{path}?{urlencode(params)}", None, None
+
+
+def _post_json(path: str, body: dict) -> RequestSpec:
+    return "POST", path, json.dumps(body).encode("utf-8"), "application/json"
+
+
+def _search_county(rng: random.Random) -> RequestSpec:
+    return _get("/v1/search", {"county": _county(rng), "limit": 50})
+
+
+def _search_filters(rng: random.Random) -> RequestSpec:
+    """Random mix of the UI filters: county, depth range, date range, source."""
+    params: dict = {"limit": rng.choice([25, 50, 200]), "source": rng.choice(["sdr", "sdr", "gwdb", "all"])}
+    if rng.random() < 0.6:
+        params["county"] = _county(rng)
+    if rng.random() < 0.5:
+        lo = rng.choice([0, 100, 200, 400])
+        params.update(depth_min=lo, depth_max=lo + rng.choice([100, 300, 1000]))
+    if rng.random() < 0.5:
+        year = rng.randint(1970, 2020)
+        params.update(date_from=f"{year}-01-01", date_to=f"{year + rng.randint(1, 10)}-12-31")
+    return _get("/v1/search", params)
+
+
+def _search_radius(rng: random.Random) -> RequestSpec:
+    lat, lon = _point(rng)
+    return _get("/v1/search", {"lat": lat, "lon": lon, "radius_m": rng.choice([1000, 5000, 25000]), "limit": 50,
+                               "source": rng.choice(["sdr", "all"])})
+
+
+def _nearest(rng: random.Random) -> RequestSpec:
+    lat, lon = _point(rng)
+    return _get("/v1/wells/nearest", {"lat": lat, "lon": lon, "k": 25})
+
+
+def _export_csv(rng: random.Random) -> RequestSpec:
+    # Every matching row, streamed
+    return _post_json("/v1/search.csv", {"county": _county(rng), "limit": None})
+
+
+def _report_pdf(rng: random.Random) -> RequestSpec:
+    return _post_json("/v1/reports", {"county": _county(rng), "limit": 100})
+
+
+def _batch_zip(rng: random.Random) -> RequestSpec:
+    lines = ["lat,lon"] + ["%s,%s" % _point(rng) for _ in range(5)]
+    boundary = uuid.UUID(int=rng.getrandbits(128)).hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"points.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n" + "\n".join(lines) + f"\n\r\n--{boundary}--\r\n"
+    ).encode("utf-8")
+    return "POST", "/v1/batch?limit=5", body, f"multipart/form-data; boundary={boundary}"
+
+
+# name -> (request generator, heavy); heavy scenarios run --heavy-iterations times
+SCENARIOS: Dict[str, Tuple[Callable[[random.Random], RequestSpec], bool]] = {
+    "search_county": (_search_county, False),
+    "search_filters": (_search_filters, False),
+    "search_radius": (_search_radius, False),
+    "nearest": (_nearest, False),
+    "export_csv": (_export_csv, True),
+    "report_pdf": (_report_pdf, True),
+    "batch_zip": (_batch_zip, True),
+}
+
+
+# --- HTTP client ---------------------------------------------------------------
+
+class _Client:
+    """One keep-alive connection per thread."""
+
+    def __init__(self, base_url: str) -> None:
+        url = urlsplit(base_url)
+        self._host, self._port = url.hostname or "127.0.0.1", url.port or 80
+        self._local = threading.local()
+
+    def request(self, spec: RequestSpec, timeout: float = 300.0) -> Tuple[int, int, float]:
+        """(status, body bytes, seconds until the whole body was read)."""
+        method, path, body, content_type = spec
+        headers = {"Content-Type": content_type} if content_type else {}
+        for attempt in (0, 1):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self._host, self._port, timeout=timeout)
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                size = len(resp.read())
+                return resp.status, size, time.perf_counter() - start
+            except (http.client.HTTPException, ConnectionError):
+                # Server closed the idle keep-alive connection: reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def run_scenario(client: _Client, name: str, iterations: int, warmup: int, concurrency: int, seed: int) -> dict:
+    gen = SCENARIOS[name][0]
+    rng = random.Random(f"{seed}:{name}")
+    specs = [gen(rng) for _ in range(warmup + iterations)]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+        list(ex.map(client.request, specs[:warmup]))
+        started = time.perf_counter()
+        results = list(ex.map(client.request, specs[warmup:]))
+        wall = time.perf_counter() - started
+    statuses: Dict[str, int] = {}
+    for status, _, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    latencies = sorted(sec * 1000.0 for _, _, sec in results)
+    return {
+        "requests": len(results),
+        "errors": sum(1 for status, _, _ in results if status >= 400),
+        "status": statuses,
+        "latency_ms": {
+            "min": round(latencies[0], 2),
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "p50": round(_percentile(latencies, 0.50), 2),
+            "p90": round(_percentile(latencies, 0.90), 2),
+            "p95": round(_percentile(latencies, 0.95), 2),
+            "p99": round(_percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "throughput_rps": round(len(results) / wall, 2) if wall > 0 else None,
+        "bytes_mean": round(sum(size for _, size, _ in results) / len(results)),
+    }
+
+
+# --- dataset load ------------------------------------------------------------
+
+def _run(cmd: List[str]) -> float:
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stdout + proc.stderr)
+        raise SystemExit(f"failed ({proc.returncode}): {' '.join(cmd)}")
+    return time.perf_counter() - started
+
+
+def load_dataset(database_url: str, manifest: dict, jobs: int) -> dict:
+    """Load both zips, (re)create the app views and rebuild app.wells_mat; seconds per stage."""
+    timings: dict = {}
+    for source, schema in LOAD_SCHEMAS.items():
+        info = manifest["sources"][source]
+        # Materialization is timed on its own below, the same way on first and later runs
+        sec = _run([sys.executable, LOADER, "--zip", info["zip"], "--database-url", database_url, "--schema", schema,
+                    "--jobs", str(jobs), "--wells-mat-sql", ""])
+        timings[f"load_{source}"] = {"sec": round(sec, 3), "rows": info["total_rows"],
+                                     "rows_per_sec": round(info["total_rows"] / sec) if sec > 0 else None}
+    started = time.perf_counter()
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn, conn.cursor() as cur:
+            for path in APP_SQL:
+                with open(path, "r", encoding="utf-8") as f:
+                    cur.execute(f.read())
+    finally:
+        conn.close()
+    timings["apply_app_sql"] = {"sec": round(time.perf_counter() - started, 3)}
+    for source, schema in LOAD_SCHEMAS.items():
+        sec = _run([sys.executable, LOADER, "--rematerialize", "--database-url", database_url, "--schema", schema])
+        timings[f"materialize_{source}"] = {"sec": round(sec, 3)}
+    return timings
+
+
+def _db_info(database_url: str) -> dict:
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            version = cur.fetchone()[0]
+            cur.execute("SELECT source, COUNT(*) FROM app.wells_mat GROUP BY source ORDER BY source")
+            wells = {r[0]: int(r[1]) for r in cur.fetchall()}
+        return {"postgres": version, "wells": wells}
+    finally:
+        conn.close()
+
+
+# --- API process -------------------------------------------------------------
+
+def _blank_png(size: int = 256) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    pixels = zlib.compress((b"\x00" + b"\xee\xee\xe8" * size) * size)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", pixels) + chunk(b"IEND", b""))
+
+
+def start_tile_server() -> ThreadingHTTPServer:
+    """Loopback server answering every path with the same PNG (PDF map basemap)."""
+    png = _blank_png()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(png)))
+            self.end_headers()
+            self.wfile.write(png)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, name="bench-tiles", daemon=True).start()
+    return server
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(database_url: str, tile_url: str, log_path: str) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        RESULT_CACHE_BACKEND="none",
+        RATE_LIMIT_ENABLED="false",
+        LOG_SAMPLE_2XX="0",
+        STATICMAP_TILE_URL=tile_url,
+    )
+    log = open(log_path, "wb")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=API_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"API exited with {proc.returncode}; see {log_path}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/ready")
+            if conn.getresponse().status == 200:
+                return proc, base_url
+        except OSError:
+            pass
+        time.sleep(0.25)
+    proc.terminate()
+    raise SystemExit(f"API not ready after 60s; see {log_path}")
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> int:
+    args = parse_args()
+    if not args.database_url:
+        print("DATABASE_URL not provided", file=sys.stderr)
+        return 2
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()] or list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        print(f"unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    report: dict = {
+        "schema": REPORT_SCHEMA,
+        "meta": {
+            "git_commit": _git("rev-parse", "HEAD"),
+            "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "started_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "settings": {
+            "lithology_rows": args.lithology_rows, "seed": args.seed, "iterations": args.iterations,
+            "heavy_iterations": args.heavy_iterations, "warmup": args.warmup, "concurrency": args.concurrency,
+            "load_jobs": args.load_jobs, "api": args.base_url or "spawned",
+        },
+        "dataset": None,
+        "load": None,
+        "scenarios": {},
+    }
+
+    if not args.skip_load:
+        manifest = synth.load_manifest(args.data_dir, args.lithology_rows, args.seed)
+        if manifest is None:
+            print(f"generating dataset ({args.lithology_rows} lithology rows) in {args.data_dir}", file=sys.stderr)
+            manifest = synth.generate(args.data_dir, args.lithology_rows, args.seed)
+        report["dataset"] = {source: {"rows": info["rows"], "total_rows": info["total_rows"], "zip_bytes": info["zip_bytes"]}
+                             for source, info in manifest["sources"].items()}
+        print("loading dataset", file=sys.stderr)
+        report["load"] = load_dataset(args.database_url, manifest, args.load_jobs)
+    report["meta"].update(_db_info(args.database_url))
+
+    tiles = proc = None
+    try:
+        base_url = args.base_url
+        if base_url is None:
+            tiles = start_tile_server()
+            tile_url = f"http://127.0.0.1:{tiles.server_address[1]}/{{z}}/{{x}}/{{y}}.png"
+            os.makedirs(args.data_dir, exist_ok=True)
+            proc, base_url = start_api(args.database_url, tile_url, os.path.join(args.data_dir, "api.log"))
+        client = _Client(base_url)
+        for name in names:
+            iterations = args.heavy_iterations if SCENARIOS[name][1] else args.iterations
+            result = run_scenario(client, name, iterations, args.warmup, args.concurrency, args.seed)
+            report["scenarios"][name] = result
+            lat = result["latency_ms"]
+            print(f"{name:15s} n={result['requests']:<4d} err={result['errors']:<3d} "
+                  f"p50={lat['p50']:.1f}ms p95={lat['p95']:.1f}ms max={lat['max']:.1f}ms", file=sys.stderr)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if tiles is not None:
+            tiles.shutdown()
+
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.out == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"wrote {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Synthetic SDR / GWDB downloads for benchmarks
+
+- Table and column lists come from docs/SCHEMA.md (SDR) and docs/SCHEMA_GWDB.md
+  (GWDB); every table is written as a '|' delimited .txt member with a header
+  row, exactly the zip layout load_ground_truth.py reads
+- Sizes keep the row ratios of the "Approx rows" in those docs, scaled so
+  WellLithology (the largest table) has --lithology-rows rows: 10000 gives a
+  ~1.3k-well dataset, 5117189 the real size
+- Output is deterministic for a given (--lithology-rows, --seed): wells are
+  spread over real Texas counties (a few large ones dominate, as in the real
+  data) around their centroids, child rows point at existing parent keys, and
+  dates/coordinates use the mix of formats and blanks the app views parse
+- Writes <out-dir>/sdr.zip, <out-dir>/gwdb.zip and <out-dir>/manifest.json
+  (parameters, per-table row counts, zip sizes)
+
+Usage
+  python -m bench.synth --out-dir /tmp/txwells-bench --lithology-rows 10000
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import time
+import zipfile
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+DOCS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "docs"))
+SCHEMA_DOCS = {"sdr": os.path.join(DOCS_DIR, "SCHEMA.md"), "gwdb": os.path.join(DOCS_DIR, "SCHEMA_GWDB.md")}
+ZIP_PREFIX = {"sdr": "SDRDownload", "gwdb": "GWDBDownload"}
+REAL_LITHOLOGY_ROWS = 5117189  # SDR WellLithology in docs/SCHEMA.md
+
+# (source, table) -> key column it numbers sequentially; other tables reference these keys
+PARENT_TABLES = {
+    ("sdr", "WellData"): "WellReportTrackingNumber",
+    ("sdr", "PlugData"): "PluggingReportTrackingNumber",
+    ("gwdb", "WellMain"): "StateWellNumber",
+}
+KEY_START = {"WellReportTrackingNumber": 100000, "PluggingReportTrackingNumber": 10000, "StateWellNumber": 1000000}
+
+# County, centroid (lat, lon); earlier counties get more wells
+COUNTIES: List[Tuple[str, float, float]] = [
+    ("Harris", 29.86, -95.39), ("Travis", 30.33, -97.78), ("Bexar", 29.45, -98.52), ("Dallas", 32.77, -96.78),
+    ("Tarrant", 32.77, -97.29), ("Williamson", 30.65, -97.60), ("Montgomery", 30.30, -95.50), ("Hidalgo", 26.40, -98.18),
+    ("Collin", 33.19, -96.57), ("Denton", 33.21, -97.12), ("Fort Bend", 29.53, -95.77), ("Midland", 31.87, -102.03),
+    ("Lubbock", 33.61, -101.82), ("El Paso", 31.77, -106.24), ("Hays", 30.06, -98.03), ("Comal", 29.81, -98.28),
+    ("Ector", 31.87, -102.54), ("Brazos", 30.66, -96.30), ("Galveston", 29.39, -94.97), ("Smith", 32.38, -95.27),
+    ("Bell", 31.04, -97.48), ("Nueces", 27.73, -97.52), ("McLennan", 31.55, -97.20), ("Parker", 32.78, -97.80),
+    ("Kerr", 30.06, -99.35),
+]
+COUNTY_WEIGHTS = [1.0 / (i + 1) ** 0.8 for i in range(len(COUNTIES))]
+
+FIRST_NAMES = ["John", "Mary", "Jose", "Linda", "James", "Maria", "Robert", "Patricia", "David", "Carmen", "Billy", "Sue"]
+LAST_NAMES = ["Smith", "Garcia", "Johnson", "Martinez", "Brown", "Hernandez", "Miller", "Lopez", "Davis", "Wilson", "Moore", "Lee"]
+COMPANIES = ["Lone Star Drilling", "Hill Country Water Wells", "Gulf Coast Pump & Supply", "Permian Drilling Co", "Brazos Valley Wells"]
+CITIES = ["Houston", "Austin", "San Antonio", "Dallas", "Fort Worth", "Midland", "Lubbock", "El Paso", "Bryan", "Tyler"]
+STREETS = ["FM 1826", "County Road 12", "Main St", "Ranch Rd 620", "Old Spanish Trl", "Hwy 290"]
+LITHOLOGY = ["SAND", "CLAY", "LIMESTONE", "SHALE", "GRAVEL", "TOPSOIL", "CALICHE", "SANDSTONE", 'SAND, fine "gray"', "CLAY | SAND"]
+CODES = ["Y", "N", "Domestic", "Irrigation", "Stock", "Public Supply", "Monitor", "New Well", "Replacement", "Other"]
+DIAMETERS = ["4.5", "5", "6", "6.625", "8", "10"]
+
+_Gen = Callable[[random.Random, dict], str]
+
+
+def parse_schema_md(path: str) -> List[Tuple[str, int, List[str]]]:
+    """[(table, approx rows, [columns])] from a generate_schema_md.py document."""
+    tables: List[Tuple[str, int, List[str]]] = []
+    current = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("## "):
+                name = line[3:].strip()
+                current = None if name == "Tables" else [name, 0, []]
+                if current is not None:
+                    tables.append(current)
+            elif current is not None and line.startswith("Approx rows:"):
+                current[1] = int(line.split(":", 1)[1].strip() or 0)
+            elif current is not None and line.startswith("| ") and not line.startswith(("| Column", "|---")):
+                current[2].append(line.split("|")[1].strip())
+    return [(t, n, cols) for t, n, cols in tables if cols]
+
+
+def _random_date(rng: random.Random) -> date:
+    # Skewed towards recent years, like the real reports
+    return date(2025, 6, 30) - timedelta(days=int(rng.expovariate(1 / 4000.0)) % 27000)
+
+
+def _date_text(rng: random.Random, _row: dict) -> str:
+    r = rng.random()
+    if r < 0.05:
+        return ""
+    d = _random_date(rng)
+    return d.strftime("%m/%d/%Y") if r < 0.75 else d.isoformat()
+
+
+def _coord(axis: int, spread: float) -> _Gen:
+    def gen(rng: random.Random, row: dict) -> str:
+        r = rng.random()
+        if r < 0.02:
+            return ""
+        if r < 0.025:
+            return "0"  # parses, but outside Texas: NULL in the views
+        return f"{rng.gauss(COUNTIES[row['county']][axis], spread):.6f}"
+    return gen
+
+
+def _top(rng: random.Random, row: dict) -> str:
+    return str(row["top"])
+
+
+def _bottom(rng: random.Random, row: dict) -> str:
+    return "" if rng.random() < 0.02 else str(row["top"] + rng.randint(5, 250))
+
+
+def _column_generator(source: str, table: str, column: str) -> _Gen:
+    """Value generator for one column, chosen by its name."""
+    name = column.lower()
+    parent_key = PARENT_TABLES.get((source, table))
+    if column in KEY_START:
+        if column == parent_key:
+            return lambda rng, row: str(row["key"])
+        parent = next((t for (s, t), k in PARENT_TABLES.items() if s == source and k == column), None)
+        if parent is None or parent_key is not None:
+            # Cross references in a parent table (e.g. WellData.PluggingReportTrackingNumber) are mostly empty
+            return lambda rng, row: "" if rng.random() < 0.9 else str(KEY_START[column] + rng.randrange(1_000_000))
+        return lambda rng, row: str(row["parent"][column])
+    if name == "county":
+        return lambda rng, row: COUNTIES[row["county"]][0]
+    if name in ("coordddlat", "latitudedd"):
+        return _coord(1, 0.25)
+    if name in ("coordddlong", "longitudedd"):
+        return _coord(2, 0.3)
+    if name == "topdepth":
+        return _top
+    if name == "bottomdepth":
+        return _bottom
+    if "date" in name:
+        return _date_text
+    if "depth" in name or "elevation" in name:
+        return lambda rng, row: "" if rng.random() < 0.1 else str(int(rng.lognormvariate(5.5, 0.8)))
+    if "diameter" in name:
+        return lambda rng, row: rng.choice(DIAMETERS)
+    if "zip" in name:
+        return lambda rng, row: f"7{rng.randint(5000, 9999)}"
+    if name.endswith("state"):
+        return lambda rng, row: "TX"
+    if "city" in name:
+        return lambda rng, row: rng.choice(CITIES)
+    if "address" in name:
+        return lambda rng, row: "" if rng.random() < 0.3 else f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+    if name in ("owner", "ownername", "drillername", "driller", "sealedbyname"):
+        return lambda rng, row: "" if rng.random() < 0.03 else f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    if "company" in name:
+        return lambda rng, row: rng.choice(COMPANIES)
+    if "description" in name or "desc" in name or name in ("comments", "remarks"):
+        return lambda rng, row: "" if rng.random() < 0.4 else ", ".join(rng.sample(LITHOLOGY, rng.randint(1, 3)))
+    if "number" in name:
+        return lambda rng, row: "" if rng.random() < 0.7 else str(rng.randint(1, 99999))
+    return lambda rng, row: "" if rng.random() < 0.6 else rng.choice(CODES)
+
+
+def row_counts(lithology_rows: int) -> Dict[str, Dict[str, int]]:
+    """Rows per table per source, keeping the documented ratios."""
+    factor = lithology_rows / REAL_LITHOLOGY_ROWS
+    return {
+        source: {table: max(1, round(approx * factor)) for table, approx, _ in parse_schema_md(path)}
+        for source, path in SCHEMA_DOCS.items()
+    }
+
+
+def _write_table(zf: zipfile.ZipFile, member: str, rng: random.Random, source: str, table: str,
+                 columns: List[str], rows: int, parents: Dict[str, int]) -> None:
+    gens = [_column_generator(source, table, c) for c in columns]
+    parent_key = PARENT_TABLES.get((source, table))
+    child_keys = [c for c in columns if c in parents and c != parent_key]
+    with zf.open(member, "w", force_zip64=True) as raw:
+        text = io.TextIOWrapper(raw, encoding="latin-1", newline="")
+        writer = csv.writer(text, delimiter="|", lineterminator="\n", quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(columns)
+        row: dict = {"parent": {}}
+        for i in range(rows):
+            if parent_key is not None:
+                row["key"] = KEY_START[parent_key] + i
+            for key in child_keys:
+                row["parent"][key] = KEY_START[key] + rng.randrange(parents[key])
+            row["county"] = rng.choices(range(len(COUNTIES)), COUNTY_WEIGHTS)[0]
+            row["top"] = rng.randrange(0, 800, 5)
+            writer.writerow([g(rng, row) for g in gens])
+        text.flush()
+        text.detach()
+
+
+def generate(out_dir: str, lithology_rows: int = 10000, seed: int = 1) -> dict:
+    """Write sdr.zip / gwdb.zip under out_dir and return the manifest (also saved as manifest.json)."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = row_counts(lithology_rows)
+    started = time.perf_counter()
+    manifest: dict = {"lithology_rows": lithology_rows, "seed": seed, "sources": {}}
+    for source, path in SCHEMA_DOCS.items():
+        parents = {key: counts[s][t] for (s, t), key in PARENT_TABLES.items() if s == source}
+        zip_path = os.path.join(out_dir, f"{source}.zip")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+            for table, _, columns in parse_schema_md(path):
+                rng = random.Random(f"{seed}:{source}:{table}")
+                _write_table(zf, f"{ZIP_PREFIX[source]}/{table}.txt", rng, source, table, columns,
+                             counts[source][table], parents)
+        manifest["sources"][source] = {
+            "zip": zip_path,
+            "zip_bytes": os.path.getsize(zip_path),
+            "rows": counts[source],
+            "total_rows": sum(counts[source].values()),
+        }
+    manifest["generate_sec"] = round(time.perf_counter() - started, 3)
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(out_dir: str, lithology_rows: int, seed: int) -> dict | None:
+    """The manifest of an existing dataset generated with the same parameters, if any."""
+    try:
+        with open(os.path.join(out_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("lithology_rows") != lithology_rows or manifest.get("seed") != seed:
+        return None
+    if not all(os.path.exists(s["zip"]) for s in manifest["sources"].values()):
+        return None
+    return manifest
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Generate synthetic SDR/GWDB zips shaped like docs/SCHEMA*.md")
+    ap.add_argument("--out-dir", default="/tmp/txwells-bench")
+    ap.add_argument("--lithology-rows", type=int, default=10000, help=f"WellLithology rows; other tables scale to match (real: {REAL_LITHOLOGY_ROWS})")
+    ap.add_argument("--seed", type=int, default=1)
+    return ap.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    manifest = generate(args.out_dir, args.lithology_rows, args.seed)
+    for source, info in manifest["sources"].items():
+        print(f"{source}: {info['total_rows']} rows, {info['zip_bytes']} bytes -> {info['zip']}")
+    print(f"generated in {manifest['generate_sec']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
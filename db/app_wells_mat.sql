@@ -0,0 +1,61 @@
+-- Typed, indexed materialization of app.wells (read path for the API)
+-- Partitioned by source: the loader rebuilds one partition per load from
+-- app.wells_sdr / app.wells_gwdb and swaps it in (see ground_truth/README.md).
+
+CREATE SCHEMA IF NOT EXISTS app;
+
+CREATE TABLE IF NOT EXISTS app.wells_mat (
+  id text,
+  owner text,
+  county text,
+  lat double precision,
+  lon double precision,
+  depth_ft double precision,
+  date_completed date,
+  location_confidence text,
+  source text NOT NULL,
+  source_id text,
+  -- (lon, lat) for the GiST index behind radius/bbox and nearest-neighbour queries
+  pt point GENERATED ALWAYS AS (point(lon, lat)) STORED,
+  -- Ascending key equivalent to "date_completed DESC NULLS LAST" so keyset
+  -- pagination can use a plain (date_rank, id) > (...) row comparison
+  date_rank integer GENERATED ALWAYS AS (COALESCE(DATE '1970-01-01' - date_completed, 2147483647)) STORED
+) PARTITION BY LIST (source);
+
+-- Upgrade path for tables created before these columns existed
+ALTER TABLE app.wells_mat ADD COLUMN IF NOT EXISTS pt point GENERATED ALWAYS AS (point(lon, lat)) STORED;
+ALTER TABLE app.wells_mat ADD COLUMN IF NOT EXISTS date_rank integer GENERATED ALWAYS AS (COALESCE(DATE '1970-01-01' - date_completed, 2147483647)) STORED;
+
+CREATE TABLE IF NOT EXISTS app.wells_mat_sdr PARTITION OF app.wells_mat FOR VALUES IN ('sdr');
+CREATE TABLE IF NOT EXISTS app.wells_mat_gwdb PARTITION OF app.wells_mat FOR VALUES IN ('gwdb');
+
+-- Filters used by /v1/search, /v1/wells/{id} and exports
+CREATE INDEX IF NOT EXISTS ix_wells_mat_id ON app.wells_mat (id);
+CREATE INDEX IF NOT EXISTS ix_wells_mat_county ON app.wells_mat (county);
+CREATE INDEX IF NOT EXISTS ix_wells_mat_date_completed ON app.wells_mat (date_completed);
+CREATE INDEX IF NOT EXISTS ix_wells_mat_depth_ft ON app.wells_mat (depth_ft);
+-- Default result order (newest first) and keyset pagination, overall and per county
+CREATE INDEX IF NOT EXISTS ix_wells_mat_date_rank_id ON app.wells_mat (date_rank, id);
+CREATE INDEX IF NOT EXISTS ix_wells_mat_county_date_rank_id ON app.wells_mat (county, date_rank, id);
+-- Spatial access path without PostGIS: built-in point GiST (box containment and <-> ordering)
+CREATE INDEX IF NOT EXISTS ix_wells_mat_pt ON app.wells_mat USING gist (pt);
+
+-- Per-zoom map cluster rollup for /v1/clusters (rebuilt by the loader with each partition).
+-- Cells are Web Mercator tiles at zoom + 2 (64 px at 256 px tiles). Sums allow
+-- merging sources and computing centroids/averages at query time.
+CREATE TABLE IF NOT EXISTS app.wells_clusters (
+  source text NOT NULL,
+  zoom smallint NOT NULL,
+  cx integer NOT NULL,
+  cy integer NOT NULL,
+  n bigint NOT NULL,
+  sum_lat double precision NOT NULL,
+  sum_lon double precision NOT NULL,
+  n_depth bigint NOT NULL,
+  sum_depth double precision,
+  min_depth double precision,
+  max_depth double precision,
+  min_date date,
+  max_date date,
+  PRIMARY KEY (source, zoom, cx, cy)
+);
@@ -2,12 +2,31 @@
 """
 Ground Truth Loader — 1:1 SDR mirror
 
-- Drops and recreates a target schema (default: ground_truth)
+- Builds each full load into a versioned schema (e.g. ground_truth_v20261017014500),
+  indexes key columns and ANALYZEs it, then publishes it blue/green: in one short
+  transaction the live schema (default: ground_truth) is renamed to its own
+  version name, the new build is renamed to the live name and the app.* views are
+  re-pointed. The newest --retain previous versions are kept for --rollback
 - For each .txt in the provided zip, creates a table named exactly after the file
   (without extension), quoted as an identifier, with columns taken from the
   header row (also quoted), all typed as TEXT
-- Bulk loads the file using COPY FROM STDIN with delimiter '|', HEADER true,
-  and latin-1 encoding
+- Bulk loads the file using COPY FROM STDIN with delimiter '|' and latin-1
+  encoding, streaming sanitized rows straight from the zip (no temp files)
+- With --jobs N (N > 1), members are COPY'd concurrently into the versioned
+  schema by N worker processes (one connection each), largest members first
+- With --delta, only members whose zip fingerprint (uncompressed size + CRC-32)
+  differs from the last recorded load are reloaded, via a staging table that is
+  swapped in at the end; fingerprints live in <meta-schema>.member_fingerprints
+- Published versions are recorded in <meta-schema>.data_versions. What the API
+  actually reads is recorded per reader in <meta-schema>.served_versions: 'views'
+  in the publish transaction, 'wells_mat' only after the partition swap and the
+  cluster rollup have committed (and again on --rematerialize), so API caches
+  keyed on it never hold old rows under a new version
+- After publishing, app.* views (db/app_views.sql) are re-applied when the app
+  schema exists, since views stay bound to the tables they were created against
+- Finally the schema's partition of the typed app.wells_mat table
+  (db/app_wells_mat.sql) is rebuilt from its app.wells_<source> view, indexed and
+  swapped in, so the API never parses TEXT columns at query time
 
 Notes
 - Duplicate header names in a file are made unique by appending a numeric suffix
@@ -21,14 +40,16 @@ Notes
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import io
 import os
 import sys
 import zipfile
 import re
+import time
+from datetime import datetime, timezone
 from typing import Dict, List, Tuple
 import csv
-import tempfile
 
 import psycopg2
 from psycopg2.extensions import connection as PGConnection
@@ -42,13 +63,45 @@ except OverflowError:
     csv.field_size_limit(2_147_483_647)
 
 
+DEFAULT_VIEWS_SQL = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "db", "app_views.sql"))
+DEFAULT_WELLS_MAT_SQL = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "db", "app_wells_mat.sql"))
+# Loader schema -> app.wells_mat partition it feeds (built from the matching app.wells_<source> view)
+MATERIALIZED_SOURCES = {"ground_truth": "sdr", "gwdb_ground_truth": "gwdb"}
+# Must mirror the parent indexes in db/app_wells_mat.sql so ATTACH PARTITION reuses them
+WELLS_MAT_INDEXES = {
+	"id": "btree (id)",
+	"county": "btree (county)",
+	"date_completed": "btree (date_completed)",
+	"depth_ft": "btree (depth_ft)",
+	"pt": "gist (pt)",
+	"date_rank_id": "btree (date_rank, id)",
+	"county_date_rank_id": "btree (county, date_rank, id)",
+}
+WELLS_MAT_COLUMNS = ("id", "owner", "county", "lat", "lon", "depth_ft", "date_completed", "location_confidence", "source", "source_id")
+# app.wells_clusters rollup: zooms 0..CLUSTER_MAX_ZOOM, cells = tiles at zoom + CLUSTER_CELL_ZOOM_OFFSET
+# (mirrored by CLUSTER_MAX_ZOOM / CLUSTER_CELL_ZOOM_OFFSET in api/app.py)
+CLUSTER_MAX_ZOOM = 12
+CLUSTER_CELL_ZOOM_OFFSET = 2
+# Report/well identifiers that the app views join and filter on; indexed after each load
+KEY_COLUMNS = ("WellReportTrackingNumber", "PluggingReportTrackingNumber", "StateWellNumber")
+
+
 def parse_args() -> argparse.Namespace:
 	parser = argparse.ArgumentParser(description="Load SDR zip into ground_truth schema (1:1)")
-	parser.add_argument("--zip", dest="zip_path", required=True, help="Path to SDR zip (contains .txt files)")
+	parser.add_argument("--zip", dest="zip_path", help="Path to SDR zip (contains .txt files)")
 	parser.add_argument("--database-url", dest="database_url", required=True, help="Postgres connection URL")
 	parser.add_argument("--schema", dest="schema", default="ground_truth", help="Target schema name")
 	parser.add_argument("--delimiter", dest="delimiter", default="|", help="Field delimiter used in input files")
 	parser.add_argument("--encoding", dest="encoding", default="latin-1", help="Text encoding for input files (e.g., latin-1, utf-8)")
+	parser.add_argument("--jobs", dest="jobs", type=int, default=1, help="Number of members to COPY concurrently (separate processes/connections)")
+	parser.add_argument("--delta", dest="delta", action="store_true", help="Only reload members whose size/CRC changed since the last load")
+	parser.add_argument("--meta-schema", dest="meta_schema", default="ground_truth_meta", help="Schema holding loader bookkeeping (member fingerprints)")
+	parser.add_argument("--views-sql", dest="views_sql", default=DEFAULT_VIEWS_SQL, help="app views SQL re-applied after publish when the app schema exists ('' to skip)")
+	parser.add_argument("--wells-mat-sql", dest="wells_mat_sql", default=DEFAULT_WELLS_MAT_SQL, help="DDL for the typed app.wells_mat table rebuilt after publish ('' to skip)")
+	parser.add_argument("--rematerialize", dest="rematerialize", action="store_true", help="Only rebuild this schema's app.wells_mat partition from the live views (--zip not required)")
+	parser.add_argument("--data-version", dest="data_version", default=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"), help="Version label for this load (default: UTC timestamp)")
+	parser.add_argument("--retain", dest="retain", type=int, default=2, help="Number of previous versions to keep for rollback")
+	parser.add_argument("--rollback", dest="rollback", action="store_true", help="Re-publish the newest retained version instead of loading (--zip not required)")
 	return parser.parse_args()
 
 
@@ -143,88 +196,646 @@ def _create_table(cur: PGCursor, schema: str, table_raw: str, headers_raw: List[
 
 
 
-def _copy_into(cur: PGCursor, zf: zipfile.ZipFile, member: str, schema: str, table_raw: str, columns: List[str], delimiter: str, encoding: str) -> int:
-	# Sanitize data into a temporary CSV that matches the header column count exactly
-	# - Uses Python csv reader (delimiter='|', quotechar='"') for robust parsing
-	# - Pads missing fields with empty strings; trims extra fields beyond header count
-	# - Writes a new header matching adjusted column identifiers so HEADER true works
-	n = len(columns)
-	with zf.open(member, "r") as f_in:
-		text = io.TextIOWrapper(f_in, encoding=encoding, errors="replace", newline="")
-		reader = csv.reader(text, delimiter=delimiter)
+class _SanitizedCopyStream(io.RawIOBase):
+	"""Read-only binary stream that feeds sanitized rows straight to COPY FROM STDIN.
+
+	- Parses the source with csv.reader (delimiter, quotechar='"') for robust parsing
+	- Pads missing fields with empty strings; trims extra fields beyond header count
+	- Re-encodes rows in bounded chunks (~chunk_bytes) so memory stays constant
+	  regardless of member size and nothing is spilled to local disk
+	"""
+
+	def __init__(self, text: io.TextIOBase, n_cols: int, delimiter: str, encoding: str, chunk_bytes: int = 1 << 20) -> None:
+		super().__init__()
+		self._reader = csv.reader(text, delimiter=delimiter)
+		self._n = n_cols
+		self._encoding = encoding
+		self._chunk_bytes = chunk_bytes
+		self._sio = io.StringIO()
+		self._writer = csv.writer(self._sio, delimiter=delimiter, lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
+		# Encoded rows not yet read: self._buf[self._pos:]. Consumed bytes are only
+		# discarded when the buffer is refilled, so read() copies just what it returns
+		self._buf = bytearray()
+		self._pos = 0
+		self._exhausted = False
+		self.rows = 0
+		self.bytes = 0
+
+	def readable(self) -> bool:
+		return True
+
+	def skip_header(self) -> bool:
+		"""Consume the source header row; False when the member is empty."""
 		try:
-			_ = next(reader)
+			next(self._reader)
 		except StopIteration:
-			return 0
-		tmp_path = None
-		with tempfile.NamedTemporaryFile("w", delete=False, encoding=encoding, newline="") as f_out:
-			writer = csv.writer(f_out, delimiter=delimiter, lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
-			writer.writerow(columns)
-			for row in reader:
-				if len(row) < n:
-					row = list(row) + [""] * (n - len(row))
-				elif len(row) > n:
-					row = list(row[:n])
-				writer.writerow(row)
-			tmp_path = f_out.name
-	# COPY from sanitized temp file
+			return False
+		return True
+
+	def _fill(self) -> None:
+		n = self._n
+		writer = self._writer
+		sio = self._sio
+		for row in self._reader:
+			if len(row) < n:
+				row = list(row) + [""] * (n - len(row))
+			elif len(row) > n:
+				row = list(row[:n])
+			writer.writerow(row)
+			self.rows += 1
+			if sio.tell() >= self._chunk_bytes:
+				break
+		else:
+			self._exhausted = True
+		if self._pos:
+			del self._buf[:self._pos]
+			self._pos = 0
+		self._buf += sio.getvalue().encode(self._encoding, errors="replace")
+		sio.seek(0)
+		sio.truncate(0)
+
+	def read(self, size: int = -1) -> bytes:
+		while not self._exhausted and (size < 0 or len(self._buf) - self._pos < size):
+			self._fill()
+		end = len(self._buf) if size < 0 else min(self._pos + size, len(self._buf))
+		out = bytes(self._buf[self._pos:end])
+		self._pos = end
+		self.bytes += len(out)
+		return out
+
+	def readline(self, size: int = -1) -> bytes:
+		# copy_expert only uses read(); readline is provided for file-like completeness
+		while not self._exhausted and self._buf.find(b"\n", self._pos) < 0:
+			self._fill()
+		idx = self._buf.find(b"\n", self._pos)
+		end = len(self._buf) if idx < 0 else idx + 1
+		if size >= 0:
+			end = min(end, self._pos + size)
+		out = bytes(self._buf[self._pos:end])
+		self._pos = end
+		self.bytes += len(out)
+		return out
+
+
+def _copy_into(cur: PGCursor, zf: zipfile.ZipFile, member: str, schema: str, table_raw: str, columns: List[str], delimiter: str, encoding: str) -> int:
+	# Stream sanitized rows (matching the header column count exactly) directly into COPY
+	n = len(columns)
 	copy_sql = sql.SQL(
-		"COPY {}.{} ({}) FROM STDIN WITH (FORMAT csv, DELIMITER %s, HEADER true, ENCODING %s)"
+		"COPY {}.{} ({}) FROM STDIN WITH (FORMAT csv, DELIMITER %s, HEADER false, ENCODING %s)"
 	).format(
 		_quote_ident(schema),
 		_quote_ident(table_raw),
 		sql.SQL(', ').join([_quote_ident(c) for c in columns]),
 	)
-	with open(tmp_path, "rb") as f_bin:
-		# Safely build the final SQL with literals for delimiter and encoding
-		final_sql = cur.mogrify(copy_sql.as_string(cur.connection), (delimiter, encoding.upper())).decode()
-		cur.copy_expert(final_sql, f_bin)
-	# Return loaded row count
-	cur.execute(sql.SQL("SELECT COUNT(*) FROM {}.{}").format(_quote_ident(schema), _quote_ident(table_raw)))
-	return int(cur.fetchone()[0] or 0)
-	# Return loaded row count
-	cur.execute(sql.SQL("SELECT COUNT(*) FROM {}.{}").format(_quote_ident(schema), _quote_ident(table_raw)))
-	return int(cur.fetchone()[0] or 0)
+	# Safely build the final SQL with literals for delimiter and encoding
+	final_sql = cur.mogrify(copy_sql.as_string(cur.connection), (delimiter, encoding.upper())).decode()
+	started = time.perf_counter()
+	with zf.open(member, "r") as f_in:
+		text = io.TextIOWrapper(f_in, encoding=encoding, errors="replace", newline="")
+		stream = _SanitizedCopyStream(text, n, delimiter, encoding)
+		if not stream.skip_header():
+			return 0
+		cur.copy_expert(final_sql, stream, size=1 << 16)
+	elapsed = max(time.perf_counter() - started, 1e-6)
+	print(
+		f"copied {table_raw}: rows={stream.rows} bytes={stream.bytes} secs={elapsed:.2f} "
+		f"rows_per_s={stream.rows / elapsed:.0f} mb_per_s={stream.bytes / elapsed / 1_000_000:.2f}",
+		flush=True,
+	)
+	return stream.rows
 
 
-def main() -> int:
-	args = parse_args()
-	if not os.path.exists(args.zip_path):
-		print(f"zip not found: {args.zip_path}", file=sys.stderr)
-		return 2
+def _list_members(zf: zipfile.ZipFile) -> List[str]:
+	members = [
+		m for m in zf.namelist()
+		if (m.lower().endswith(".txt") or m.lower().endswith(".csv"))
+		and not m.endswith("/")
+		and _is_data_member(m)
+	]
+	members.sort()
+	return members
+
+
+def _member_fingerprint(zf: zipfile.ZipFile, member: str) -> Tuple[int, int]:
+	# Uncompressed size + CRC-32 straight from the zip central directory (no decompression)
+	info = zf.getinfo(member)
+	return int(info.file_size), int(info.CRC)
+
+
+def _ensure_meta_tables(cur: PGCursor, meta_schema: str) -> None:
+	cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(_quote_ident(meta_schema)))
+	cur.execute(sql.SQL(
+		"CREATE TABLE IF NOT EXISTS {}.data_versions (\n"
+		"\tbase_schema TEXT NOT NULL,\n"
+		"\tversion TEXT NOT NULL,\n"
+		"\tpublished_at TIMESTAMPTZ NOT NULL DEFAULT now(),\n"
+		"\tPRIMARY KEY (base_schema, version)\n"
+		")"
+	).format(_quote_ident(meta_schema)))
+	cur.execute(sql.SQL(
+		"CREATE TABLE IF NOT EXISTS {}.served_versions (\n"
+		"\tbase_schema TEXT NOT NULL,\n"
+		"\treader TEXT NOT NULL,\n"
+		"\tversion TEXT NOT NULL,\n"
+		"\tserved_at TIMESTAMPTZ NOT NULL DEFAULT now(),\n"
+		"\tPRIMARY KEY (base_schema, reader)\n"
+		")"
+	).format(_quote_ident(meta_schema)))
+	cur.execute(sql.SQL(
+		"CREATE TABLE IF NOT EXISTS {}.member_fingerprints (\n"
+		"\tschema_name TEXT NOT NULL,\n"
+		"\ttable_name TEXT NOT NULL,\n"
+		"\tmember TEXT NOT NULL,\n"
+		"\tfile_size BIGINT NOT NULL,\n"
+		"\tcrc32 BIGINT NOT NULL,\n"
+		"\trow_count BIGINT,\n"
+		"\tloaded_at TIMESTAMPTZ NOT NULL DEFAULT now(),\n"
+		"\tPRIMARY KEY (schema_name, table_name)\n"
+		")"
+	).format(_quote_ident(meta_schema)))
+
+
+def _read_manifest(cur: PGCursor, meta_schema: str, schema: str) -> Dict[str, Tuple[int, int]]:
+	cur.execute(
+		sql.SQL("SELECT table_name, file_size, crc32 FROM {}.member_fingerprints WHERE schema_name = %s").format(_quote_ident(meta_schema)),
+		(schema,),
+	)
+	return {r[0]: (int(r[1]), int(r[2])) for r in cur.fetchall()}
+
+
+def _record_manifest(cur: PGCursor, meta_schema: str, schema: str, entries: List[Tuple[str, str, int, int, int]], replace_all: bool = False) -> None:
+	"""Upsert (table, member, size, crc, rows) fingerprints; replace_all clears the schema's rows first."""
+	_ensure_meta_tables(cur, meta_schema)
+	if replace_all:
+		cur.execute(sql.SQL("DELETE FROM {}.member_fingerprints WHERE schema_name = %s").format(_quote_ident(meta_schema)), (schema,))
+	upsert = sql.SQL(
+		"INSERT INTO {}.member_fingerprints (schema_name, table_name, member, file_size, crc32, row_count, loaded_at) "
+		"VALUES (%s, %s, %s, %s, %s, %s, now()) "
+		"ON CONFLICT (schema_name, table_name) DO UPDATE SET member = EXCLUDED.member, file_size = EXCLUDED.file_size, "
+		"crc32 = EXCLUDED.crc32, row_count = EXCLUDED.row_count, loaded_at = EXCLUDED.loaded_at"
+	).format(_quote_ident(meta_schema))
+	for table_raw, member, size, crc, rows in entries:
+		cur.execute(upsert, (schema, table_raw, member, size, crc, rows))
+
+
+def _read_sql_statements(path: str) -> List[str]:
+	# Same naive ';' split the API uses for AUTO_APPLY_VIEWS; the app SQL files contain no literal ';'
+	with open(path, "r", encoding="utf-8") as f:
+		return [p.strip() for p in f.read().split(";") if p.strip()]
+
+
+def _reapply_app_views(cur: PGCursor, views_sql: str) -> None:
+	"""Recreate app.* views dropped by CASCADE, inside the publishing transaction.
+
+	No-op when the path is empty/missing or the `app` schema was never applied.
+	A failure raises, so the caller rolls back the whole swap: committing it would
+	leave the app views missing (or bound to the retired tables) under a new
+	data version.
+	"""
+	if not views_sql or not os.path.exists(views_sql):
+		return
+	cur.execute("SELECT 1 FROM pg_namespace WHERE nspname = 'app'")
+	if cur.fetchone() is None:
+		return
+	try:
+		for stmt in _read_sql_statements(views_sql):
+			cur.execute(stmt)
+	except psycopg2.Error as exc:
+		raise RuntimeError(f"app views could not be re-applied from {views_sql}; publish rolled back: {exc}".strip()) from exc
+
+
+def _version_schema(base: str, version: str) -> str:
+	return _pg_ident_truncate(f"{base}_v{version}")
+
+
+def _live_version(cur: PGCursor, meta_schema: str, base: str) -> str | None:
+	cur.execute(
+		sql.SQL("SELECT version FROM {}.data_versions WHERE base_schema = %s ORDER BY published_at DESC LIMIT 1").format(_quote_ident(meta_schema)),
+		(base,),
+	)
+	row = cur.fetchone()
+	return row[0] if row else None
+
+
+def _record_version(cur: PGCursor, meta_schema: str, base: str, version: str) -> None:
+	cur.execute(
+		sql.SQL(
+			"INSERT INTO {}.data_versions (base_schema, version, published_at) VALUES (%s, %s, now()) "
+			"ON CONFLICT (base_schema, version) DO UPDATE SET published_at = EXCLUDED.published_at"
+		).format(_quote_ident(meta_schema)),
+		(base, version),
+	)
+
+
+def _record_served(cur: PGCursor, meta_schema: str, base: str, reader: str, version: str) -> None:
+	"""Mark `version` as the data `reader` ('views' or 'wells_mat') returns for base; the API keys its caches on it."""
+	cur.execute(
+		sql.SQL(
+			"INSERT INTO {}.served_versions (base_schema, reader, version, served_at) VALUES (%s, %s, %s, now()) "
+			"ON CONFLICT (base_schema, reader) DO UPDATE SET version = EXCLUDED.version, served_at = EXCLUDED.served_at"
+		).format(_quote_ident(meta_schema)),
+		(base, reader, version),
+	)
+
+
+def _schema_exists(cur: PGCursor, schema: str) -> bool:
+	cur.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s", (schema,))
+	return cur.fetchone() is not None
+
+
+def _index_and_analyze(cur: PGCursor, schema: str, tables: List[str]) -> None:
+	"""Index key identifier columns and refresh planner stats before tables go live."""
+	for table_raw in tables:
+		cur.execute(
+			"SELECT column_name FROM information_schema.columns WHERE table_schema = %s AND table_name = %s",
+			(schema, table_raw),
+		)
+		for (col,) in cur.fetchall():
+			if col in KEY_COLUMNS:
+				# Unnamed so Postgres picks a unique name (staging tables keep theirs after rename)
+				cur.execute(sql.SQL("CREATE INDEX ON {}.{} ({})").format(
+					_quote_ident(schema), _quote_ident(table_raw), _quote_ident(col)
+				))
+		cur.execute(sql.SQL("ANALYZE {}.{}").format(_quote_ident(schema), _quote_ident(table_raw)))
+
+
+def _publish_version(cur: PGCursor, args: argparse.Namespace, build_schema: str, version: str) -> None:
+	"""Swap build_schema in as the live schema; the current live schema is kept under its version name."""
+	base = args.schema
+	if _schema_exists(cur, base):
+		previous = _live_version(cur, args.meta_schema, base) or "legacy"
+		retired = _version_schema(base, previous)
+		cur.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(_quote_ident(retired)))
+		cur.execute(sql.SQL("ALTER SCHEMA {} RENAME TO {}").format(_quote_ident(base), _quote_ident(retired)))
+	cur.execute(sql.SQL("ALTER SCHEMA {} RENAME TO {}").format(_quote_ident(build_schema), _quote_ident(base)))
+	# The views still point at the retired tables; if they cannot be rebound this raises and the
+	# caller rolls the swap back, so the version is never recorded for data the app does not read
+	_reapply_app_views(cur, args.views_sql)
+	_record_version(cur, args.meta_schema, base, version)
+	_record_served(cur, args.meta_schema, base, "views", version)
+
+
+def _retained_versions(cur: PGCursor, meta_schema: str, base: str) -> List[Tuple[str, str]]:
+	"""(version, schema) of previous versions still on disk, newest first."""
+	live = _live_version(cur, meta_schema, base)
+	cur.execute(
+		sql.SQL("SELECT version FROM {}.data_versions WHERE base_schema = %s ORDER BY published_at DESC").format(_quote_ident(meta_schema)),
+		(base,),
+	)
+	out: List[Tuple[str, str]] = []
+	for (version,) in cur.fetchall():
+		schema = _version_schema(base, version)
+		if version != live and _schema_exists(cur, schema):
+			out.append((version, schema))
+	legacy = _version_schema(base, "legacy")
+	if _schema_exists(cur, legacy):
+		out.append(("legacy", legacy))
+	return out
+
+
+def _prune_versions(conn: PGConnection, args: argparse.Namespace) -> None:
+	# Separate transaction: DROP SCHEMA waits for in-flight readers of old tables
+	with conn.cursor() as cur:
+		for version, schema in _retained_versions(cur, args.meta_schema, args.schema)[max(args.retain, 0):]:
+			cur.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(_quote_ident(schema)))
+			cur.execute(
+				sql.SQL("DELETE FROM {}.data_versions WHERE base_schema = %s AND version = %s").format(_quote_ident(args.meta_schema)),
+				(args.schema, version),
+			)
+			print(f"dropped retained version: {schema}")
+	conn.commit()
+
+
+def _materialize_wells(conn: PGConnection, args: argparse.Namespace, version: str) -> None:
+	"""Rebuild this schema's app.wells_mat partition from its view and swap it in.
+
+	The partition is built as a standalone table (typed columns, indexes matching
+	the parent, ANALYZE, CHECK on source so ATTACH skips its validation scan) while
+	the API keeps reading the current partition; the detach/rename/attach swap is
+	a short metadata-only transaction. `version` is recorded as served by
+	'wells_mat' once the cluster rollup has committed too.
+	"""
+	source = MATERIALIZED_SOURCES.get(args.schema)
+	if source is None or not args.wells_mat_sql or not os.path.exists(args.wells_mat_sql):
+		return
+	view = f"wells_{source}"
+	live = f"wells_mat_{source}"
+	build = f"wells_mat_{source}__build"
+	cols = sql.SQL(", ").join([sql.Identifier(c) for c in WELLS_MAT_COLUMNS])
+	with conn.cursor() as cur:
+		cur.execute("SELECT to_regclass(%s)", (f"app.{view}",))
+		if cur.fetchone()[0] is None:
+			print(f"skip materialize: app.{view} does not exist")
+			return
+		for stmt in _read_sql_statements(args.wells_mat_sql):
+			cur.execute(stmt)
+		cur.execute(sql.SQL("DROP TABLE IF EXISTS app.{}").format(sql.Identifier(build)))
+		cur.execute(sql.SQL("CREATE TABLE app.{} (LIKE app.wells_mat INCLUDING DEFAULTS INCLUDING GENERATED)").format(sql.Identifier(build)))
+		cur.execute(sql.SQL("ALTER TABLE app.{} ADD CHECK (source = {})").format(sql.Identifier(build), sql.Literal(source)))
+		cur.execute(sql.SQL("INSERT INTO app.{} ({}) SELECT {} FROM app.{}").format(
+			sql.Identifier(build), cols, cols, sql.Identifier(view)
+		))
+		rows = cur.rowcount
+		for name, method_cols in WELLS_MAT_INDEXES.items():
+			cur.execute(sql.SQL("CREATE INDEX {} ON app.{} USING {}").format(
+				sql.Identifier(f"{build}_{name}_idx"), sql.Identifier(build), sql.SQL(method_cols)
+			))
+		cur.execute(sql.SQL("ANALYZE app.{}").format(sql.Identifier(build)))
+	conn.commit()
+	with conn.cursor() as cur:
+		cur.execute(sql.SQL("ALTER TABLE app.wells_mat DETACH PARTITION app.{}").format(sql.Identifier(live)))
+		cur.execute(sql.SQL("DROP TABLE app.{}").format(sql.Identifier(live)))
+		cur.execute(sql.SQL("ALTER TABLE app.{} RENAME TO {}").format(sql.Identifier(build), sql.Identifier(live)))
+		for name in WELLS_MAT_INDEXES:
+			cur.execute(sql.SQL("ALTER INDEX app.{} RENAME TO {}").format(
+				sql.Identifier(f"{build}_{name}_idx"), sql.Identifier(f"{live}_{name}_idx")
+			))
+		cur.execute(sql.SQL("ALTER TABLE app.wells_mat ATTACH PARTITION app.{} FOR VALUES IN ({})").format(
+			sql.Identifier(live), sql.Literal(source)
+		))
+	conn.commit()
+	print(f"materialized app.{live}: rows={rows}")
+	_build_cluster_rollup(conn, source)
+	with conn.cursor() as cur:
+		_ensure_meta_tables(cur, args.meta_schema)
+		_record_served(cur, args.meta_schema, args.schema, "wells_mat", version)
+	conn.commit()
+	print(f"serving {args.schema} version {version} from app.wells_mat")
+
+
+def _build_cluster_rollup(conn: PGConnection, source: str) -> None:
+	"""Recompute this source's app.wells_clusters rows from its app.wells_mat partition.
+
+	Delete + insert in one transaction: readers keep seeing the previous rollup
+	(MVCC) until commit, and nothing is locked against them.
+	"""
+	live = f"wells_mat_{source}"
+	with conn.cursor() as cur:
+		cur.execute("DELETE FROM app.wells_clusters WHERE source = %s", (source,))
+		cur.execute(sql.SQL(
+			"INSERT INTO app.wells_clusters "
+			"(source, zoom, cx, cy, n, sum_lat, sum_lon, n_depth, sum_depth, min_depth, max_depth, min_date, max_date) "
+			"SELECT %s, z, cx, cy, COUNT(*), SUM(lat), SUM(lon), COUNT(depth_ft), SUM(depth_ft), MIN(depth_ft), MAX(depth_ft), "
+			"MIN(date_completed), MAX(date_completed) "
+			"FROM ("
+			"  SELECT z, lat, lon, depth_ft, date_completed,"
+			"    floor((lon + 180.0) / 360.0 * 2 ^ (z + %s))::integer AS cx,"
+			"    floor((1 - ln(tan(radians(lat)) + 1 / cos(radians(lat))) / pi()) / 2 * 2 ^ (z + %s))::integer AS cy"
+			"  FROM app.{} CROSS JOIN generate_series(0, %s) AS z"
+			"  WHERE lat IS NOT NULL AND lon IS NOT NULL"
+			") cells GROUP BY z, cx, cy"
+		).format(sql.Identifier(live)), (source, CLUSTER_CELL_ZOOM_OFFSET, CLUSTER_CELL_ZOOM_OFFSET, CLUSTER_MAX_ZOOM))
+		cells = cur.rowcount
+		cur.execute("ANALYZE app.wells_clusters")
+	conn.commit()
+	print(f"cluster rollup {source}: cells={cells}")
+
+
+def _rematerialize(args: argparse.Namespace) -> int:
+	conn: PGConnection = psycopg2.connect(args.database_url)
+	conn.autocommit = False
+	try:
+		with conn.cursor() as cur:
+			_ensure_meta_tables(cur, args.meta_schema)
+			live = _live_version(cur, args.meta_schema, args.schema) or "legacy"
+		conn.commit()
+		# Same ground truth, rebuilt rows: a new served version so API caches roll over
+		_materialize_wells(conn, args, f"{live}.r{args.data_version}")
+		return 0
+	except Exception:
+		conn.rollback()
+		raise
+	finally:
+		conn.close()
+
+
+def _copy_member_worker(task: Tuple[str, str, str, str, str, List[str], str, str]) -> Tuple[str, int]:
+	"""Process-pool entry point: COPY one member on its own connection and commit."""
+	database_url, zip_path, member, schema, table_raw, columns, delimiter, encoding = task
+	conn: PGConnection = psycopg2.connect(database_url)
+	try:
+		with conn.cursor() as cur, zipfile.ZipFile(zip_path, "r") as zf:
+			loaded = _copy_into(cur, zf, member, schema, table_raw, columns, delimiter, encoding)
+		conn.commit()
+		return table_raw, loaded
+	except Exception:
+		conn.rollback()
+		raise
+	finally:
+		conn.close()
+
+
+def _run_copy_tasks(tasks: List[Tuple[str, str, str, str, str, List[str], str, str]], jobs: int) -> Dict[str, int]:
+	"""Run COPY tasks (already ordered largest first), in a process pool when jobs > 1."""
+	if jobs <= 1:
+		return dict(_copy_member_worker(t) for t in tasks)
+	summary: Dict[str, int] = {}
+	with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+		for table_raw, loaded in executor.map(_copy_member_worker, tasks):
+			summary[table_raw] = loaded
+	return summary
+
+
+def _drop_build_schema(conn: PGConnection, build: str) -> None:
+	"""Remove an unpublished build schema after a failed load (best effort; the original error wins)."""
+	try:
+		with conn.cursor() as cur:
+			cur.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(_quote_ident(build)))
+		conn.commit()
+		print(f"dropped unpublished build schema: {build}", file=sys.stderr)
+	except psycopg2.Error as exc:
+		conn.rollback()
+		print(f"warning: could not drop build schema {build}: {exc}".strip(), file=sys.stderr)
+
+
+def _load_full(args: argparse.Namespace) -> int:
+	"""Load every member into a fresh versioned schema, then publish it blue/green.
+
+	Tables are created up front so each COPY worker can see them from its own
+	connection; readers keep using the live schema until the final rename.
+	"""
+	build = _version_schema(args.schema, args.data_version)
+	tasks: List[Tuple[str, str, str, str, str, List[str], str, str]] = []
+	fingerprints: Dict[str, Tuple[str, int, int]] = {}
+	published = False
 	conn: PGConnection = psycopg2.connect(args.database_url)
 	conn.autocommit = False
 	try:
+		with conn.cursor() as cur, zipfile.ZipFile(args.zip_path, "r") as zf:
+			_create_schema(cur, build)
+			members = _list_members(zf)
+			# Largest first so the long tail (e.g. WellLithology) starts immediately
+			members.sort(key=lambda m: zf.getinfo(m).file_size, reverse=True)
+			for member in members:
+				table_raw = os.path.splitext(os.path.basename(member))[0]
+				headers = _read_header_from_zip(zf, member, encoding=args.encoding, delimiter=args.delimiter)
+				if not headers:
+					print(f"skip (no header): {member}")
+					continue
+				cols_adj, _ = _create_table(cur, build, table_raw, headers)
+				tasks.append((args.database_url, args.zip_path, member, build, table_raw, cols_adj, args.delimiter, args.encoding))
+				fingerprints[table_raw] = (member, *_member_fingerprint(zf, member))
+		conn.commit()
+
+		summary = _run_copy_tasks(tasks, args.jobs)
+
 		with conn.cursor() as cur:
-			_create_schema(cur, args.schema)
-			with zipfile.ZipFile(args.zip_path, "r") as zf:
-				members = [
-					m for m in zf.namelist()
-					if (m.lower().endswith(".txt") or m.lower().endswith(".csv"))
-					and not m.endswith("/")
-					and _is_data_member(m)
-				]
-				members.sort()
-				summary: List[Tuple[str, int]] = []
-				for member in members:
-					base = os.path.basename(member)
-					table_raw = os.path.splitext(base)[0]
-					headers = _read_header_from_zip(zf, member, encoding=args.encoding, delimiter=args.delimiter)
-					if not headers:
-						print(f"skip (no header): {member}")
-						continue
-					cols_adj, _ = _create_table(cur, args.schema, table_raw, headers)
-					loaded = _copy_into(cur, zf, member, args.schema, table_raw, cols_adj, args.delimiter, args.encoding)
-					summary.append((table_raw, loaded))
-				print("tables_loaded=", {k: v for k, v in summary})
+			_index_and_analyze(cur, build, list(summary))
 		conn.commit()
+
+		with conn.cursor() as cur:
+			_ensure_meta_tables(cur, args.meta_schema)
+			_publish_version(cur, args, build, args.data_version)
+			_record_manifest(cur, args.meta_schema, args.schema, [
+				(t, *fingerprints[t], n) for t, n in summary.items()
+			], replace_all=True)
+		conn.commit()
+		published = True
+		print("tables_loaded=", dict(sorted(summary.items())))
+		print(f"published {args.schema} version {args.data_version}")
+		_materialize_wells(conn, args, args.data_version)
+		_prune_versions(conn, args)
 		return 0
-	except Exception as exc:
+	except Exception:
 		conn.rollback()
+		if not published:
+			_drop_build_schema(conn, build)
 		raise
 	finally:
 		conn.close()
 
 
+def _rollback_version(args: argparse.Namespace) -> int:
+	"""Re-publish the newest retained version; the current live data becomes a retained version."""
+	conn: PGConnection = psycopg2.connect(args.database_url)
+	conn.autocommit = False
+	try:
+		with conn.cursor() as cur:
+			_ensure_meta_tables(cur, args.meta_schema)
+			retained = _retained_versions(cur, args.meta_schema, args.schema)
+			if not retained:
+				print(f"no retained versions of {args.schema} to roll back to", file=sys.stderr)
+				return 3
+			version, schema = retained[0]
+			_publish_version(cur, args, schema, version)
+		conn.commit()
+		print(f"rolled back {args.schema} to version {version}")
+		_materialize_wells(conn, args, version)
+		return 0
+	except Exception:
+		conn.rollback()
+		raise
+	finally:
+		conn.close()
+
+
+def _load_delta(args: argparse.Namespace) -> int:
+	"""Reload only members whose (size, CRC) fingerprint changed since the last load.
+
+	Changed members are COPY'd into `<table>__staging` next to the live table, then
+	swapped in (drop + rename) in one short transaction at the end. Unchanged tables
+	are never touched, and members that disappeared from the zip are dropped.
+	Delta loads update the live schema in place, so they publish a new data
+	version but do not retain the previous one for rollback.
+	"""
+	tasks: List[Tuple[str, str, str, str, str, List[str], str, str]] = []
+	staged: Dict[str, Tuple[str, str, int, int]] = {}
+	unchanged: List[str] = []
+	conn: PGConnection = psycopg2.connect(args.database_url)
+	conn.autocommit = False
+	try:
+		with conn.cursor() as cur, zipfile.ZipFile(args.zip_path, "r") as zf:
+			cur.execute(sql.SQL("CREATE SCHEMA IF NOT EXISTS {}").format(_quote_ident(args.schema)))
+			_ensure_meta_tables(cur, args.meta_schema)
+			previous = _read_manifest(cur, args.meta_schema, args.schema)
+			cur.execute("SELECT tablename FROM pg_tables WHERE schemaname = %s", (args.schema,))
+			existing = {r[0] for r in cur.fetchall()}
+			members = _list_members(zf)
+			members.sort(key=lambda m: zf.getinfo(m).file_size, reverse=True)
+			seen: List[str] = []
+			for member in members:
+				table_raw = os.path.splitext(os.path.basename(member))[0]
+				fingerprint = _member_fingerprint(zf, member)
+				seen.append(table_raw)
+				if previous.get(table_raw) == fingerprint and table_raw in existing:
+					unchanged.append(table_raw)
+					continue
+				headers = _read_header_from_zip(zf, member, encoding=args.encoding, delimiter=args.delimiter)
+				if not headers:
+					print(f"skip (no header): {member}")
+					continue
+				staging = _pg_ident_truncate(f"{table_raw}__staging")
+				cur.execute(sql.SQL("DROP TABLE IF EXISTS {}.{}").format(_quote_ident(args.schema), _quote_ident(staging)))
+				cols_adj, _ = _create_table(cur, args.schema, staging, headers)
+				tasks.append((args.database_url, args.zip_path, member, args.schema, staging, cols_adj, args.delimiter, args.encoding))
+				staged[staging] = (table_raw, member, *fingerprint)
+			removed = sorted(t for t in previous if t not in seen)
+		conn.commit()
+
+		summary = _run_copy_tasks(tasks, args.jobs)
+
+		with conn.cursor() as cur:
+			_index_and_analyze(cur, args.schema, list(summary))
+		conn.commit()
+
+		loaded: Dict[str, int] = {}
+		with conn.cursor() as cur:
+			entries: List[Tuple[str, str, int, int, int]] = []
+			for staging, rows in summary.items():
+				table_raw, member, size, crc = staged[staging]
+				cur.execute(sql.SQL("DROP TABLE IF EXISTS {}.{} CASCADE").format(_quote_ident(args.schema), _quote_ident(table_raw)))
+				cur.execute(sql.SQL("ALTER TABLE {}.{} RENAME TO {}").format(
+					_quote_ident(args.schema), _quote_ident(staging), _quote_ident(table_raw)
+				))
+				entries.append((table_raw, member, size, crc, rows))
+				loaded[table_raw] = rows
+			for table_raw in removed:
+				cur.execute(sql.SQL("DROP TABLE IF EXISTS {}.{} CASCADE").format(_quote_ident(args.schema), _quote_ident(table_raw)))
+				cur.execute(
+					sql.SQL("DELETE FROM {}.member_fingerprints WHERE schema_name = %s AND table_name = %s").format(_quote_ident(args.meta_schema)),
+					(args.schema, table_raw),
+				)
+			_record_manifest(cur, args.meta_schema, args.schema, entries)
+			if entries or removed:
+				# Tables were swapped in place: the live schema now carries a new data version,
+				# and the old one no longer exists anywhere unless it was retained
+				previous = _live_version(cur, args.meta_schema, args.schema)
+				if previous and previous != args.data_version and not _schema_exists(cur, _version_schema(args.schema, previous)):
+					cur.execute(
+						sql.SQL("DELETE FROM {}.data_versions WHERE base_schema = %s AND version = %s").format(_quote_ident(args.meta_schema)),
+						(args.schema, previous),
+					)
+				_record_version(cur, args.meta_schema, args.schema, args.data_version)
+				_reapply_app_views(cur, args.views_sql)
+				_record_served(cur, args.meta_schema, args.schema, "views", args.data_version)
+		conn.commit()
+		print("tables_loaded=", dict(sorted(loaded.items())))
+		print("tables_unchanged=", sorted(unchanged))
+		if removed:
+			print("tables_removed=", removed)
+		if loaded or removed:
+			_materialize_wells(conn, args, args.data_version)
+		return 0
+	except Exception:
+		conn.rollback()
+		raise
+	finally:
+		conn.close()
+
+
+def main() -> int:
+	args = parse_args()
+	if args.rollback:
+		return _rollback_version(args)
+	if args.rematerialize:
+		return _rematerialize(args)
+	if not args.zip_path or not os.path.exists(args.zip_path):
+		print(f"zip not found: {args.zip_path}", file=sys.stderr)
+		return 2
+	if args.delta:
+		return _load_delta(args)
+	return _load_full(args)
+
+
 if __name__ == "__main__":
 	sys.exit(main())
@@ -1,6 +1,7 @@
 -- Idempotent apply for app schema/views
 BEGIN;
 \i db/app_views.sql
+\i db/app_wells_mat.sql
 COMMIT;
 
 
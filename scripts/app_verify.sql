@@ -17,6 +17,14 @@ SELECT 'app.wells_gwdb view exists' AS check, EXISTS (
   SELECT 1 FROM information_schema.views WHERE table_schema='app' AND table_name='wells_gwdb'
 ) AS ok;
 
+SELECT 'app.wells_mat table exists' AS check, EXISTS (
+  SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+  WHERE n.nspname='app' AND c.relname='wells_mat' AND c.relkind='p'
+) AS ok;
+
+SELECT 'app.wells_mat rows by source' AS check, source, COUNT(*) AS rows
+FROM app.wells_mat GROUP BY source ORDER BY source;
+
 -- Sample rows
 SELECT * FROM app.wells LIMIT 10;
 SELECT * FROM app.wells_sdr LIMIT 5;